@@ -0,0 +1,73 @@
+"""
+Бенчмарк автосохранения: полная запись холста против записи только
+измененных плиток после короткого мазка. Время снимка - часть, которая
+выполняется в потоке интерфейса; время записи - фоновый поток.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_autosave --sizes 256 512 1024
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import tempfile
+import time
+import numpy as np
+import pygame
+from editor.autosave import Autosave
+
+
+def make_surface(size):
+    """Холст со случайными пикселями (детерминированно)"""
+    rng = np.random.default_rng(size)
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    pixels = pygame.surfarray.pixels3d(surface)
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    pixels[:] = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+    alpha[:] = 255
+    del pixels, alpha  # Освобождаем блокировку поверхности
+    return surface
+
+
+def timed_checkpoint(autosave, surface):
+    """(снимок, мс; запись, мс; плиток записано)"""
+    tiles_before = autosave.tiles_written
+    start = time.perf_counter()
+    autosave.checkpoint(surface)
+    snapshot_ms = (time.perf_counter() - start) * 1000
+    autosave.wait()
+    return snapshot_ms, autosave.last_duration_ms, autosave.tiles_written - tiles_before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк автосохранения")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 512, 1024])
+    parser.add_argument("--stroke", type=int, default=24, help="Длина мазка в пикселях")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    print(f"{'размер':>8}  {'запись':<14}{'плиток':>8}{'снимок, мс':>12}{'фон, мс':>10}")
+    for size in args.sizes:
+        surface = make_surface(size)
+        with tempfile.TemporaryDirectory() as directory:
+            autosave = Autosave(os.path.join(directory, ".autosave"))
+            autosave.start()
+            autosave.mark_all(surface.get_size(), now=0)
+            rows = [("полная", timed_checkpoint(autosave, surface))]
+
+            stroke = pygame.Rect(size // 3, size // 3, args.stroke, 1)
+            surface.fill((255, 255, 255, 255), stroke)
+            autosave.mark(stroke, surface.get_size(), now=0)
+            rows.append(("изменения", timed_checkpoint(autosave, surface)))
+            rows.append(("без изменений", timed_checkpoint(autosave, surface)))
+
+            for name, (snapshot_ms, write_ms, tiles) in rows:
+                if not tiles:
+                    write_ms = 0.0  # Запись пропущена
+                print(f"{size:>8}  {name:<14}{tiles:>8}{snapshot_ms:>12.2f}{write_ms:>10.1f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
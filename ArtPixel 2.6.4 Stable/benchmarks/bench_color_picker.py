@@ -0,0 +1,93 @@
+"""
+Бенчмарк цветового пикера: кэшированные градиенты против прежней
+попиксельной отрисовки на каждом кадре.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_color_picker --frames 30
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import time
+import pygame
+from editor.core import PixelArtEditor
+
+
+def legacy_draw_hue_bar(ui):
+    """Прежняя полоса оттенков: линия через colorsys на каждую строку"""
+    rect = ui.editor.color_manager.hue_bar_rect
+    for y in range(rect.height):
+        color = ui.editor.color_manager.hsv_to_rgb(y / rect.height, 1, 1)
+        pygame.draw.line(ui.editor.screen, color, (rect.x, rect.y + y), (rect.right, rect.y + y))
+
+
+def legacy_draw_sv_square(ui):
+    """Прежний квадрат S/V: отдельный прямоугольник на каждый пиксель"""
+    rect = ui.editor.color_manager.sv_square_rect
+    for y in range(rect.height):
+        for x in range(rect.width):
+            color = ui.editor.color_manager.hsv_to_rgb(ui.editor.color_manager.hue,
+                                                       x / rect.width, 1 - (y / rect.height))
+            pygame.draw.rect(ui.editor.screen, color, (rect.x + x, rect.y + y, 1, 1))
+
+
+def legacy_draw_alpha_bar(ui):
+    """Прежняя полоса прозрачности: шахматный фон и линия на каждый столбец"""
+    rect = ui.editor.color_manager.alpha_bar_rect
+    ui.draw_transparency_bg(rect)
+    for x in range(rect.width):
+        color = (*ui.editor.color_manager.current_color[:3], int(255 * x / rect.width))
+        pygame.draw.line(ui.editor.screen, color, (rect.x + x, rect.y), (rect.x + x, rect.bottom))
+
+
+def legacy_draw_color_picker(ui):
+    """UI.draw_color_picker до кэширования градиентов"""
+    ui.draw_color_picker()  # Расположение и индикаторы
+    legacy_draw_hue_bar(ui)
+    legacy_draw_sv_square(ui)
+    legacy_draw_alpha_bar(ui)
+
+
+def time_frames(func, frames):
+    """Среднее время одного вызова в миллисекундах"""
+    func()  # Прогрев (построение кэшей)
+    start = time.perf_counter()
+    for _ in range(frames):
+        func()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк цветового пикера")
+    parser.add_argument("--frames", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    editor = PixelArtEditor(grid_size=32, zoom=16)
+    ui = editor.ui
+    hue_step = [0]
+
+    def drag_hue():
+        # Перетаскивание полосы оттенков: новый оттенок на каждом кадре
+        hue_step[0] = (hue_step[0] + 1) % 120
+        editor.color_manager.update_hue(hue_step[0])
+        ui.draw_color_picker()
+
+    # Прежняя версия рисует поверх тех же индикаторов, поэтому ее время -
+    # это полный кадр пикера плюс три попиксельных градиента. От оттенка
+    # оно не зависит, так что служит базой для обоих сценариев.
+    legacy = time_frames(lambda: legacy_draw_color_picker(ui), args.frames)
+    rows = [
+        ("статичный цвет", time_frames(ui.draw_color_picker, args.frames)),
+        ("смена оттенка", time_frames(drag_hue, args.frames)),
+    ]
+    print(f"{'сценарий':<16}{'до, мс':>10}{'после, мс':>12}")
+    for name, after in rows:
+        print(f"{name:<16}{legacy:>10.2f}{after:>12.2f}")
+    editor.shutdown()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Бенчмарк кадров с открытыми диалогами: время кадра и выделения памяти.
+
+Считает создание pygame.Surface за кадр и прирост памяти Python
+(tracemalloc). После первого кадра поверхностей создаваться не должно.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_dialogs --frames 60
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import time
+import tracemalloc
+import pygame
+from editor.core import PixelArtEditor
+from editor.utils import count_surface_allocations
+
+DIALOGS = [
+    ("сохранение", "save_dialog_active"),
+    ("размер", "resize_dialog_active"),
+    ("открытие", "open_dialog_active"),
+]
+
+
+def measure_dialog(editor, flag, frames):
+    """Возвращает (мс на кадр, поверхностей на кадр, КБ Python на кадр)"""
+    setattr(editor, flag, True)
+    editor.draw()  # Прогрев: пул поверхностей и кэш текста
+    editor.dirty_rects.clear()
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    with count_surface_allocations() as counter:
+        start = time.perf_counter()
+        for _ in range(frames):
+            editor.draw()
+            editor.dirty_rects.clear()
+        elapsed = time.perf_counter() - start
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    setattr(editor, flag, False)
+
+    grown = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    return (elapsed * 1000 / frames, counter["surfaces"] / frames,
+            max(grown, 0) / 1024 / frames)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк диалогов")
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args(argv)
+
+    editor = PixelArtEditor(grid_size=64, zoom=8)
+    print(f"{'диалог':<12}{'кадр, мс':>10}{'Surface/кадр':>14}{'КБ/кадр':>10}")
+    for name, flag in DIALOGS:
+        frame_ms, surfaces, kbytes = measure_dialog(editor, flag, args.frames)
+        print(f"{name:<12}{frame_ms:>10.2f}{surfaces:>14.2f}{kbytes:>10.2f}")
+    print(f"поверхностей в пуле: {len(editor.surface_pool)}, "
+          f"создано всего: {editor.surface_pool.allocations}")
+    editor.shutdown()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
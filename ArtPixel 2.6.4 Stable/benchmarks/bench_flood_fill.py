@@ -0,0 +1,115 @@
+"""
+Бенчмарк заливки: построчный алгоритм против прежней заливки стеком.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_flood_fill --sizes 64 128 256
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import time
+import pygame
+from editor.core import PixelArtEditor
+
+WALL = (255, 255, 255, 255)
+FILL = (0, 122, 204, 255)
+
+
+def legacy_flood_fill(editor, pos):
+    """Прежняя заливка: стек на 4 соседей, get_at и draw_pixel на каждый пиксель"""
+    x, y = pos
+    target_color = editor.canvas.get_at((x, y))
+    replacement_color = editor.color_manager.current_color
+    if target_color == replacement_color:
+        return
+
+    editor.begin_transaction()
+    try:
+        stack = [(x, y)]
+        while stack:
+            x, y = stack.pop()
+            if not (0 <= x < editor.grid_size and 0 <= y < editor.grid_size):
+                continue
+            if editor.canvas.get_at((x, y)) != target_color:
+                continue
+            editor.draw_pixel((x, y), replacement_color)
+            stack.append((x + 1, y))
+            stack.append((x - 1, y))
+            stack.append((x, y + 1))
+            stack.append((x, y - 1))
+    finally:
+        editor.commit_transaction()
+
+
+def pattern_empty(surface):
+    """Пустой холст - заливается целиком"""
+    surface.fill((0, 0, 0, 0))
+
+
+def pattern_checkerboard(surface):
+    """Шахматка - каждая клетка изолирована"""
+    surface.fill((0, 0, 0, 0))
+    width, height = surface.get_size()
+    for y in range(height):
+        for x in range(y % 2, width, 2):
+            surface.set_at((x, y), WALL)
+
+
+def pattern_spiral(surface):
+    """Квадратная спираль со стенкой и коридором в 1 пиксель"""
+    surface.fill((0, 0, 0, 0))
+    size = surface.get_width()
+    left, top, right, bottom = 0, 0, size - 1, size - 1
+    while left <= right and top <= bottom:
+        pygame.draw.line(surface, WALL, (left, top), (right, top))
+        pygame.draw.line(surface, WALL, (right, top), (right, bottom))
+        pygame.draw.line(surface, WALL, (right, bottom), (left, bottom))
+        pygame.draw.line(surface, WALL, (left, bottom), (left, top + 2))
+        left, top, right, bottom = left + 2, top + 2, right - 2, bottom - 2
+
+
+PATTERNS = {
+    "empty": (pattern_empty, (0, 0)),
+    "checkerboard": (pattern_checkerboard, (1, 0)),
+    "spiral": (pattern_spiral, (1, 1)),
+}
+
+
+def run_case(editor, fill, pattern, seed, repeats):
+    """Возвращает лучшее время заливки в секундах"""
+    best = None
+    for _ in range(repeats):
+        pattern(editor.canvas)
+        editor.save_state()
+        start = time.perf_counter()
+        fill(seed)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк заливки")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    print(f"{'шаблон':<14}{'размер':>8}{'старая, мс':>14}{'новая, мс':>14}{'ускорение':>12}")
+    for size in args.sizes:
+        editor = PixelArtEditor(grid_size=size, zoom=2)
+        editor.color_manager.current_color = FILL
+        for name, (pattern, seed) in PATTERNS.items():
+            legacy = run_case(editor, lambda pos: legacy_flood_fill(editor, pos),
+                              pattern, seed, args.repeats)
+            scanline = run_case(editor, editor.tools.flood_fill,
+                                pattern, seed, args.repeats)
+            print(f"{name:<14}{size:>8}{legacy * 1000:>14.2f}{scanline * 1000:>14.2f}"
+                  f"{legacy / scanline:>11.1f}x")
+        editor.shutdown()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Бенчмарк сетки: кэшированная плитка против прежних draw.line на каждом кадре.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_grid --sizes 256 512 --zooms 2 8 16
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import time
+import pygame
+from editor.core import PixelArtEditor
+from editor.constants import GRID_MAJOR_COLOR
+
+
+def legacy_draw_grid(editor):
+    """Прежняя сетка: 2 * (grid_size + 1) вызова draw.line на каждом кадре"""
+    for i in range(editor.grid_size + 1):
+        x = editor.canvas_x + i * editor.zoom
+        y = editor.canvas_y + i * editor.zoom
+        pygame.draw.line(editor.screen, editor.grid_color,
+                         (x, editor.canvas_y), (x, editor.canvas_y + editor.canvas_height))
+        pygame.draw.line(editor.screen, editor.grid_color,
+                         (editor.canvas_x, y), (editor.canvas_x + editor.canvas_width, y))
+
+
+def cached_draw_grid(editor):
+    canvas_rect = pygame.Rect(int(editor.canvas_x), int(editor.canvas_y),
+                              int(editor.canvas_width), int(editor.canvas_height))
+    editor.grid_cache.draw(editor.screen, canvas_rect, editor.zoom, editor.grid_color,
+                           GRID_MAJOR_COLOR, editor.grid_major_every)
+
+
+def time_frames(func, frames):
+    """Среднее время одного вызова в миллисекундах"""
+    func()  # Прогрев (построение кэшей)
+    start = time.perf_counter()
+    for _ in range(frames):
+        func()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк сетки")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 512])
+    parser.add_argument("--zooms", type=int, nargs="+", default=[2, 8, 16])
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args(argv)
+
+    print(f"{'размер':>8}{'масштаб':>9}{'старая, мс':>13}{'новая, мс':>12}"
+          f"{'кадр до, мс':>14}{'кадр после, мс':>17}")
+    for size in args.sizes:
+        editor = PixelArtEditor(grid_size=size, zoom=2)
+        for zoom in args.zooms:
+            editor.zoom = zoom
+            editor.canvas_x = editor.canvas_y = None
+            editor.update_canvas_position()
+            legacy = time_frames(lambda: legacy_draw_grid(editor), args.frames)
+            cached = time_frames(lambda: cached_draw_grid(editor), args.frames)
+
+            # Полный кадр холста: без сетки + соответствующая сетка
+            editor.show_grid = False
+            canvas_only = time_frames(editor.draw_canvas, args.frames)
+            editor.show_grid = True
+            print(f"{size:>8}{zoom:>9}{legacy:>13.2f}{cached:>12.2f}"
+                  f"{canvas_only + legacy:>14.2f}{canvas_only + cached:>17.2f}")
+        editor.shutdown()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Бенчмарк загрузки процессора главным циклом: простой и активная работа.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_idle --seconds 3
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import time
+import pygame
+from editor.core import PixelArtEditor
+
+
+def measure_run(editor, seconds, events_interval=None):
+    """
+    Запускает PixelArtEditor.run на заданное время.
+    events_interval - период синтетических движений мыши в мс (None - простой).
+    Возвращает (загрузка процессора в %, число кадров).
+    """
+    editor.running = True
+    editor.request_redraw()
+    pygame.event.clear()
+    if events_interval:
+        motion = pygame.event.Event(pygame.MOUSEMOTION, pos=(640, 512), rel=(1, 0),
+                                    buttons=(0, 0, 0))
+        pygame.time.set_timer(motion, events_interval)
+    pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), loops=1)
+
+    frames = editor.frame_count
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    editor.run()
+    cpu = time.process_time() - cpu
+    wall = time.perf_counter() - wall
+
+    if events_interval:
+        pygame.time.set_timer(motion, 0)
+    return cpu / wall * 100, editor.frame_count - frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк простоя главного цикла")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--grid-size", type=int, default=128)
+    args = parser.parse_args(argv)
+
+    editor = PixelArtEditor(grid_size=args.grid_size, zoom=4)
+    print(f"{'режим':<10}{'ЦП, %':>8}{'кадров':>9}{'кадров/с':>11}")
+    for name, interval in (("простой", None), ("работа", 10)):
+        cpu, frames = measure_run(editor, args.seconds, interval)
+        print(f"{name:<10}{cpu:>8.1f}{frames:>9}{frames / args.seconds:>11.1f}")
+    editor.shutdown()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
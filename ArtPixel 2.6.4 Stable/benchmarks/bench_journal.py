@@ -0,0 +1,108 @@
+"""
+Бенчмарк журнала операций: воспроизведение журнала из 100 000 операций
+(штрихи карандаша, заливки прямоугольников, линии, изредка очистка холста).
+Пачечное воспроизведение Journal.replay сравнивается с применением каждой
+операции к массиву по отдельности; результаты должны совпадать.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_journal --ops 100000 --sizes 64 256 512
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import tempfile
+import time
+import numpy as np
+import pygame
+from editor.journal import Journal, FILL_PAYLOAD, RUN_DTYPE, OP_FILL, OP_RUNS
+
+
+def make_ops(count, size, seed=0):
+    """Детерминированный список операций (тип, данные) на холсте size x size"""
+    rng = np.random.default_rng(seed)
+    ops = []
+    colors = rng.integers(0, 2 ** 32, 64, dtype=np.uint32)
+    for kind in rng.random(count):
+        color = colors[rng.integers(64)]
+        if kind < 0.7:
+            # Штрих карандаша: несколько коротких отрезков рядом
+            runs = np.empty(rng.integers(1, 12), dtype=RUN_DTYPE)
+            runs['y'] = (rng.integers(size) + np.arange(runs.size)) % size
+            runs['x'] = rng.integers(0, size - 3, runs.size)
+            runs['n'] = rng.integers(1, 4, runs.size)
+            runs['c'] = color
+            ops.append((OP_RUNS, runs.tobytes()))
+        elif kind < 0.9:
+            # Заливка области
+            width, height = rng.integers(1, size // 4 + 2, 2)
+            x, y = rng.integers(0, size - width + 1), rng.integers(0, size - height + 1)
+            ops.append((OP_FILL, FILL_PAYLOAD.pack(x, y, width, height, color.tobytes())))
+        elif kind < 0.9995:
+            # Линия: по пикселю в строке
+            length = rng.integers(2, size + 1)
+            runs = np.empty(length, dtype=RUN_DTYPE)
+            runs['y'] = np.arange(length)
+            runs['x'] = np.arange(length) * (size - 1) // max(1, length - 1)
+            runs['n'] = 1
+            runs['c'] = color
+            ops.append((OP_RUNS, runs.tobytes()))
+        else:
+            ops.append((OP_FILL, FILL_PAYLOAD.pack(0, 0, size, size, bytes(4))))
+    return ops
+
+
+def apply_each(ops, size):
+    """Применение каждой операции к пустому массиву по отдельности"""
+    pixels = np.zeros((size, size), dtype=np.uint32)
+    for op, payload in ops:
+        if op == OP_FILL:
+            x, y, width, height, color = FILL_PAYLOAD.unpack(payload)
+            pixels[y:y + height, x:x + width] = np.frombuffer(color, dtype=np.uint32)[0]
+        else:
+            for x, y, n, c in np.frombuffer(payload, dtype=RUN_DTYPE).tolist():
+                pixels[y, x:x + n] = c
+    return pixels
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк журнала операций")
+    parser.add_argument("--ops", type=int, default=100000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256, 512])
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    print(f"{'размер':>8}{'операций':>10}{'журнал, КБ':>12}{'запись, мс':>12}"
+          f"{'по одной, мс':>14}{'журнал, мс':>12}{'операций/с':>12}{'совпадает':>11}")
+    for size in args.sizes:
+        ops = make_ops(args.ops, size, seed=size)
+        with tempfile.TemporaryDirectory() as directory:
+            # Сегмент начинается с пустого холста (две записи)
+            journal = Journal(directory)
+            journal.begin(pygame.Surface((size, size), pygame.SRCALPHA))
+            start = time.perf_counter()
+            for op, payload in ops:
+                journal.append(op, payload)
+            write_time = time.perf_counter() - start
+            journal.close()
+            journal_kb = sum(os.path.getsize(path) for _, path in journal.segments()) / 1024
+
+            start = time.perf_counter()
+            expected = apply_each(ops, size)
+            each_time = time.perf_counter() - start
+
+            start = time.perf_counter()
+            surface, applied = journal.replay()
+            replay_time = time.perf_counter() - start
+
+        replayed = np.frombuffer(pygame.image.tobytes(surface, "RGBA"), dtype=np.uint32)
+        match = "да" if applied == len(ops) + 2 and (replayed == expected.ravel()).all() else "НЕТ"
+        print(f"{size:>8}{len(ops):>10}{journal_kb:>12.0f}{write_time * 1000:>12.0f}"
+              f"{each_time * 1000:>14.0f}{replay_time * 1000:>12.0f}"
+              f"{applied / replay_time:>12.0f}{match:>11}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
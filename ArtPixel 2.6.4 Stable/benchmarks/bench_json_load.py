@@ -0,0 +1,99 @@
+"""
+Бенчмарк загрузки старых JSON проектов: разбор сетки пикселей в массив
+numpy против прежнего цикла с проверками и set_at на каждый пиксель.
+Отдельно показано время самого json.load, которое одинаково для обоих.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_json_load --sizes 64 128 256
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import tempfile
+import time
+import numpy as np
+import pygame
+from editor.file_io import save_to_json, load_from_json
+
+
+def legacy_load_from_json(filepath):
+    """Прежняя загрузка: проверка ключей и ограничение значений в Python, set_at на пиксель"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    surface = pygame.Surface((data['width'], data['height']), pygame.SRCALPHA)
+    for y, row in enumerate(data['pixels']):
+        for x, pixel in enumerate(row):
+            if not all(key in pixel for key in ['r', 'g', 'b', 'a']):
+                raise ValueError(f"Некорректный формат пикселя в позиции ({x}, {y})")
+            color = (
+                max(0, min(255, pixel['r'])),
+                max(0, min(255, pixel['g'])),
+                max(0, min(255, pixel['b'])),
+                max(0, min(255, pixel['a']))
+            )
+            surface.set_at((x, y), color)
+    return surface
+
+
+def make_surface(size):
+    """Холст со случайными пикселями (детерминированно)"""
+    rng = np.random.default_rng(size)
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    pixels = pygame.surfarray.pixels3d(surface)
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    pixels[:] = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+    alpha[:] = rng.integers(0, 256, (size, size), dtype=np.uint8)
+    del pixels, alpha  # Освобождаем блокировку поверхности
+    return surface
+
+
+def best_time(func, repeats):
+    """Лучшее время вызова в секундах и результат последнего вызова"""
+    best = None
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def same_pixels(first, second):
+    """Совпадают ли RGBA всех пикселей двух поверхностей"""
+    return (first.get_size() == second.get_size() and
+            pygame.image.tobytes(first, "RGBA") == pygame.image.tobytes(second, "RGBA"))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк загрузки JSON")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    print(f"{'размер':>8}{'json.load, мс':>15}{'старая, мс':>12}{'новая, мс':>12}"
+          f"{'ускорение':>11}{'совпадает':>11}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            path = os.path.join(directory, f"legacy_{size}.json")
+            save_to_json(make_surface(size), path, version=1)
+
+            def parse():
+                with open(path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+
+            parse_time, _ = best_time(parse, args.repeats)
+            legacy_time, legacy = best_time(lambda: legacy_load_from_json(path), args.repeats)
+            new_time, loaded = best_time(lambda: load_from_json(path), args.repeats)
+            match = "да" if same_pixels(legacy, loaded) else "НЕТ"
+            print(f"{size:>8}{parse_time * 1000:>15.1f}{legacy_time * 1000:>12.1f}"
+                  f"{new_time * 1000:>12.1f}{legacy_time / new_time:>10.1f}x{match:>11}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
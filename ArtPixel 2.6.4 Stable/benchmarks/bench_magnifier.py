@@ -0,0 +1,77 @@
+"""
+Бенчмарк лупы: subsurface + один transform.scale против прежнего
+попиксельного get_at/draw.rect.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_magnifier --zooms 2 8 16 --factors 0.5 4
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import math
+import random
+import time
+import pygame
+from editor.core import PixelArtEditor
+
+
+def legacy_magnifier(editor, canvas_pos, zoom_factor):
+    """Прежняя лупа: новая поверхность и draw.rect на каждый пиксель источника"""
+    rect_size = editor.magnifier_size
+    magnifier_surface = pygame.Surface((rect_size, rect_size), pygame.SRCALPHA)
+    px, py = canvas_pos
+    source_size = rect_size / (editor.zoom * zoom_factor)
+    src_x = max(0, px - source_size/2)
+    src_y = max(0, py - source_size/2)
+    src_x_end = min(editor.grid_size, src_x + source_size)
+    src_y_end = min(editor.grid_size, src_y + source_size)
+    cell_size = (rect_size / source_size) if source_size > 0 else 0
+    for y in range(int(src_y), int(src_y_end)):
+        for x in range(int(src_x), int(src_x_end)):
+            color = editor.canvas.get_at((x, y))
+            pygame.draw.rect(magnifier_surface, color,
+                             ((x - src_x) * cell_size, (y - src_y) * cell_size,
+                              math.ceil(cell_size), math.ceil(cell_size)))
+    return magnifier_surface
+
+
+def time_calls(func, repeats):
+    """Среднее время одного вызова в миллисекундах"""
+    func()  # Прогрев
+    start = time.perf_counter()
+    for _ in range(repeats):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк лупы")
+    parser.add_argument("--size", type=int, default=256)
+    parser.add_argument("--zooms", type=int, nargs="+", default=[1, 2, 8, 16])
+    parser.add_argument("--factors", type=float, nargs="+", default=[0.5, 4.0])
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    editor = PixelArtEditor(grid_size=args.size, zoom=1)
+    rng = random.Random(1)
+    for y in range(args.size):
+        for x in range(args.size):
+            editor.canvas.set_at((x, y), (rng.randrange(256), rng.randrange(256),
+                                          rng.randrange(256), 255))
+    center = (args.size // 2, args.size // 2)
+
+    print(f"{'масштаб':>8}{'лупа':>7}{'старая, мс':>13}{'новая, мс':>12}")
+    for zoom in args.zooms:
+        editor.zoom = zoom
+        for factor in args.factors:
+            legacy = time_calls(lambda: legacy_magnifier(editor, center, factor), args.repeats)
+            current = time_calls(lambda: editor.get_magnifier_view(center, factor), args.repeats)
+            print(f"{zoom:>8}{factor:>7.2f}{legacy:>13.2f}{current:>12.2f}")
+    editor.shutdown()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
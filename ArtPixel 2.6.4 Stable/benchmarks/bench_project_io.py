@@ -0,0 +1,114 @@
+"""
+Бенчмарк форматов проекта: время сохранения/загрузки, размер файла и пик
+памяти Python при записи (tracemalloc, отдельным проходом) для JSON версии 1
+(пиксель - словарь), JSON версии 2 (строки base64, с палитрой и без) и
+двоичного формата .apx (zlib и без сжатия).
+
+Холст заполняется двумя шаблонами: "sprite" - крупные одноцветные области,
+как в обычном пиксель-арте, и "noise" - случайные пиксели (худший случай для сжатия).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_project_io --sizes 64 256 512
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pygame
+from editor.file_io import (save_to_json, load_from_json, save_to_binary, load_from_binary,
+                            COMPRESSION_NONE, COMPRESSION_ZLIB, PROJECT_EXTENSION)
+
+FORMATS = ["json-v1", "json-v2", "json-v2-rgba", "apx", "apx-raw"]
+
+
+def make_surface(size, pattern):
+    """Холст с детерминированным содержимым"""
+    rng = np.random.default_rng(size)
+    if pattern == "noise":
+        rgba = rng.integers(0, 256, (size, size, 4), dtype=np.uint8)
+    else:
+        # Блоки 8x8 из палитры на 16 цветов и прозрачный фон
+        palette = rng.integers(0, 256, (16, 4), dtype=np.uint8)
+        palette[:, 3] = 255
+        palette[0] = 0
+        blocks = rng.integers(0, 16, ((size + 7) // 8, (size + 7) // 8))
+        rgba = palette[np.kron(blocks, np.ones((8, 8), dtype=int))[:size, :size]]
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    pixels = pygame.surfarray.pixels3d(surface)
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    pixels[:] = rgba[..., :3]
+    alpha[:] = rgba[..., 3]
+    del pixels, alpha  # Освобождаем блокировку поверхности
+    return surface
+
+
+def format_functions(name):
+    """(сохранение, загрузка, расширение) для формата"""
+    if name == "json-v1":
+        return (lambda surface, path: save_to_json(surface, path, version=1),
+                load_from_json, ".json")
+    if name.startswith("json-v2"):
+        use_palette = name == "json-v2"
+        return (lambda surface, path: save_to_json(surface, path, use_palette=use_palette),
+                load_from_json, ".json")
+    compression = COMPRESSION_ZLIB if name == "apx" else COMPRESSION_NONE
+    return (lambda surface, path: save_to_binary(surface, path, compression),
+            load_from_binary, PROJECT_EXTENSION)
+
+
+def best_time(func, repeats):
+    """Лучшее время вызова в секундах"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(func):
+    """Пик памяти Python во время вызова, в МБ"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк форматов проекта")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[64, 256])
+    parser.add_argument("--patterns", nargs="+", choices=["sprite", "noise"],
+                        default=["sprite", "noise"])
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=FORMATS)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    print(f"{'шаблон':<8}{'размер':>8}  {'формат':<14}{'запись, мс':>12}{'чтение, мс':>12}"
+          f"{'файл, КБ':>12}{'пик записи, МБ':>16}")
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes:
+            for pattern in args.patterns:
+                surface = make_surface(size, pattern)
+                for name in args.formats:
+                    save, load, extension = format_functions(name)
+                    path = os.path.join(directory, f"{pattern}_{size}{extension}")
+                    save_time = best_time(lambda: save(surface, path), args.repeats)
+                    load_time = best_time(lambda: load(path), args.repeats)
+                    file_kb = os.path.getsize(path) / 1024
+                    peak_mb = peak_memory(lambda: save(surface, path))
+                    print(f"{pattern:<8}{size:>8}  {name:<14}{save_time * 1000:>12.1f}"
+                          f"{load_time * 1000:>12.1f}{file_kb:>12.1f}{peak_mb:>16.2f}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
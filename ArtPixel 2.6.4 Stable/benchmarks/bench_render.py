@@ -0,0 +1,211 @@
+"""
+Набор бенчмарков отрисовки без окна: draw, draw_canvas, UI.draw, лупа и
+диалоги для разных размеров холста и масштабов. Результаты сохраняются в
+JSON и сравниваются с сохраненной базой с порогом регрессии.
+
+Каждый замер выполняется несколькими раундами вперемешку с остальными,
+чтобы фоновая нагрузка машины распределялась по всем замерам; по умолчанию
+сравнивается медиана всех кадров (--metric выбирает другую статистику).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_render --output render.json
+    python -m benchmarks.bench_render --baseline benchmarks/baselines/render.json
+
+Код возврата 1, если хотя бы один замер медленнее базы больше чем на порог.
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from unittest import mock
+import numpy as np
+import pygame
+from editor.core import PixelArtEditor
+
+DEFAULT_SIZES = [32, 128, 256, 512]
+DEFAULT_ZOOMS = [2, 16, 50]
+CASES = ["draw", "draw_canvas", "ui_draw", "magnifier",
+         "save_dialog", "resize_dialog", "open_dialog"]
+
+
+def fill_pattern(editor):
+    """Заполняет холст детерминированным шумом (полупрозрачные и пустые пиксели)"""
+    size = editor.grid_size
+    rng = np.random.default_rng(size)
+    pixels = pygame.surfarray.pixels3d(editor.canvas)
+    alpha = pygame.surfarray.pixels_alpha(editor.canvas)
+    pixels[:] = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+    alpha[:] = rng.choice(np.array([0, 128, 255], dtype=np.uint8), (size, size))
+    del pixels, alpha  # Освобождаем блокировку холста
+    editor.invalidate_canvas()
+
+
+def set_zoom(editor, zoom):
+    """Устанавливает масштаб и центрирует холст, как при открытии"""
+    editor.zoom = zoom
+    editor.canvas_x = editor.canvas_y = None
+    editor.update_canvas_position()
+
+
+def case_callable(editor, case):
+    """Функция одного кадра для замера"""
+    if case == "draw":
+        return editor.draw
+    if case == "draw_canvas":
+        return editor.draw_canvas
+    if case == "ui_draw":
+        return editor.ui.draw
+    if case == "magnifier":
+        return editor.draw_magnifier
+    if case == "save_dialog":
+        return editor.draw_save_dialog
+    if case == "resize_dialog":
+        return editor.draw_resize_dialog
+    if case == "open_dialog":
+        return editor.draw_open_dialog
+    raise ValueError(f"Неизвестный замер: {case}")
+
+
+def time_case(func, frames, dirty_rects):
+    """Время кадров в мс: первый вызов - прогрев кэшей, дальше frames замеров"""
+    func()
+    dirty_rects.clear()
+    samples = []
+    for _ in range(frames):
+        start = time.perf_counter_ns()
+        func()
+        samples.append((time.perf_counter_ns() - start) / 1e6)
+        dirty_rects.clear()  # Кадры не выводятся, список не должен расти
+    return samples
+
+
+def summarize(rounds):
+    """Статистика по раундам замеров одного случая"""
+    samples = [sample for round_samples in rounds for sample in round_samples]
+    ordered = sorted(samples)
+    return {
+        "best_ms": round(min(statistics.median(r) for r in rounds), 4),
+        "mean_ms": round(statistics.fmean(samples), 4),
+        "median_ms": round(statistics.median(samples), 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "min_ms": round(ordered[0], 4),
+    }
+
+
+def run_suite(sizes, zooms, cases, frames, rounds):
+    """Выполняет все замеры и возвращает список результатов"""
+    results = []
+    for size in sizes:
+        editor = PixelArtEditor(grid_size=size, zoom=zooms[0])
+        fill_pattern(editor)
+        editor.magnifier_active = True
+        editor.available_files = [f"project_{i}.json" for i in range(10)]
+        editor.save_input = "benchmark_project_name"
+        editor.resize_input = "128"
+        for zoom in zooms:
+            set_zoom(editor, zoom)
+            # Курсор над серединой видимой части холста (для лупы)
+            view = editor.get_canvas_area().clip(
+                pygame.Rect(editor.canvas_x, editor.canvas_y,
+                            editor.canvas_width, editor.canvas_height))
+            samples = {case: [] for case in cases}
+            with mock.patch("pygame.mouse.get_pos", return_value=view.center):
+                for _ in range(rounds):
+                    for case in cases:
+                        samples[case].append(time_case(case_callable(editor, case),
+                                                       frames, editor.dirty_rects))
+            for case in cases:
+                results.append({"case": case, "size": size, "zoom": zoom,
+                                **summarize(samples[case])})
+        editor.shutdown()
+    return results
+
+
+def compare(results, baseline, threshold, min_delta_ms, metric="median_ms"):
+    """
+    Сравнивает метрику metric с базой. Регрессия - замедление больше чем на threshold
+    (доля) и больше чем на min_delta_ms (отсекает шум очень быстрых замеров).
+    Возвращает список (результат, база, отношение, регрессия ли).
+    """
+    base = {(r["case"], r["size"], r["zoom"]): r for r in baseline["results"]}
+    rows = []
+    for result in results:
+        reference = base.get((result["case"], result["size"], result["zoom"]))
+        if reference is None:
+            continue
+        ratio = result[metric] / max(reference[metric], 1e-6)
+        regressed = (ratio > 1 + threshold and
+                     result[metric] - reference[metric] > min_delta_ms)
+        rows.append((result, reference, ratio, regressed))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Набор бенчмарков отрисовки")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--zooms", type=int, nargs="+", default=DEFAULT_ZOOMS)
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=CASES)
+    parser.add_argument("--frames", type=int, default=15, help="Кадров в одном раунде")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", help="Файл для результатов в JSON")
+    parser.add_argument("--baseline", help="JSON с базовыми результатами для сравнения")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Допустимое замедление (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.1,
+                        help="Минимальное замедление в мс, считающееся регрессией")
+    parser.add_argument("--metric", default="median_ms",
+                        choices=["best_ms", "median_ms", "mean_ms", "p95_ms", "min_ms"])
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    results = run_suite(args.sizes, args.zooms, args.cases, args.frames, args.rounds)
+    report = {
+        "meta": {
+            "frames": args.frames,
+            "rounds": args.rounds,
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+
+    print(f"{'замер':<15}{'размер':>8}{'масштаб':>9}{'лучшая, мс':>12}{'медиана, мс':>13}{'p95, мс':>10}")
+    for r in results:
+        print(f"{r['case']:<15}{r['size']:>8}{r['zoom']:>9}{r['best_ms']:>12.3f}"
+              f"{r['median_ms']:>13.3f}{r['p95_ms']:>10.3f}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"Результаты сохранены: {args.output}")
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        rows = compare(results, baseline, args.threshold, args.min_delta_ms, args.metric)
+        regressions = [row for row in rows if row[3]]
+        print(f"\nСравнение с {args.baseline} по {args.metric} (порог {args.threshold:.0%}):")
+        for result, reference, ratio, regressed in rows:
+            if regressed or ratio < 1 - args.threshold:
+                mark = "РЕГРЕССИЯ" if regressed else "ускорение"
+                print(f"  {mark:<10} {result['case']:<15}{result['size']:>5}{result['zoom']:>4}  "
+                      f"{reference[args.metric]:.3f} -> {result[args.metric]:.3f} мс ({ratio:.2f}x)")
+        print(f"Сравнено замеров: {len(rows)}, регрессий: {len(regressions)}")
+        exit_code = 1 if regressions else 0
+
+    pygame.quit()
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+"""
+Микробенчмарки алгоритмов инструментов (editor/tools.py): заливка на пустом
+холсте, лабиринте и шахматке, построение точек линии, прямоугольника и круга
+для радиусов до 512 и полный путь предпросмотра фигуры при перетаскивании.
+
+Для каждого замера выводится число операций в секунду, время одной операции
+и выделения на вызов: пик памяти Python (tracemalloc, включая массивы numpy)
+и число созданных pygame.Surface. Выделения считаются отдельным проходом,
+чтобы tracemalloc не искажал время.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_tools
+    python -m benchmarks.bench_tools --sizes 512 1024 --radii 128 512 --output tools.json
+"""
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import itertools
+import json
+import platform
+import time
+import tracemalloc
+import numpy as np
+import pygame
+from editor.core import PixelArtEditor
+from editor.utils import blit_exact, count_surface_allocations
+
+DEFAULT_SIZES = [128, 512, 1024]
+DEFAULT_RADII = [8, 32, 128, 512]
+GROUPS = ["flood_fill", "points", "preview"]
+SHAPE_TOOLS = {"line": "Линия", "rectangle": "Прямоугольник", "circle": "Круг"}
+
+WALL = (255, 255, 255, 255)
+FILL = (0, 122, 204, 255)
+
+
+def walls_empty(size):
+    """Пустой холст - заливается целиком"""
+    return np.zeros((size, size), dtype=bool)
+
+
+def walls_checkerboard(size):
+    """Шахматка - каждая клетка изолирована"""
+    x, y = np.indices((size, size))
+    return (x + y) % 2 == 1
+
+
+def walls_maze(size):
+    """
+    Лабиринт «двоичное дерево» с коридорами и стенами в 1 пиксель: все
+    коридоры связаны, заливка проходит их целиком через множество коротких отрезков.
+    """
+    walls = np.ones((size, size), dtype=bool)
+    cells = (size - 1) // 2
+    if cells < 1:
+        return walls
+    rng = np.random.default_rng(size)
+    walls[1:2 * cells:2, 1:2 * cells:2] = False  # Клетки в нечетных координатах [x, y]
+    carve_east = rng.random((cells, cells)) < 0.5
+    carve_east[:, 0] = True   # Верхний ряд: проход только на восток
+    carve_east[-1, :] = False  # Правый столбец: проход только на север
+    cx, cy = np.nonzero(carve_east)
+    walls[2 * cx + 2, 2 * cy + 1] = False
+    cx, cy = np.nonzero(~carve_east)
+    cx, cy = cx[cy > 0], cy[cy > 0]  # Правая верхняя клетка никуда не ведет
+    walls[2 * cx + 1, 2 * cy] = False
+    return walls
+
+
+FLOOD_PATTERNS = {
+    "empty": (walls_empty, (0, 0)),
+    "maze": (walls_maze, (1, 1)),
+    "checkerboard": (walls_checkerboard, (0, 0)),
+}
+
+
+def pattern_surface(walls):
+    """Поверхность шаблона по маске стен (массив [x, y])"""
+    size = walls.shape[0]
+    surface = pygame.Surface((size, size), pygame.SRCALPHA)
+    surface.fill((0, 0, 0, 0))
+    pixels = pygame.surfarray.pixels3d(surface)
+    alpha = pygame.surfarray.pixels_alpha(surface)
+    pixels[walls] = WALL[:3]
+    alpha[walls] = WALL[3]
+    del pixels, alpha  # Освобождаем блокировку поверхности
+    return surface
+
+
+def time_calls(func, setup=None, min_time=0.2, min_calls=3):
+    """
+    Вызывает func, пока суммарное время не превысит min_time (но не меньше
+    min_calls раз); setup перед каждым вызовом в замер не входит.
+    Возвращает (число вызовов, суммарное время в нс).
+    """
+    calls = 0
+    total = 0
+    limit = int(min_time * 1e9)
+    while calls < min_calls or total < limit:
+        if setup:
+            setup()
+        start = time.perf_counter_ns()
+        func()
+        total += time.perf_counter_ns() - start
+        calls += 1
+    return calls, total
+
+
+def measure_allocations(func, setup=None, calls=3):
+    """Средние на вызов: пик памяти Python в КБ и число созданных pygame.Surface"""
+    peak_total = 0
+    tracemalloc.start()
+    try:
+        with count_surface_allocations() as counter:
+            for _ in range(calls):
+                if setup:
+                    setup()
+                base = tracemalloc.get_traced_memory()[0]
+                tracemalloc.reset_peak()
+                surfaces_before = counter["surfaces"]
+                func()
+                peak_total += max(tracemalloc.get_traced_memory()[1] - base, 0)
+                surfaces = counter["surfaces"] - surfaces_before
+    finally:
+        tracemalloc.stop()
+    return peak_total / 1024 / calls, surfaces
+
+
+def measure(group, case, size, func, setup=None, min_time=0.2, alloc_calls=3, **extra):
+    """Один замер: время и выделения, результат - словарь для таблицы и JSON"""
+    func()  # Прогрев
+    calls, total_ns = time_calls(func, setup, min_time)
+    peak_kb, surfaces = measure_allocations(func, setup, alloc_calls)
+    return {"group": group, "case": case, "size": size,
+            "ops_per_sec": round(calls * 1e9 / total_ns, 2),
+            "us_per_op": round(total_ns / calls / 1000, 3),
+            "peak_kb_per_op": round(peak_kb, 2),
+            "surfaces_per_op": surfaces, **extra}
+
+
+def run_flood_fill(sizes, min_time):
+    """Заливка из угла шаблона; перед каждым вызовом холст восстанавливается"""
+    results = []
+    for size in sizes:
+        editor = PixelArtEditor(grid_size=size, zoom=1)
+        editor.color_manager.current_color = FILL
+        for name, (make_walls, seed) in FLOOD_PATTERNS.items():
+            pattern = pattern_surface(make_walls(size))
+
+            def setup():
+                blit_exact(editor.canvas, pattern, (0, 0))
+                editor.save_state()
+
+            def fill():
+                editor.tools.flood_fill(seed)
+
+            setup()
+            results.append(measure("flood_fill", name, size, fill, setup, min_time))
+        editor.shutdown()
+    return results
+
+
+def run_points(radii, min_time):
+    """Генераторы точек фигур; от размера холста они не зависят"""
+    editor = PixelArtEditor(grid_size=32, zoom=1)
+    tools = editor.tools
+    results = []
+    for radius in radii:
+        generators = {
+            "line": lambda: tools._get_line_points(0, 0, radius, radius // 2),
+            "rectangle": lambda: tools._get_rectangle_points(0, 0, radius, radius),
+            "circle": lambda: tools._get_circle_points(radius, radius, radius * 2, radius),
+        }
+        for name, func in generators.items():
+            results.append(measure("points", name, None, func, min_time=min_time,
+                                   radius=radius, points=len(func())))
+    editor.shutdown()
+    return results
+
+
+def drag_path(size, steps):
+    """Позиции курсора при перетаскивании: от центра холста к углу и обратно"""
+    center = size // 2
+    forward = [(center + (size - 1 - center) * i // steps,) * 2 for i in range(1, steps + 1)]
+    return forward + forward[-2:0:-1]
+
+
+def run_preview(sizes, steps, min_time):
+    """Предпросмотр фигуры через handle_tool_action, как при движении мыши"""
+    results = []
+    for size in sizes:
+        editor = PixelArtEditor(grid_size=size, zoom=1)
+        editor.color_manager.current_color = FILL
+        tools = editor.tools
+        start = (size // 2, size // 2)
+        path = drag_path(size, steps)
+        for name, tool in SHAPE_TOOLS.items():
+            tools.current_tool = tool
+            tools.handle_tool_action(start)  # Нажатие кнопки мыши
+            positions = itertools.cycle(path)
+
+            def drag():
+                tools.handle_tool_action(next(positions), is_dragging=True)
+
+            results.append(measure("preview", name, size, drag, min_time=min_time))
+            tools.restore_preview_area()
+            tools.reset_drawing_state()
+        editor.shutdown()
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Микробенчмарки инструментов")
+    parser.add_argument("--groups", nargs="+", choices=GROUPS, default=GROUPS)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="Размеры холста для заливки и предпросмотра")
+    parser.add_argument("--radii", type=int, nargs="+", default=DEFAULT_RADII,
+                        help="Радиусы (длины) фигур для генераторов точек")
+    parser.add_argument("--drag-steps", type=int, default=64,
+                        help="Позиций курсора на пути от центра к углу")
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Минимальное время замера одного случая, с")
+    parser.add_argument("--output", help="Файл для результатов в JSON")
+    args = parser.parse_args(argv)
+
+    pygame.init()
+    results = []
+    if "flood_fill" in args.groups:
+        results += run_flood_fill(args.sizes, args.min_time)
+    if "points" in args.groups:
+        results += run_points(args.radii, args.min_time)
+    if "preview" in args.groups:
+        results += run_preview(args.sizes, args.drag_steps, args.min_time)
+
+    print(f"{'группа':<12}{'случай':<14}{'размер':>8}{'оп/с':>12}{'мкс/оп':>12}"
+          f"{'КБ/оп':>10}{'Surface/оп':>12}")
+    for r in results:
+        size = r["size"] if r["size"] is not None else f"r={r['radius']}"
+        print(f"{r['group']:<12}{r['case']:<14}{size:>8}{r['ops_per_sec']:>12.1f}"
+              f"{r['us_per_op']:>12.1f}{r['peak_kb_per_op']:>10.1f}{r['surfaces_per_op']:>12}")
+
+    if args.output:
+        report = {
+            "meta": {
+                "min_time": args.min_time,
+                "drag_steps": args.drag_steps,
+                "python": platform.python_version(),
+                "pygame": pygame.version.ver,
+                "numpy": np.__version__,
+                "platform": platform.platform(),
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            },
+            "results": results,
+        }
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=1)
+        print(f"Результаты сохранены: {args.output}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+import zlib
+import pygame
+from typing import Dict, Optional, Set, Tuple
+from .file_io import atomic_write, surface_to_rgba, surface_from_rgba
+from .utils import blit_exact
+from .journal import Journal
+
+AUTOSAVE_DIRNAME = ".autosave"
+AUTOSAVE_MANIFEST = "manifest.json"
+AUTOSAVE_VERSION = 1
+AUTOSAVE_TILE = 64               # Сторона плитки в пикселях холста
+AUTOSAVE_DELAY_MS = 2000         # Пауза после последнего изменения перед записью
+AUTOSAVE_MAX_DELAY_MS = 15000    # Предел ожидания при непрерывном рисовании
+_TILE_NAME = re.compile(r"tile_(\d+)x(\d+)_(\d+)_(\d+)\.bin$")
+
+
+def _tile_name(size: Tuple[int, int], tx: int, ty: int) -> str:
+    # Размер холста в имени: полная запись нового размера не портит плитки,
+    # на которые ссылается прежний манифест
+    return f"tile_{size[0]}x{size[1]}_{tx}_{ty}.bin"
+
+
+class Autosave:
+    """
+    Автосохранение холста плитками в отдельную папку. Изменения отмечаются
+    через mark()/mark_all(); tick() из главного цикла после паузы снимает
+    только измененные плитки и пишет их в фоновом потоке. Если ничего не
+    изменилось, запись не выполняется. Манифест пишется последним.
+    С журналом операций (journal) каждая запись плиток - контрольная точка,
+    после которой журнал начинается заново; при восстановлении журнал
+    воспроизводится поверх плиток.
+    """
+
+    def __init__(self, directory: str, tile_size: int = AUTOSAVE_TILE,
+                 delay_ms: int = AUTOSAVE_DELAY_MS, max_delay_ms: int = AUTOSAVE_MAX_DELAY_MS,
+                 journal: Optional[Journal] = None):
+        self.directory = directory
+        self.journal = journal
+        self.tile_size = tile_size
+        self.delay_ms = delay_ms
+        self.max_delay_ms = max_delay_ms
+        self.enabled = False  # Включается start() из главного цикла
+        self.paused = False   # Пока пользователь не решил судьбу найденного автосохранения
+        self._dirty: Set[Tuple[int, int]] = set()
+        self._disk_size = None  # Размер холста в записанном автосохранении
+        self._first_change = None
+        self._last_change = None
+        self._lock = threading.Lock()
+        self._thread = None
+        # Статистика для отладки и бенчмарков
+        self.checkpoints = 0
+        self.tiles_written = 0
+        self.last_duration_ms = 0.0
+
+    @property
+    def pending(self) -> bool:
+        """Есть ли изменения, еще не записанные в автосохранение"""
+        return bool(self._dirty)
+
+    @property
+    def writing(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, canvas: Optional[pygame.Surface] = None) -> bool:
+        """Включает автосохранение. Возвращает True, если найдено прежнее для восстановления"""
+        self.enabled = True
+        self.paused = self.has_checkpoint()
+        if not self.paused and canvas is not None:
+            self.resume(canvas)
+        return self.paused
+
+    def resume(self, canvas: pygame.Surface) -> None:
+        """Продолжает работу после решения о найденном автосохранении; журнал - с текущего холста"""
+        self.paused = False
+        if self.journal is not None:
+            self.journal.begin(canvas)
+
+    def record(self, topleft: Tuple[int, int], before: pygame.Surface,
+               after: pygame.Surface, full: bool = False) -> None:
+        """Записывает изменение холста в журнал операций"""
+        if self.journal is not None and self.enabled and not self.paused:
+            self.journal.record(topleft, before, after, full)
+
+    def _grid(self, size: Tuple[int, int]) -> Tuple[int, int]:
+        return (-(-size[0] // self.tile_size), -(-size[1] // self.tile_size))
+
+    def _tile_rect(self, tx: int, ty: int, size: Tuple[int, int]) -> pygame.Rect:
+        rect = pygame.Rect(tx * self.tile_size, ty * self.tile_size, self.tile_size, self.tile_size)
+        return rect.clip(pygame.Rect((0, 0), size))
+
+    def _note_change(self, now: int) -> None:
+        if self._first_change is None:
+            self._first_change = now
+        self._last_change = now
+
+    def mark(self, rect, canvas_size: Tuple[int, int], now: Optional[int] = None) -> None:
+        """Отмечает измененную область холста"""
+        if canvas_size != self._disk_size:
+            self.mark_all(canvas_size, now)
+            return
+        rect = pygame.Rect(rect).clip(pygame.Rect((0, 0), canvas_size))
+        if not rect.width or not rect.height:
+            return
+        tile = self.tile_size
+        with self._lock:
+            for ty in range(rect.top // tile, (rect.bottom - 1) // tile + 1):
+                for tx in range(rect.left // tile, (rect.right - 1) // tile + 1):
+                    self._dirty.add((tx, ty))
+        self._note_change(pygame.time.get_ticks() if now is None else now)
+
+    def mark_all(self, canvas_size: Tuple[int, int], now: Optional[int] = None) -> None:
+        """Отмечает весь холст (новый размер, загрузка файла)"""
+        columns, rows = self._grid(canvas_size)
+        with self._lock:
+            self._dirty.update((tx, ty) for ty in range(rows) for tx in range(columns))
+        self._note_change(pygame.time.get_ticks() if now is None else now)
+
+    def due_in_ms(self, now: int) -> Optional[int]:
+        """Через сколько мс пора записывать (None - записывать нечего)"""
+        if not self.enabled or self.paused or not self._dirty or self._last_change is None:
+            return None
+        if self.journal is not None and self.journal.needs_compaction:
+            return 0  # Журнал разросся - пора сжать его в контрольную точку
+        due = min(self._last_change + self.delay_ms, self._first_change + self.max_delay_ms)
+        return max(0, due - now)
+
+    def tick(self, canvas: pygame.Surface, now: Optional[int] = None) -> bool:
+        """Запускает запись, если подошло время. Возвращает True, если запись начата"""
+        now = pygame.time.get_ticks() if now is None else now
+        due = self.due_in_ms(now)
+        if due is None or due > 0 or self.writing:
+            return False
+        return self.checkpoint(canvas)
+
+    def checkpoint(self, canvas: pygame.Surface, wait: bool = False) -> bool:
+        """
+        Снимает измененные плитки холста (в потоке интерфейса, это быстро)
+        и пишет их в фоне. wait=True - дождаться записи (при выходе).
+        """
+        if not self.enabled or self.paused or self.writing:
+            return False
+        size = canvas.get_size()
+        with self._lock:
+            tiles, self._dirty = self._dirty, set()
+        self._first_change = self._last_change = None
+        if not tiles:
+            return False
+
+        full = size != self._disk_size
+        columns, rows = self._grid(size)
+        if full:
+            # На диске нет холста этого размера - пишем все плитки
+            tiles = {(tx, ty) for ty in range(rows) for tx in range(columns)}
+        snapshot: Dict[Tuple[int, int], bytes] = {}
+        for tx, ty in tiles:
+            if tx < columns and ty < rows:
+                snapshot[(tx, ty)] = surface_to_rgba(canvas.subsurface(self._tile_rect(tx, ty, size)))
+        self._disk_size = size
+
+        manifest = {"version": AUTOSAVE_VERSION, "width": size[0], "height": size[1],
+                    "tile": self.tile_size, "saved_at": time.time()}
+        if self.journal is not None:
+            # Снимок включает все записанные операции - дальше новый сегмент
+            generation = self.journal.rotate()
+            if generation is not None:
+                manifest["journal"] = generation
+        self._thread = threading.Thread(target=self._write, args=(snapshot, manifest, full),
+                                        name="autosave", daemon=True)
+        self._thread.start()
+        if wait:
+            self.wait()
+        return True
+
+    def _write(self, snapshot, manifest, full: bool) -> None:
+        start = time.perf_counter()
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            size = (manifest["width"], manifest["height"])
+            for (tx, ty), pixels in snapshot.items():
+                with atomic_write(os.path.join(self.directory, _tile_name(size, tx, ty))) as f:
+                    f.write(zlib.compress(pixels, 1))
+            with atomic_write(os.path.join(self.directory, AUTOSAVE_MANIFEST), 'w', encoding='utf-8') as f:
+                json.dump(manifest, f)
+            if full:
+                self._remove_stale_tiles(size)
+            if "journal" in manifest:
+                self.journal.remove_before(manifest["journal"])
+            self.checkpoints += 1
+            self.tiles_written += len(snapshot)
+        except Exception as e:
+            logging.error(f"Ошибка автосохранения: {str(e)}")
+            # Плитки остаются измененными, повторная попытка - после обычной паузы
+            with self._lock:
+                self._dirty.update(snapshot)
+            if full:
+                self._disk_size = None
+            self._note_change(pygame.time.get_ticks())
+        self.last_duration_ms = (time.perf_counter() - start) * 1000
+
+    def _remove_stale_tiles(self, size: Tuple[int, int]) -> None:
+        """Удаляет плитки холстов другого размера"""
+        for name in os.listdir(self.directory):
+            match = _TILE_NAME.match(name)
+            if match and (int(match.group(1)), int(match.group(2))) != size:
+                os.remove(os.path.join(self.directory, name))
+
+    def reset_pending(self) -> None:
+        """Забывает отмеченные изменения (холст совпадает с записанным автосохранением)"""
+        with self._lock:
+            self._dirty.clear()
+        self._first_change = self._last_change = None
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Дожидается фоновой записи"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def close(self) -> None:
+        """Дожидается записи и закрывает журнал (при выходе)"""
+        self.wait()
+        if self.journal is not None:
+            self.journal.close()
+
+    def has_checkpoint(self) -> bool:
+        if os.path.exists(os.path.join(self.directory, AUTOSAVE_MANIFEST)):
+            return True
+        return self.journal is not None and bool(self.journal.segments())
+
+    def load(self) -> Optional[pygame.Surface]:
+        """
+        Собирает холст из плиток и воспроизводит поверх журнал
+        (None - восстановить не удалось)
+        """
+        surface, generation = None, 0
+        if os.path.exists(os.path.join(self.directory, AUTOSAVE_MANIFEST)):
+            surface, generation = self._load_tiles()
+            if surface is None:
+                return None
+        if self.journal is None:
+            return surface
+        replayed, applied = self.journal.replay(surface, generation)
+        if applied:
+            # Плитки на диске отстают от холста - следующая запись будет полной
+            self._disk_size = None
+        return replayed if replayed is not None else surface
+
+    def _load_tiles(self) -> Tuple[Optional[pygame.Surface], int]:
+        """Холст из плиток и поколение журнала после них"""
+        try:
+            with open(os.path.join(self.directory, AUTOSAVE_MANIFEST), encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get("version") != AUTOSAVE_VERSION or manifest.get("tile") != self.tile_size:
+                raise ValueError("Несовместимое автосохранение")
+            size = (manifest["width"], manifest["height"])
+            surface = pygame.Surface(size, pygame.SRCALPHA)
+            columns, rows = self._grid(size)
+            for ty in range(rows):
+                for tx in range(columns):
+                    rect = self._tile_rect(tx, ty, size)
+                    with open(os.path.join(self.directory, _tile_name(size, tx, ty)), 'rb') as f:
+                        pixels = zlib.decompress(f.read())
+                    if len(pixels) != rect.width * rect.height * 4:
+                        raise ValueError(f"Плитка ({tx}, {ty}) повреждена")
+                    blit_exact(surface, surface_from_rgba(pixels, rect.width, rect.height), rect.topleft)
+            self._disk_size = size
+            return surface, manifest.get("journal", 0)
+        except Exception as e:
+            logging.error(f"Не удалось восстановить автосохранение: {str(e)}")
+            return None, 0
+
+    def discard(self) -> None:
+        """Удаляет автосохранение и журнал; следующая запись будет полной"""
+        self.wait()
+        if self.journal is not None:
+            self.journal.discard()
+        try:
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if name == AUTOSAVE_MANIFEST or _TILE_NAME.match(name):
+                        os.remove(os.path.join(self.directory, name))
+        except OSError as e:
+            logging.error(f"Ошибка удаления автосохранения: {str(e)}")
+        self._disk_size = None
@@ -1,5 +1,6 @@
 import pygame
 import colorsys
+import numpy as np
 import logging
 from typing import Tuple
 
@@ -29,11 +30,7 @@ class ColorManager:
             rgb = self.hsv_to_rgb(self.hue, self.sv_s, self.sv_v)
             self.current_color = (*rgb, int(self.alpha * 255))
             print(f"Новый цвет: {self.current_color}")  # Отладка
-
-            # Обновляем UI и перерисовываем экран
-            if hasattr(self.editor, 'ui'):
-                self.editor.ui.draw()
-                pygame.display.update()
+            # Палитра перерисуется в следующем кадре, вывод - в PixelArtEditor.present
 
         except Exception as e:
             print(f"Ошибка обновления цвета: {str(e)}")
@@ -43,6 +40,29 @@ class ColorManager:
         r, g, b = colorsys.hsv_to_rgb(h, s, v)
         return (int(r * 255), int(g * 255), int(b * 255))
     
+    @staticmethod
+    def hsv_to_rgb_array(h, s, v) -> np.ndarray:
+        """
+        Векторная версия hsv_to_rgb для массивов numpy (с теми же округлениями).
+        Возвращает массив uint8 формы (..., 3).
+        """
+        h, s, v = np.broadcast_arrays(np.asarray(h, dtype=np.float64),
+                                      np.asarray(s, dtype=np.float64),
+                                      np.asarray(v, dtype=np.float64))
+        sector = np.floor(h * 6.0)
+        f = h * 6.0 - sector
+        p = v * (1.0 - s)
+        q = v * (1.0 - s * f)
+        t = v * (1.0 - s * (1.0 - f))
+        sector = sector.astype(np.int64) % 6
+
+        # Те же шесть секторов, что и в colorsys.hsv_to_rgb
+        conditions = [sector == i for i in range(6)]
+        r = np.select(conditions, [v, q, p, p, t, v])
+        g = np.select(conditions, [t, v, v, q, p, p])
+        b = np.select(conditions, [p, p, t, v, v, q])
+        return (np.stack([r, g, b], axis=-1) * 255).astype(np.uint8)
+
     def update_hue(self, y: int) -> None:
         """Обновляет оттенок цвета"""
         if y < 0:
@@ -6,6 +6,26 @@ UI_ACCENT_COLOR = (62, 62, 64)
 UI_HIGHLIGHT_COLOR = (0, 122, 204)
 UI_TEXT_COLOR = (241, 241, 241)
 GRID_COLOR = (60, 60, 60)
+GRID_MAJOR_COLOR = (95, 95, 100)
+
+# Детализация сетки: ниже GRID_MIN_SPACING пикселей между линиями сетка
+# не рисуется, до GRID_FADE_SPACING - плавно проявляется
+GRID_MIN_SPACING = 4
+GRID_FADE_SPACING = 8
+
+# Коэффициент лупы относительно текущего масштаба (< 1 - уменьшение)
+MAGNIFIER_DEFAULT_FACTOR = 4.0
+MAGNIFIER_MIN_FACTOR = 0.25
+MAGNIFIER_MAX_FACTOR = 16.0
+
+# Бюджет памяти истории отмены (в байтах)
+HISTORY_MAX_BYTES = 64 * 1024 * 1024
+
+# Сколько измененных областей холста копить до кадра, прежде чем перерисовать холст целиком
+CANVAS_DAMAGE_MAX_RECTS = 256
+
+# Как часто обновлять строку статистики кадра в панели информации
+INFO_STATS_REFRESH_MS = 500
 
 # Горячие клавиши
 SHORTCUTS = {
@@ -13,8 +33,10 @@ SHORTCUTS = {
         "GRID": "G - Сетка",
         "RESIZE": "R - Размер холста",
         "MAGNIFIER": "M - Лупа",
+        "MAGNIFIER_FACTOR": "[ / ] - Увеличение лупы",
         "ZOOM": "Alt + Колесо - Масштаб",
-        "FULLSCREEN": "F11 - Полный экран"
+        "FULLSCREEN": "F11 - Полный экран",
+        "PROFILER": "F3 - Время кадра"
     },
     "EDIT": {
         "UNDO": "Ctrl + Z - Отмена",
@@ -25,4 +47,4 @@ SHORTCUTS = {
         "SAVE": "Ctrl + S - Сохранить",
         "OPEN": "Ctrl + O - Открыть"
     }
-}
\ No newline at end of file
+}
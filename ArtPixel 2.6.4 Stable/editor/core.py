@@ -6,9 +6,21 @@ from typing import Optional, Tuple, List
 from .ui import UI
 from .tools import Tools
 from .color import ColorManager
-from .file_io import (save_artwork, load_from_json, 
+from .history import History, HistoryEntry
+from .profiler import FrameProfiler
+from .tracing import tracer, traced
+from .constants import (HISTORY_MAX_BYTES, GRID_MAJOR_COLOR, MAGNIFIER_DEFAULT_FACTOR,
+                        MAGNIFIER_MIN_FACTOR, MAGNIFIER_MAX_FACTOR, CANVAS_DAMAGE_MAX_RECTS)
+from .utils import blit_exact, truncate_text_start
+from .render import (CheckerboardCache, GridOverlayCache, ScaledCanvasCache,
+                     SurfacePool, TextCache, CANVAS_CHECKER_COLORS, merge_rects)
+from .file_io import (load_surface, get_save_directory,
                      get_available_files as get_files)
+from .saving import SaveWorker, SaveJob
+from .autosave import Autosave, AUTOSAVE_DIRNAME
+from .journal import Journal
 import math
+import time
 
 # Настраиваем логгер для корректной работы с русскими символами
 logging.basicConfig(
@@ -67,6 +79,10 @@ class PixelArtEditor:
         # Новые атрибуты для завершения работы
         self.is_closing = False
         self.has_unsaved_changes = False
+        # Счетчик изменений холста и фоновые сохранения со значением счетчика
+        # на момент отправки: флаг снимается только успешным сохранением
+        self.change_count = 0
+        self._saves_in_flight: List[Tuple[SaveJob, int]] = []
 
     def _init_basic_params(self, width, height, grid_size, zoom):
         """Инициализация базовых параметров"""
@@ -76,12 +92,29 @@ class PixelArtEditor:
         self.base_zoom = zoom
         self.zoom = zoom
         self.show_grid = True
+        self.grid_major_every = 0  # Основные линии сетки через N клеток (0 - выключено)
         self.canvas = pygame.Surface((grid_size, grid_size), pygame.SRCALPHA)
         self.canvas.fill((0, 0, 0, 0))
 
+        # Кэш шахматного фона прозрачности (общий с UI)
+        self.checker_cache = CheckerboardCache()
+        self.grid_cache = GridOverlayCache()
+        # Увеличенная копия холста, обновляемая по измененным областям
+        self.scaled_canvas = ScaledCanvasCache()
+        # Экран хранит прошлый кадр: перерисовываются только измененные
+        # области холста (None - весь холст) и места прошлых оверлеев
+        self._canvas_damage: Optional[List[pygame.Rect]] = None
+        self._drawn_view = None
+        self._overlay_rects: List[pygame.Rect] = []
+        self._full_redraw = True  # Первый кадр, диалог или новый размер окна
+
         # Инициализация шрифтов
         self.font = pygame.font.SysFont("Segoe UI", 12)
         self.large_font = pygame.font.SysFont("Segoe UI", 14, bold=True)
+        # Кэш отрисованных надписей (общий с UI)
+        self.text_cache = TextCache()
+        # Затемнение и тени диалогов переиспользуются между кадрами
+        self.surface_pool = SurfacePool()
 
     def _init_managers(self):
         """Инициализация менеджеров компонентов"""
@@ -102,9 +135,9 @@ class PixelArtEditor:
 
         # Добавляем новые атрибуты
         self.magnifier_active = False
-        self.magnifier_zoom_factor = 1.0
+        self.magnifier_zoom_factor = MAGNIFIER_DEFAULT_FACTOR  # Любой коэффициент, < 1 - уменьшение
         self.magnifier_size = 200
-        self.magnifier_mode = "zoom"
+        self.magnifier_buffer = None  # Переиспользуемый буфер увеличенного фрагмента
         self.last_zoom = self.zoom  # Исправляем здесь - используем self.zoom вместо zoom
         self.zoom_center = None
         
@@ -148,6 +181,9 @@ class PixelArtEditor:
         """Инициализация состояний приложения"""
         self.running = True
         self.clock = pygame.time.Clock()
+        self.max_fps = 60
+        self.needs_redraw = True  # Перерисовка только по событиям и таймерам
+        self.idle_wakeup_ms = 1000  # Максимальное время ожидания событий в простое
         
         # Добавляем атрибуты для обработки событий мыши
         self.mouse_pressed = False
@@ -167,11 +203,23 @@ class PixelArtEditor:
         # Добавляем обработку курсора
         self.default_cursor = pygame.SYSTEM_CURSOR_ARROW
         self.move_cursor = pygame.SYSTEM_CURSOR_SIZEALL
-        pygame.mouse.set_cursor(self.default_cursor)
+        try:
+            pygame.mouse.set_cursor(self.default_cursor)
+        except pygame.error:
+            pass  # Системные курсоры недоступны (например, SDL_VIDEODRIVER=dummy)
 
         self.is_zooming = False
         self.allow_drawing = True  # Новый флаг для контроля рисования
 
+        # Области экрана, измененные за кадр, и статистика вывода
+        self.dirty_rects: List[pygame.Rect] = []
+        self.frame_count = 0
+        self.pixels_pushed = 0  # Пикселей выведено в последнем кадре
+
+        # Время кадра по этапам (оверлей - F3, выгрузка - Shift+F3)
+        self.profiler = FrameProfiler()
+        self.show_profiler = False
+
         self.wheel_active = False  # Новый флаг для колеса мыши
         self.wheel_cooldown = 0  # Добавляем задержку после прокрутки
 
@@ -189,6 +237,15 @@ class PixelArtEditor:
         self.save_input = ""
         self.save_dialog_ok_rect = None
         self.save_dialog_cancel_rect = None
+        self.save_worker = SaveWorker()  # Запись файлов в фоновом потоке
+
+        # Автосохранение измененных плиток с журналом операций (включается в run)
+        # и диалог восстановления
+        autosave_dir = os.path.join(get_save_directory(), AUTOSAVE_DIRNAME)
+        self.autosave = Autosave(autosave_dir, journal=Journal(autosave_dir))
+        self.recovery_dialog_active = False
+        self.recovery_dialog_ok_rect = None
+        self.recovery_dialog_cancel_rect = None
 
         # Добавляем атрибуты для диалога открытия
         self.open_dialog_active = False
@@ -215,12 +272,16 @@ class PixelArtEditor:
 
     def _init_history(self):
         """Инициализация системы истории"""
-        self.history: List[pygame.Surface] = []
-        self.history_index = -1
-        self.max_history = 200  # Увеличиваем буфер истории
+        self.history = History(HISTORY_MAX_BYTES)  # Бюджет памяти задается в байтах
         self.undo_delay = 50    # Задержка между повторами (мс)
         self.undo_next = 0      # Время следующего повтора
-        self.save_state()
+
+        # Транзакции: штрих, заливка или фигура - одна запись в истории
+        self._transaction_depth = 0
+        self._dirty_rect = None  # Измененная область текущей транзакции
+
+        # Состояние холста на момент последней записи истории
+        self._history_base = self.canvas.copy()
 
     def update_canvas_position(self):
         """Обновление позиции холста при изменении размера окна"""
@@ -241,28 +302,91 @@ class PixelArtEditor:
             self.canvas_y = max(min(self.canvas_y, max_y), 0)
 
     def run(self):
-        """Основной цикл приложения"""
+        """Основной цикл приложения: перерисовка только при изменениях"""
+        # Найдено автосохранение после аварийного завершения - предлагаем восстановить
+        if self.autosave.start(self.canvas):
+            self.recovery_dialog_active = True
         while self.running:
             try:
-                # Обработка всех событий
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        self.running = False
-                        break
-                    if not self.is_closing:
-                        self.handle_events(event)
-                
-                # Отрисовка только если не закрываемся
-                if self.running and not self.is_closing:
-                    self.draw()
-                    pygame.display.flip()
+                # Обработка всех событий (в простое ждем их, не нагружая процессор)
+                events = self._wait_events()
+                self.profiler.begin_frame()
+                with self.profiler.stage("events"):
+                    for event in events:
+                        if event.type == pygame.QUIT:
+                            self.running = False
+                            break
+                        if not self.is_closing:
+                            self.handle_events(event)
+                        self.request_redraw()
+
+                # Результаты фоновых сохранений
+                self._finish_saves()
+
+                # Автосохранение после паузы в изменениях (запись - в фоне)
+                if not self.is_closing:
+                    self.tick_autosave()
                 
-                self.clock.tick(60)
+                # Отрисовка только если не закрываемся и что-то изменилось
+                if self.running and not self.is_closing and self.needs_redraw:
+                    self.needs_redraw = False
+                    with tracer.span("frame", "frame"):
+                        self.draw()
+                        with self.profiler.stage("present"):
+                            self.present()
+                    self.profiler.end_frame()
+                    self.clock.tick(self.max_fps)  # Ограничиваем частоту при активности
                 
             except Exception as e:
                 print(f"Ошибка в цикле: {str(e)}")
                 self.running = False
 
+    def tick_autosave(self, now: Optional[int] = None) -> bool:
+        """
+        Автосохранение, если подошло время. Плитки берутся из последнего
+        зафиксированного состояния: предпросмотр фигуры и незавершенный
+        штрих на холсте еще не правки и в автосохранение не попадают.
+        """
+        return self.autosave.tick(self._history_base, now)
+
+    def request_redraw(self) -> None:
+        """Запрашивает перерисовку в следующей итерации цикла"""
+        self.needs_redraw = True
+
+    def _wait_events(self) -> List[pygame.event.Event]:
+        """Возвращает события; если перерисовывать нечего - ждет их"""
+        if self.needs_redraw:
+            return pygame.event.get()
+
+        timeout = self._next_wakeup()
+        event = pygame.event.wait(self.idle_wakeup_ms if timeout is None else max(1, timeout))
+        if event.type == pygame.NOEVENT:
+            # Проснулись по таймеру: обновляем только активные эффекты
+            if timeout is not None:
+                self.request_redraw()
+            return []
+        return [event] + pygame.event.get()
+
+    def _next_wakeup(self) -> Optional[int]:
+        """Через сколько мс нужен кадр для анимаций (None - не нужен)"""
+        current_time = pygame.time.get_ticks()
+        wakeups = []
+        if self.save_dialog_active or self.resize_dialog_active:
+            # Мигание курсора в поле ввода
+            wakeups.append(500 - current_time % 500)
+            # Удаление символов при удержании Backspace
+            if pygame.key.get_pressed()[pygame.K_BACKSPACE]:
+                wakeups.append(self.backspace_next - current_time)
+        # Прогресс фонового сохранения и скрытие его результата
+        save_wakeup = self.save_worker.status_wakeup_ms()
+        if save_wakeup is not None:
+            wakeups.append(save_wakeup)
+        # Время очередного автосохранения
+        autosave_wakeup = self.autosave.due_in_ms(current_time)
+        if autosave_wakeup is not None:
+            wakeups.append(max(1, autosave_wakeup))
+        return min(wakeups) if wakeups else None
+
     def shutdown(self):
         """Корректное завершение редактора"""
         if self.is_closing:
@@ -270,6 +394,22 @@ class PixelArtEditor:
             
         self.is_closing = True
         self.running = False
+
+        # Дожидаемся начатых сохранений, чтобы не потерять файлы
+        self.save_worker.stop()
+        self._finish_saves()
+
+        # Несохраненная работа остается в автосохранении, иначе оно не нужно
+        if self.autosave.enabled and not self.autosave.paused:
+            self.autosave.wait()
+            if self.has_unsaved_changes:
+                self.autosave.checkpoint(self._history_base, wait=True)
+            else:
+                self.autosave.discard()
+        self.autosave.close()
+
+        # Сохраняем накопленную трассировку (если она включена)
+        tracer.flush()
         
         # Очищаем ресурсы
         self.canvas = None
@@ -309,7 +449,9 @@ class PixelArtEditor:
                 self.screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
                 
             self.is_fullscreen = not self.is_fullscreen
+            self.surface_pool.clear()  # Затемнение прежнего размера больше не нужно
             self.update_canvas_position()  # Обновляем позицию холста
+            self.request_full_redraw()  # Новый экран не хранит прошлый кадр
             
         except Exception as e:
             print(f"Ошибка переключения режима экрана: {str(e)}")
@@ -320,6 +462,11 @@ class PixelArtEditor:
             return
 
         try:
+            # Окно было перекрыто или восстановлено - содержимое экрана потеряно
+            if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                self.request_full_redraw()
+                return
+
             # Добавляем обработку колесика мыши для скроллинга в диалоге открытия
             if event.type == pygame.MOUSEWHEEL and self.open_dialog_active:
                 self.files_scroll_offset -= event.y * self.files_scroll_speed
@@ -332,7 +479,8 @@ class PixelArtEditor:
                     return self.handle_zoom(event.y, pygame.mouse.get_pos())  # Убираем минус перед event.y
             
             # Проверка активных диалогов
-            if self.resize_dialog_active or self.save_dialog_active or self.open_dialog_active:
+            if (self.resize_dialog_active or self.save_dialog_active or self.open_dialog_active or
+                    self.recovery_dialog_active):
                 return self._handle_dialog_events(event)
             
             # Обработка остальных событий мыши
@@ -453,6 +601,9 @@ class PixelArtEditor:
             # Обновляем размеры холста
             self.canvas_width = self.grid_size * self.zoom
             self.canvas_height = self.grid_size * self.zoom
+            self.checker_cache.invalidate()
+            self.grid_cache.invalidate()
+            self.scaled_canvas.invalidate()
 
             # Обновляем позицию холста, сохраняя позицию курсора
             self.canvas_x = mouse_pos[0] - (rel_x * self.zoom)
@@ -484,50 +635,219 @@ class PixelArtEditor:
                         self.resize_input = self.resize_input[:-1]
                         self.backspace_next = current_time + self.backspace_interval
 
-            # Очищаем экран один раз
-            self.screen.fill(self.colors['bg'])
-            
-            # Рисуем все элементы в правильном порядке
-            self.draw_canvas()  # Холст всегда первый
-            
-            # Если нет активных диалогов - обновляем и рисуем UI
-            if not (self.resize_dialog_active or self.save_dialog_active or self.open_dialog_active):
-                # Обновляем позицию цветовой панели один раз
-                if hasattr(self.ui, 'color_picker_rect'):
-                    self.ui.color_picker_rect.x = self.screen.get_width() - self.side_panel_width + self.ui.panel_margin
-                # Отрисовка UI
-                self.ui.draw()
-            
+            dialog_active = (self.resize_dialog_active or self.save_dialog_active or
+                             self.open_dialog_active or self.recovery_dialog_active)
+            view = self._view_state()
+            # Целиком: первый кадр, диалог, новый размер окна
+            full = self._full_redraw or dialog_active or view[0] != self._drawn_view[0]
+            # Диалог закрылся - под затемнением нужен весь экран
+            self._full_redraw = dialog_active
+            if hasattr(self.ui, 'color_picker_rect'):
+                self.ui.color_picker_rect.x = self.screen.get_width() - self.side_panel_width + self.ui.panel_margin
+
+            if full:
+                # Очищаем экран и рисуем все элементы в правильном порядке
+                self.screen.fill(self.colors['bg'])
+                with self.profiler.stage("canvas"):
+                    self.draw_canvas()  # Холст всегда первый
+                # Если нет активных диалогов - рисуем UI целиком
+                if not dialog_active:
+                    with self.profiler.stage("ui"):
+                        self.ui.draw(full=True)
+                # Кадр выводится целиком (в том числе затемнение диалога)
+                self.add_dirty_rect(self.screen.get_rect())
+            else:
+                # Прошлый кадр остается на экране: заново рисуются места
+                # прошлых оверлеев и измененные области холста
+                damage = list(self._overlay_rects)
+                damage += self._canvas_damage_rects(view != self._drawn_view)
+                for rect in merge_rects(damage):
+                    self.repaint_area(rect)
+                # Изменившиеся кнопки, строки информации и пикер
+                with self.profiler.stage("ui"):
+                    self.ui.draw()
+            self._drawn_view = view
+            self._canvas_damage = []
+
+            # Все, что ниже, рисуется поверх и в следующем кадре стирается
+            overlays_start = len(self.dirty_rects)
             # Отрисовка дополнительных элементов
             if self.magnifier_active:
-                self.draw_magnifier()
+                with self.profiler.stage("magnifier"):
+                    self.draw_magnifier()
     
             # Диалоги отрисовываются последними
-            if self.open_dialog_active:
-                if not self.debug_logged:
-                    print("Отрисовка диалога открытия")  # Отладка только один раз
-                    self.debug_logged = True
-                self.draw_open_dialog()
-            else:
-                self.debug_logged = False  # Сбрасываем флаг когда диалог закрыт
-            if self.resize_dialog_active:
-                self.draw_resize_dialog()
-            elif self.save_dialog_active:
-                self.draw_save_dialog()
-                
-            pygame.display.flip()
+            with self.profiler.stage("dialogs"):
+                if self.open_dialog_active:
+                    if not self.debug_logged:
+                        print("Отрисовка диалога открытия")  # Отладка только один раз
+                        self.debug_logged = True
+                    self.draw_open_dialog()
+                else:
+                    self.debug_logged = False  # Сбрасываем флаг когда диалог закрыт
+                if self.resize_dialog_active:
+                    self.draw_resize_dialog()
+                elif self.save_dialog_active:
+                    self.draw_save_dialog()
+                elif self.recovery_dialog_active:
+                    self.draw_recovery_dialog()
+
+            # Статус фонового сохранения
+            self.draw_save_status()
+
+            # Оверлей профайлера поверх всего
+            if self.show_profiler:
+                self.add_dirty_rect(self.profiler.draw(self, (self.side_panel_width + 10, 10)))
+            self._overlay_rects = [] if dialog_active else self.dirty_rects[overlays_start:]
 
         except Exception as e:
+            self._full_redraw = True  # Кадр мог остаться недорисованным
             print(f"Ошибка отрисовки: {str(e)}")
             import traceback
             traceback.print_exc()
 
+    def dump_profile(self, directory: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """Выгружает замеры кадров в CSV и JSON (по умолчанию в saves/profiles)"""
+        try:
+            directory = directory or os.path.join(get_save_directory(), "profiles")
+            os.makedirs(directory, exist_ok=True)
+            base = os.path.join(directory, time.strftime("frames_%Y%m%d_%H%M%S"))
+            self.profiler.dump_csv(base + ".csv")
+            self.profiler.dump_json(base + ".json")
+            print(f"Замеры кадров сохранены: {base}.csv, {base}.json")
+            return base + ".csv", base + ".json"
+        except Exception as e:
+            print(f"Ошибка выгрузки замеров: {str(e)}")
+            return None
+
+    def render_text(self, font: pygame.font.Font, text: str, antialias: bool,
+                    color) -> pygame.Surface:
+        """Отрисовка надписи через общий кэш текста"""
+        return self.text_cache.render(font, text, antialias, color)
+
+    def _view_state(self):
+        """
+        Все, от чего зависит вид кадра помимо пикселей холста и UI:
+        размер окна, затем положение и масштаб холста и сетка
+        """
+        return (self.screen.get_size(), int(self.canvas_x), int(self.canvas_y), self.zoom,
+                self.canvas.get_size(), self.show_grid, self.grid_color, self.grid_major_every)
+
+    def _canvas_damage_rects(self, view_changed: bool) -> List[pygame.Rect]:
+        """Экранные области измененных пикселей холста"""
+        area = self.get_canvas_area()
+        if view_changed or self._canvas_damage is None:
+            return [area]
+        rects = []
+        origin_x, origin_y = int(self.canvas_x), int(self.canvas_y)
+        for rect in merge_rects(self._canvas_damage):
+            left = origin_x + math.floor(rect.x * self.zoom)
+            top = origin_y + math.floor(rect.y * self.zoom)
+            right = origin_x + math.ceil(rect.right * self.zoom)
+            bottom = origin_y + math.ceil(rect.bottom * self.zoom)
+            # Запас на линии сетки и округление дробного масштаба
+            screen_rect = pygame.Rect(left, top, right - left, bottom - top).inflate(4, 4)
+            rects.append(screen_rect.clip(area))
+        return rects
+
+    def repaint_area(self, rect: pygame.Rect) -> None:
+        """Перерисовывает область экрана под клипом: фон, холст и колонки"""
+        self.screen.set_clip(rect)
+        try:
+            self.screen.fill(self.colors['bg'])
+            with self.profiler.stage("canvas"):
+                self.draw_canvas()
+            with self.profiler.stage("ui"):
+                self.ui.repaint()
+        finally:
+            self.screen.set_clip(None)
+        self.add_dirty_rect(rect)
+
+    def request_full_redraw(self) -> None:
+        """Следующий кадр рисуется и выводится целиком"""
+        self._full_redraw = True
+        self.request_redraw()
+
+    def add_dirty_rect(self, rect) -> None:
+        """Добавляет область экрана, которую нужно вывести в этом кадре"""
+        self.dirty_rects.append(pygame.Rect(rect))
+
+    def draw_save_status(self) -> Optional[pygame.Rect]:
+        """Статус фонового сохранения внизу области холста; возвращает его область"""
+        status = self.save_worker.status()
+        if status is None:
+            return None
+        text, progress, is_error = status
+
+        area = self.get_canvas_area()
+        rect = pygame.Rect(0, 0, 320, self.font.get_height() + 18)
+        rect.midbottom = (area.centerx, area.bottom - 16)
+        background = self.surface_pool.get(
+            "save_status", rect.size, pygame.SRCALPHA,
+            lambda surface: pygame.draw.rect(surface, (10, 10, 12, 210), surface.get_rect(),
+                                             border_radius=6))
+        self.screen.blit(background, rect)
+
+        color = (255, 120, 120) if is_error else self.colors['text']
+        text = truncate_text_start(self.font, text, rect.width - 24)
+        label = self.render_text(self.font, text, True, color)
+        self.screen.blit(label, label.get_rect(midleft=(rect.x + 12, rect.centery - 1)))
+        if progress is not None:
+            bar = pygame.Rect(rect.x + 12, rect.bottom - 5, int((rect.width - 24) * progress), 2)
+            pygame.draw.rect(self.screen, self.colors['accent'], bar)
+        self.add_dirty_rect(rect)
+        return rect
+
+    def save_artwork_async(self, name: str) -> None:
+        """Сохранение в фоне: кадр не ждет кодирования и записи файлов"""
+        try:
+            job = self.save_worker.submit(self.canvas, name)
+            self._saves_in_flight.append((job, self.change_count))
+            self.request_redraw()
+        except Exception as e:
+            print(f"Ошибка сохранения: {str(e)}")
+
+    def _finish_saves(self) -> None:
+        """
+        Разбирает завершившиеся фоновые сохранения. Работа считается
+        сохраненной, только если запись удалась и после отправки холст
+        не менялся; при ошибке флаг несохраненных изменений остается.
+        """
+        while self._saves_in_flight and self._saves_in_flight[0][0].finished_at is not None:
+            job, change_count = self._saves_in_flight.pop(0)
+            if job.error is None and change_count == self.change_count:
+                self.has_unsaved_changes = False
+
+    def get_canvas_area(self) -> pygame.Rect:
+        """Область экрана между боковыми панелями"""
+        return pygame.Rect(self.side_panel_width, 0,
+                           self.screen.get_width() - self.side_panel_width * 2,
+                           self.screen.get_height())
+
+    def present(self) -> None:
+        """Единственный вывод кадра на экран: только измененные области"""
+        rects = merge_rects(rect.clip(self.screen.get_rect()) for rect in self.dirty_rects)
+        self.dirty_rects = []
+        self.frame_count += 1
+        self.pixels_pushed = sum(rect.width * rect.height for rect in rects)
+        if rects:
+            pygame.display.update(rects)
+
+    def get_dialog_overlay(self) -> pygame.Surface:
+        """Затемнение экрана под диалогом (из пула поверхностей)"""
+        return self.surface_pool.get("overlay", self.screen.get_size(), pygame.SRCALPHA,
+                                     lambda overlay: overlay.fill((20, 20, 25, 180)))
+
+    def get_dialog_shadow(self, size) -> pygame.Surface:
+        """Тень окна диалога (из пула поверхностей)"""
+        def draw_shadow(shadow):
+            pygame.draw.rect(shadow, (0,0,0,80), shadow.get_rect(), border_radius=18)
+        return self.surface_pool.get("shadow", size, pygame.SRCALPHA, draw_shadow)
+
     def draw_save_dialog(self):
         """Отрисовка диалога сохранения файла"""
         # Затемняем фон
-        overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-        overlay.fill((20, 20, 25, 180))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.get_dialog_overlay(), (0, 0))
 
         # Параметры диалога
         dialog_w, dialog_h = 420, 220
@@ -540,7 +860,7 @@ class PixelArtEditor:
         pygame.draw.rect(self.screen, (80, 80, 90), dialog_rect, 2, border_radius=14)
 
         # Заголовок
-        title = self.large_font.render("Сохранить файл", True, (255, 255, 255))
+        title = self.render_text(self.large_font, "Сохранить файл", True, (255, 255, 255))
         title_rect = title.get_rect(center=(dialog_rect.centerx, dialog_rect.y + 32))
         self.screen.blit(title, title_rect)
 
@@ -554,22 +874,16 @@ class PixelArtEditor:
         if pygame.time.get_ticks() % 1000 < 500:
             input_text += "|"
             
-        # Обрезаем текст, если он не помещается
-        temp_text = self.font.render(input_text, True, (255, 255, 255))
+        # Обрезаем текст, если он не помещается (показываем конец текста)
         max_width = input_rect.width - 20  # Отступ по 10 пикселей с каждой стороны
+        input_text = truncate_text_start(self.font, input_text, max_width)
         
-        if temp_text.get_width() > max_width:
-            # Показываем конец текста, если он слишком длинный
-            while temp_text.get_width() > max_width and len(input_text) > 1:
-                input_text = "..." + input_text[4:]
-                temp_text = self.font.render(input_text, True, (255, 255, 255))
-        
-        text = self.font.render(input_text, True, (255, 255, 255))
+        text = self.render_text(self.font, input_text, True, (255, 255, 255))
         text_rect = text.get_rect(center=input_rect.center)
         self.screen.blit(text, text_rect)
 
         # Подсказка
-        hint = self.font.render("Введите имя файла", True, (180, 180, 180))
+        hint = self.render_text(self.font, "Введите имя файла", True, (180, 180, 180))
         hint_rect = hint.get_rect(center=(dialog_rect.centerx, input_rect.top - 10))
         self.screen.blit(hint, hint_rect)
 
@@ -584,7 +898,7 @@ class PixelArtEditor:
         save_color = (0, 122, 204) if save_rect.collidepoint(mouse_pos) else (30, 90, 160)
         pygame.draw.rect(self.screen, save_color, save_rect, border_radius=8)
         pygame.draw.rect(self.screen, (180, 180, 200), save_rect, 2, border_radius=8)
-        save_text = self.font.render("Сохранить", True, (255,255,255))
+        save_text = self.render_text(self.font, "Сохранить", True, (255,255,255))
         self.screen.blit(save_text, save_text.get_rect(center=save_rect.center))
 
         # Кнопка "Отмена"
@@ -592,7 +906,7 @@ class PixelArtEditor:
         cancel_color = (60, 60, 70) if cancel_rect.collidepoint(mouse_pos) else (40, 40, 50)
         pygame.draw.rect(self.screen, cancel_color, cancel_rect, border_radius=8)
         pygame.draw.rect(self.screen, (120, 120, 140), cancel_rect, 2, border_radius=8)
-        cancel_text = self.font.render("Отмена", True, (220,220,220))
+        cancel_text = self.render_text(self.font, "Отмена", True, (220,220,220))
         self.screen.blit(cancel_text, cancel_text.get_rect(center=cancel_rect.center))
 
         self.save_dialog_ok_rect = save_rect
@@ -601,9 +915,7 @@ class PixelArtEditor:
     def draw_resize_dialog(self):
         """Отрисовка диалога изменения размера холста"""
         # Затемняем фон
-        overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-        overlay.fill((20, 20, 25, 180))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.get_dialog_overlay(), (0, 0))
 
         # Параметры диалога
         dialog_w, dialog_h = 420, 220
@@ -612,19 +924,17 @@ class PixelArtEditor:
         dialog_rect = pygame.Rect(dialog_x, dialog_y, dialog_w, dialog_h)
 
         # Рисуем окно с тенью
-        shadow = pygame.Surface((dialog_w+8, dialog_h+8), pygame.SRCALPHA)
-        pygame.draw.rect(shadow, (0,0,0,80), shadow.get_rect(), border_radius=18)
-        self.screen.blit(shadow, (dialog_x-4, dialog_y-4))
+        self.screen.blit(self.get_dialog_shadow((dialog_w+8, dialog_h+8)), (dialog_x-4, dialog_y-4))
         pygame.draw.rect(self.screen, (38, 41, 48), dialog_rect, border_radius=14)
         pygame.draw.rect(self.screen, (80, 80, 90), dialog_rect, 2, border_radius=14)
 
         # Заголовок
-        title = self.large_font.render("Изменить размер холста", True, (255, 255, 255))
+        title = self.render_text(self.large_font, "Изменить размер холста", True, (255, 255, 255))
         title_rect = title.get_rect(center=(dialog_rect.centerx, dialog_rect.y + 32))
         self.screen.blit(title, title_rect)
 
         # Отрисовываем текст с текущим размером над полем ввода
-        prompt = self.font.render(f"Текущий размер: {self.grid_size}x{self.grid_size}", True, (180, 180, 180))
+        prompt = self.render_text(self.font, f"Текущий размер: {self.grid_size}x{self.grid_size}", True, (180, 180, 180))
         prompt_rect = prompt.get_rect(center=(dialog_rect.centerx, dialog_rect.y + 75))
         self.screen.blit(prompt, prompt_rect)
 
@@ -638,11 +948,11 @@ class PixelArtEditor:
         input_text = self.resize_input
         if pygame.time.get_ticks() % 1000 < 500:
             input_text += "|"
-        text = self.font.render(input_text, True, (255, 255, 255))
+        text = self.render_text(self.font, input_text, True, (255, 255, 255))
         self.screen.blit(text, text.get_rect(center=input_rect.center))
 
         # Подсказка под полем ввода
-        size_hint = self.font.render("(2-256)", True, (180, 180, 180))
+        size_hint = self.render_text(self.font, "(2-256)", True, (180, 180, 180))
         size_hint_rect = size_hint.get_rect(centerx=dialog_rect.centerx, top=input_rect.bottom + 8)
         self.screen.blit(size_hint, size_hint_rect)
 
@@ -657,7 +967,7 @@ class PixelArtEditor:
         apply_color = (0, 122, 204) if apply_rect.collidepoint(mouse_pos) else (30, 90, 160)
         pygame.draw.rect(self.screen, apply_color, apply_rect, border_radius=8)
         pygame.draw.rect(self.screen, (180, 180, 200), apply_rect, 2, border_radius=8)
-        apply_text = self.font.render("Применить", True, (255,255,255))
+        apply_text = self.render_text(self.font, "Применить", True, (255,255,255))
         self.screen.blit(apply_text, apply_text.get_rect(center=apply_rect.center))
 
         # Кнопка "Отмена"
@@ -665,49 +975,83 @@ class PixelArtEditor:
         cancel_color = (60, 60, 70) if cancel_rect.collidepoint(mouse_pos) else (40, 40, 50)
         pygame.draw.rect(self.screen, cancel_color, cancel_rect, border_radius=8)
         pygame.draw.rect(self.screen, (120, 120, 140), cancel_rect, 2, border_radius=8)
-        cancel_text = self.font.render("Отмена", True, (220,220,220))
+        cancel_text = self.render_text(self.font, "Отмена", True, (220,220,220))
         self.screen.blit(cancel_text, cancel_text.get_rect(center=cancel_rect.center))
 
         self.resize_dialog_ok_rect = apply_rect
         self.resize_dialog_cancel_rect = cancel_rect
         return apply_rect, cancel_rect
 
+    def draw_recovery_dialog(self):
+        """Отрисовка диалога восстановления автосохранения"""
+        self.screen.blit(self.get_dialog_overlay(), (0, 0))
+
+        dialog_w, dialog_h = 420, 200
+        dialog_x = (self.screen.get_width() - dialog_w) // 2
+        dialog_y = (self.screen.get_height() - dialog_h) // 2
+        dialog_rect = pygame.Rect(dialog_x, dialog_y, dialog_w, dialog_h)
+
+        self.screen.blit(self.get_dialog_shadow((dialog_w+8, dialog_h+8)), (dialog_x-4, dialog_y-4))
+        pygame.draw.rect(self.screen, (38, 41, 48), dialog_rect, border_radius=14)
+        pygame.draw.rect(self.screen, (80, 80, 90), dialog_rect, 2, border_radius=14)
+
+        title = self.render_text(self.large_font, "Восстановить работу?", True, (255, 255, 255))
+        self.screen.blit(title, title.get_rect(center=(dialog_rect.centerx, dialog_rect.y + 32)))
+
+        for i, line in enumerate(("Найдено автосохранение с прошлого запуска.",
+                                  "Enter - восстановить, Esc - удалить")):
+            text = self.render_text(self.font, line, True, (180, 180, 180))
+            self.screen.blit(text, text.get_rect(center=(dialog_rect.centerx, dialog_rect.y + 75 + i * 26)))
+
+        # Кнопки
+        btn_w, btn_h = 140, 36
+        btn_gap = 24
+        btn_y = dialog_rect.y + dialog_h - btn_h - 24
+        mouse_pos = pygame.mouse.get_pos()
+
+        restore_rect = pygame.Rect(dialog_rect.centerx - btn_w - btn_gap//2, btn_y, btn_w, btn_h)
+        restore_color = (0, 122, 204) if restore_rect.collidepoint(mouse_pos) else (30, 90, 160)
+        pygame.draw.rect(self.screen, restore_color, restore_rect, border_radius=8)
+        pygame.draw.rect(self.screen, (180, 180, 200), restore_rect, 2, border_radius=8)
+        restore_text = self.render_text(self.font, "Восстановить", True, (255,255,255))
+        self.screen.blit(restore_text, restore_text.get_rect(center=restore_rect.center))
+
+        discard_rect = pygame.Rect(dialog_rect.centerx + btn_gap//2, btn_y, btn_w, btn_h)
+        discard_color = (60, 60, 70) if discard_rect.collidepoint(mouse_pos) else (40, 40, 50)
+        pygame.draw.rect(self.screen, discard_color, discard_rect, border_radius=8)
+        pygame.draw.rect(self.screen, (120, 120, 140), discard_rect, 2, border_radius=8)
+        discard_text = self.render_text(self.font, "Удалить", True, (220,220,220))
+        self.screen.blit(discard_text, discard_text.get_rect(center=discard_rect.center))
+
+        self.recovery_dialog_ok_rect = restore_rect
+        self.recovery_dialog_cancel_rect = discard_rect
+        return restore_rect, discard_rect
+
     def draw_canvas(self):
         """Отрисовка холста"""
-        # Рисуем шахматный фон для прозрачности
-        cell_size = max(4, self.zoom // 2)  # Размер клетки фона
-        for y in range(0, self.canvas_height, cell_size):
-            for x in range(0, self.canvas_width, cell_size):
-                color = (60, 60, 60) if ((x + y) // cell_size) % 2 == 0 else (70, 70, 70)
-                rect = pygame.Rect(self.canvas_x + x, self.canvas_y + y, 
-                                 min(cell_size, self.canvas_width - x),
-                                 min(cell_size, self.canvas_height - y))
-                pygame.draw.rect(self.screen, color, rect)
+        # Рисуем шахматный фон для прозрачности из кэша плиток
+        cell_size = max(4, int(self.zoom // 2))  # Размер клетки фона
+        canvas_rect = pygame.Rect(int(self.canvas_x), int(self.canvas_y),
+                                  int(self.canvas_width), int(self.canvas_height))
+        self.checker_cache.draw(self.screen, canvas_rect, cell_size, CANVAS_CHECKER_COLORS)
         
-        # Отрисовка масштабированного холста
-        canvas_scaled = pygame.transform.scale(
-            self.canvas,
-            (self.canvas_width, self.canvas_height)
-        )
-        self.screen.blit(canvas_scaled, (self.canvas_x, self.canvas_y))
+        # Отрисовка масштабированного холста из кэша: только видимая часть
+        view = self.get_visible_canvas_rect()
+        if view.width and view.height:
+            canvas_scaled, (offset_x, offset_y) = self.scaled_canvas.get(self.canvas, self.zoom, view)
+            self.screen.blit(canvas_scaled, (canvas_rect.x + offset_x, canvas_rect.y + offset_y))
         
-        # Отрисовка сетки
+        # Отрисовка сетки из кэшированной плитки (слишком плотная сетка скрывается)
         if self.show_grid:
-            for i in range(self.grid_size + 1):
-                x = self.canvas_x + i * self.zoom
-                y = self.canvas_y + i * self.zoom
-                # Вертикальные линии
-                pygame.draw.line(
-                    self.screen, self.grid_color,
-                    (x, self.canvas_y),
-                    (x, self.canvas_y + self.canvas_height)
-                )
-                # Горизонтальные линии
-                pygame.draw.line(
-                    self.screen, self.grid_color,
-                    (self.canvas_x, y),
-                    (self.canvas_x + self.canvas_width, y)
-                )
+            self.grid_cache.draw(self.screen, canvas_rect, self.zoom, self.grid_color,
+                                 GRID_MAJOR_COLOR, self.grid_major_every)
+
+    def get_visible_canvas_rect(self) -> pygame.Rect:
+        """Область холста (в пикселях холста), видимая в окне"""
+        return ScaledCanvasCache.visible_rect(
+            self.canvas.get_size(), self.zoom,
+            (int(self.canvas_x), int(self.canvas_y)), self.screen.get_size()
+        )
 
     def draw_magnifier(self):
         """Отрисовка лупы"""
@@ -720,43 +1064,23 @@ class PixelArtEditor:
         rect_size = self.magnifier_size
         half_size = rect_size // 2
         
-        magnifier_surface = pygame.Surface((rect_size, rect_size), pygame.SRCALPHA)
-        
         canvas_pos = self.get_pixel_pos(mouse_pos)
         if not canvas_pos:
             return
             
-        px, py = canvas_pos
-        
-        zoom_factor = 4.0  # Фиксированный коэффициент увеличения для лупы
-        if self.magnifier_mode == "unzoom":
-            zoom_factor = 0.5
-            
-        source_size = rect_size / (self.zoom * zoom_factor)
-        src_x = max(0, px - source_size/2)
-        src_y = max(0, py - source_size/2)
-        src_x_end = min(self.grid_size, src_x + source_size)
-        src_y_end = min(self.grid_size, src_y + source_size)
-        
-        cell_size = (rect_size / source_size) if source_size > 0 else 0
-        
-        for y in range(int(src_y), int(src_y_end)):
-            for x in range(int(src_x), int(src_x_end)):
-                if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
-                    color = self.canvas.get_at((x, y))
-                    pos_x = (x - src_x) * cell_size
-                    pos_y = (y - src_y) * cell_size
-                    pygame.draw.rect(
-                        magnifier_surface, color,
-                        (pos_x, pos_y, math.ceil(cell_size), math.ceil(cell_size))
-                    )
+        zoom_factor = self.magnifier_zoom_factor
+        view, offset = self.get_magnifier_view(canvas_pos, zoom_factor)
         
         # Отрисовка лупы
         border_rect = (mx - half_size - 2, my - half_size - 2, rect_size + 4, rect_size + 4)
+        self.add_dirty_rect(border_rect)
         pygame.draw.rect(self.screen, (200, 200, 200), border_rect, 2)
         pygame.draw.rect(self.screen, (80, 80, 80), border_rect, 1)
         
-        self.screen.blit(magnifier_surface, (mx - half_size, my - half_size))
+        if view is not None:
+            # Смещение отрицательно: лишнее слева/сверху отсекается областью
+            area = pygame.Rect(-offset[0], -offset[1], rect_size, rect_size)
+            self.screen.blit(view, (mx - half_size, my - half_size), area)
         
         # Рисуем перекрестие
         pygame.draw.line(self.screen, (255, 0, 0), 
@@ -765,31 +1089,167 @@ class PixelArtEditor:
                         (mx, my - half_size), (mx, my + half_size), 1)
         
         # Отображаем текст с режимом и масштабом
-        mode_text = "Уменьшение" if self.magnifier_mode == "unzoom" else "Увеличение"
-        text_surf = self.font.render(f"{mode_text} {zoom_factor:.1f}x", True, (255, 255, 255))
+        mode_text = "Уменьшение" if zoom_factor < 1 else "Увеличение"
+        text_surf = self.render_text(self.font, f"{mode_text} {zoom_factor:.1f}x", True, (255, 255, 255))
         text_rect = text_surf.get_rect(center=(mx, my + half_size + 15))
-        pygame.draw.rect(self.screen, (40, 40, 40), 
-                        (text_rect.x - 5, text_rect.y - 2, text_rect.width + 10, text_rect.height + 4))
+        label_rect = pygame.Rect(text_rect.x - 5, text_rect.y - 2, text_rect.width + 10, text_rect.height + 4)
+        pygame.draw.rect(self.screen, (40, 40, 40), label_rect)
         self.screen.blit(text_surf, text_rect)
+        self.add_dirty_rect(label_rect)
+
+    def get_magnifier_view(self, canvas_pos: Tuple[int, int], zoom_factor: float):
+        """
+        Увеличенный фрагмент холста вокруг canvas_pos для лупы.
+        Видимая часть холста берется через subsurface и масштабируется один раз
+        (ближайший сосед) в переиспользуемый буфер, поэтому стоимость не зависит
+        от масштаба. Возвращает (поверхность, смещение от левого верхнего угла
+        лупы) или (None, None), если фрагмент пуст.
+        """
+        cell_size = self.zoom * zoom_factor
+        source_size = self.magnifier_size / cell_size
+        canvas_w, canvas_h = self.canvas.get_size()
+        px, py = canvas_pos
+
+        # Дробная область источника, прижатая к левому/верхнему краю холста
+        src_x = max(0, px - source_size / 2)
+        src_y = max(0, py - source_size / 2)
+        x0, y0 = int(src_x), int(src_y)
+        x1 = min(canvas_w, math.ceil(src_x + source_size))
+        y1 = min(canvas_h, math.ceil(src_y + source_size))
+        if x1 <= x0 or y1 <= y0:
+            return None, None
+
+        size = (max(1, round((x1 - x0) * cell_size)), max(1, round((y1 - y0) * cell_size)))
+        if (self.magnifier_buffer is None or self.magnifier_buffer.get_width() < size[0]
+                or self.magnifier_buffer.get_height() < size[1]):
+            buffer_w = max(size[0], self.magnifier_buffer.get_width() if self.magnifier_buffer else 0)
+            buffer_h = max(size[1], self.magnifier_buffer.get_height() if self.magnifier_buffer else 0)
+            self.magnifier_buffer = pygame.Surface((buffer_w, buffer_h), pygame.SRCALPHA)
+
+        view = self.magnifier_buffer.subsurface((0, 0), size)
+        source = self.canvas.subsurface((x0, y0, x1 - x0, y1 - y0))
+        pygame.transform.scale(source, size, view)
+        offset = (round((x0 - src_x) * cell_size), round((y0 - src_y) * cell_size))
+        return view, offset
+
+    def set_magnifier_factor(self, zoom_factor: float) -> None:
+        """Устанавливает коэффициент лупы в допустимых пределах"""
+        self.magnifier_zoom_factor = max(MAGNIFIER_MIN_FACTOR, min(MAGNIFIER_MAX_FACTOR, zoom_factor))
 
     # === Утилиты ===
 
+    def begin_transaction(self) -> None:
+        """Начало транзакции: все изменения до commit_transaction попадут в одну запись истории"""
+        self._transaction_depth += 1
+
+    def commit_transaction(self) -> bool:
+        """Завершение транзакции. Возвращает True, если холст был изменен"""
+        if self._transaction_depth == 0:
+            return False
+
+        self._transaction_depth -= 1
+        if self._transaction_depth > 0:
+            return False  # Вложенная транзакция - фиксирует внешняя
+
+        return self._commit_history()
+
+    def in_transaction(self) -> bool:
+        """Проверяет, открыта ли транзакция"""
+        return self._transaction_depth > 0
+
+    def mark_dirty(self, rect=None) -> None:
+        """
+        Отмечает изменение области холста (по умолчанию - всего холста).
+        Вне транзакции изменение сразу записывается в историю.
+        """
+        rect = pygame.Rect(rect) if rect is not None else self.canvas.get_rect()
+        self.invalidate_canvas(rect)
+        if self._dirty_rect is None:
+            self._dirty_rect = rect
+        else:
+            self._dirty_rect.union_ip(rect)
+
+        if self._transaction_depth == 0:
+            self._commit_history()
+
+    @traced(cat="history")
     def save_state(self):
-        """Сохранение состояния для истории"""
-        canvas_copy = pygame.Surface((self.grid_size, self.grid_size), pygame.SRCALPHA)
-        canvas_copy.blit(self.canvas, (0, 0))
-        
-        # Очищаем историю после текущей позиции
-        if self.history_index < len(self.history) - 1:
-            self.history = self.history[:self.history_index + 1]
-        
-        self.history.append(canvas_copy)
-        self.history_index = len(self.history) - 1
-        
-        # Ограничиваем размер истории
-        if len(self.history) > self.max_history:
-            self.history.pop(0)
-            self.history_index -= 1
+        """Сохранение состояния всего холста в историю"""
+        self.invalidate_canvas()
+        self._dirty_rect = self.canvas.get_rect()
+        self._commit_history()
+
+    def invalidate_canvas(self, rect=None) -> None:
+        """Сообщает кэшам отрисовки об изменении области холста (None - всего холста)"""
+        if rect is None:
+            self.scaled_canvas.invalidate()
+            self._canvas_damage = None
+        else:
+            self.scaled_canvas.invalidate_rect(rect)
+            if self._canvas_damage is not None:
+                self._canvas_damage.append(pygame.Rect(rect))
+                # Без кадров список не растет бесконечно: тогда перерисуется весь холст
+                if len(self._canvas_damage) > CANVAS_DAMAGE_MAX_RECTS:
+                    self._canvas_damage = None
+
+    @traced(cat="history")
+    def _commit_history(self) -> bool:
+        """Записывает дельту измененной области в историю"""
+        rect, self._dirty_rect = self._dirty_rect, None
+        if rect is None:
+            return False
+
+        if self.canvas.get_size() != self._history_base.get_size():
+            # Размер холста изменился - храним полные снимки
+            after = self.canvas.copy()
+            entry = HistoryEntry(after.get_rect(), self._history_base, after, full=True)
+            self._history_base = after.copy()
+        else:
+            rect = rect.clip(self.canvas.get_rect())
+            if not rect.width or not rect.height:
+                return False
+            before = self._history_base.subsurface(rect).copy()
+            after = self.canvas.subsurface(rect).copy()
+            blit_exact(self._history_base, after, rect.topleft)
+            entry = HistoryEntry(rect, before, after)
+
+        self.history.push(entry)
+        self._on_canvas_changed(entry, entry.before, entry.after)
+        return True
+
+    def _on_canvas_changed(self, entry: HistoryEntry, before: pygame.Surface,
+                           after: pygame.Surface) -> None:
+        """Зафиксированное изменение холста: отметка для автосохранения и запись в журнал"""
+        self.has_unsaved_changes = True
+        self.change_count += 1
+        if entry.full:
+            self.autosave.mark_all(self.canvas.get_size())
+        else:
+            self.autosave.mark(entry.rect, self.canvas.get_size())
+        self.autosave.record(entry.rect.topleft, before, after, entry.full)
+
+    def _apply_history(self, entry: HistoryEntry, surface: pygame.Surface) -> None:
+        """Применяет к холсту пиксели записи истории на месте"""
+        previous = entry.after if surface is entry.before else entry.before
+        if entry.full:
+            if surface.get_size() != self.canvas.get_size():
+                self._replace_canvas(surface.get_width())
+            self._history_base = surface.copy()
+            blit_exact(self.canvas, surface, (0, 0))
+            self.invalidate_canvas()
+        else:
+            blit_exact(self.canvas, surface, entry.rect.topleft)
+            blit_exact(self._history_base, surface, entry.rect.topleft)
+            self.invalidate_canvas(entry.rect)
+        self._on_canvas_changed(entry, previous, surface)
+
+    def _replace_canvas(self, new_size: int) -> None:
+        """Создает пустой холст нового размера"""
+        self.grid_size = new_size
+        self.canvas = pygame.Surface((new_size, new_size), pygame.SRCALPHA)
+        self.canvas.fill((0, 0, 0, 0))
+        self.tools.update_temp_surface(new_size)
+        self.update_canvas_position()
 
     def update_canvas_position(self):
         """Обновление позиции холста при изменении размера окна"""
@@ -818,20 +1278,23 @@ class PixelArtEditor:
             if color is None:
                 color = self.color_manager.current_color
             if 0 <= x < self.grid_size and 0 <= y < self.grid_size:
-                # Убираем проверку на существующий пиксель
-                self.canvas.set_at((int(x), int(y)), color)
-                
-                # Сохраняем состояние только если это не предпросмотр
-                if not hasattr(self.tools, 'drawing') or not self.tools.drawing:
-                    self.save_state()
+                pos = (int(x), int(y))
+                # Повторная запись того же цвета не изменяет холст
+                if self.canvas.get_at_mapped(pos) == self.canvas.map_rgb(color):
+                    return
+                self.canvas.set_at(pos, color)
+                self.mark_dirty((pos[0], pos[1], 1, 1))
         except Exception as e:
             print(f"Ошибка отрисовки пикселя: {str(e)}")
             logging.error(f"Ошибка отрисовки пикселя: {str(e)}")
 
     def clear_canvas(self):
         """Очистка холста"""
-        self.save_state()
+        # Пустой холст очищать незачем
+        if not self.canvas.get_bounding_rect().width:
+            return
         self.canvas.fill((0, 0, 0, 0))
+        self.mark_dirty()
 
     def resize_canvas(self, new_size: int) -> bool:
         """Изменение размера холста с сохранением содержимого"""
@@ -842,7 +1305,6 @@ class PixelArtEditor:
             if new_size < 2 or new_size > 512:
                 raise ValueError("Размер должен быть от 2 до 512")
 
-            self.save_state()
             old_canvas = self.canvas.copy()
             old_size = self.grid_size
             
@@ -864,10 +1326,16 @@ class PixelArtEditor:
             # Обновляем размеры и позицию
             self.canvas_width = self.grid_size * self.zoom
             self.canvas_height = self.grid_size * self.zoom
+            self.checker_cache.invalidate()
+            self.grid_cache.invalidate()
+            self.scaled_canvas.invalidate()
             
             # Центрируем холст на экране
             self.canvas_x = (self.screen.get_width() - self.canvas_width) // 2
             self.canvas_y = (self.screen.get_height() - self.canvas_height) // 2
+
+            # Сохраняем состояние уже после изменения размера
+            self.mark_dirty()
             
             logging.info(f"Размер холста изменен: {new_size}x{new_size}")
             return True
@@ -917,6 +1385,9 @@ class PixelArtEditor:
             # Обновляем размеры холста
             self.canvas_width = self.grid_size * self.zoom
             self.canvas_height = self.grid_size * self.zoom
+            self.checker_cache.invalidate()
+            self.grid_cache.invalidate()
+            self.scaled_canvas.invalidate()
 
             # Вычисляем новую позицию холста относительно курсора
             self.canvas_x = mouse_pos[0] - (canvas_x * self.zoom)
@@ -992,21 +1463,69 @@ class PixelArtEditor:
             self.resize_input = ""
         return True
 
+    def _handle_recovery_dialog_key(self, event):
+        """Обработка клавиш в диалоге восстановления"""
+        if event.key == pygame.K_RETURN:
+            self.restore_autosave()
+        elif event.key == pygame.K_ESCAPE:
+            self.discard_autosave()
+        return True
+
+    def _handle_recovery_dialog_click(self, event):
+        """Обработка кликов в диалоге восстановления"""
+        pos = pygame.mouse.get_pos()
+        if self.recovery_dialog_ok_rect and self.recovery_dialog_ok_rect.collidepoint(pos):
+            self.restore_autosave()
+        elif self.recovery_dialog_cancel_rect and self.recovery_dialog_cancel_rect.collidepoint(pos):
+            self.discard_autosave()
+        return True
+
+    def restore_autosave(self) -> bool:
+        """Загружает холст из автосохранения (отменяемым действием)"""
+        self.recovery_dialog_active = False
+        surface = self.autosave.load()
+        if surface is None:
+            self.discard_autosave()
+            return False
+        try:
+            if surface.get_size() != self.canvas.get_size():
+                self._replace_canvas(surface.get_width())
+            blit_exact(self.canvas, surface, (0, 0))
+            self.save_state()
+            # Холст совпадает с автосохранением - переписывать его незачем,
+            # журнал начинается заново с восстановленного холста
+            self.autosave.reset_pending()
+            self.autosave.resume(self.canvas)
+            logging.info("Работа восстановлена из автосохранения")
+            return True
+        except Exception as e:
+            logging.error(f"Ошибка восстановления автосохранения: {str(e)}")
+            self.discard_autosave()
+            return False
+
+    def discard_autosave(self) -> None:
+        """Отказ от восстановления: автосохранение удаляется"""
+        self.recovery_dialog_active = False
+        self.autosave.discard()
+        self.autosave.resume(self.canvas)
+
+    @traced(cat="history")
     def undo(self):
         """Отмена последнего действия"""
         try:
-            if self.history_index > 0:
-                self.history_index -= 1
-                self.canvas = self.history[self.history_index].copy()
+            entry = self.history.undo()
+            if entry:
+                self._apply_history(entry, entry.before)
         except Exception as e:
             print(f"Ошибка отмены действия: {str(e)}")
 
+    @traced(cat="history")
     def redo(self):
         """Повтор отмененного действия"""
         try:
-            if self.history_index < len(self.history) - 1:
-                self.history_index += 1
-                self.canvas = self.history[self.history_index].copy()
+            entry = self.history.redo()
+            if entry:
+                self._apply_history(entry, entry.after)
         except Exception as e:
             print(f"Ошибка повтора действия: {str(e)}")
 
@@ -1099,12 +1618,24 @@ class PixelArtEditor:
             if event.key == pygame.K_F11:  # F11 - полный экран
                 self.toggle_fullscreen()
                 return True
+            elif event.key == pygame.K_F3:
+                if event.mod & pygame.KMOD_SHIFT:  # Shift+F3 - выгрузка замеров
+                    self.dump_profile()
+                else:  # F3 - оверлей профайлера
+                    self.show_profiler = not self.show_profiler
+                return True
             elif event.key == pygame.K_g:  # G - сетка
                 self.show_grid = not self.show_grid
                 return True
             elif event.key == pygame.K_m:  # M - лупа
                 self.magnifier_active = not self.magnifier_active
                 return True
+            elif event.key == pygame.K_LEFTBRACKET and self.magnifier_active:  # [ - лупа слабее
+                self.set_magnifier_factor(self.magnifier_zoom_factor / 2)
+                return True
+            elif event.key == pygame.K_RIGHTBRACKET and self.magnifier_active:  # ] - лупа сильнее
+                self.set_magnifier_factor(self.magnifier_zoom_factor * 2)
+                return True
             elif event.key == pygame.K_r:  # R - размер холста
                 self.resize_dialog_active = True
                 self.resize_input = ""
@@ -1123,7 +1654,7 @@ class PixelArtEditor:
             self.save_input = ""
         elif event.key == pygame.K_RETURN:
             if self.save_input.strip():
-                save_artwork(self.canvas, self.save_input)
+                self.save_artwork_async(self.save_input)
                 self.save_dialog_active = False
                 self.save_input = ""
         elif event.key == pygame.K_BACKSPACE:
@@ -1143,8 +1674,7 @@ class PixelArtEditor:
             pos = pygame.mouse.get_pos()
             if self.save_dialog_ok_rect and self.save_dialog_ok_rect.collidepoint(pos):
                 if self.save_input.strip():
-                    save_artwork(self.canvas, self.save_input)
-                    print(f"Файл сохранен: {self.save_input}")
+                    self.save_artwork_async(self.save_input)
                 self.save_dialog_active = False
                 self.save_input = ""
                 return True
@@ -1160,9 +1690,7 @@ class PixelArtEditor:
     def draw_open_dialog(self):
         """Отрисовка диалога открытия файла"""
         # Затемняем фон
-        overlay = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-        overlay.fill((20, 20, 25, 180))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.get_dialog_overlay(), (0, 0))
 
         # Параметры диалога
         dialog_w, dialog_h = 420, 320
@@ -1175,7 +1703,7 @@ class PixelArtEditor:
         pygame.draw.rect(self.screen, (80, 80, 90), dialog_rect, 2, border_radius=14)
 
         # Заголовок
-        title = self.large_font.render("Открыть проект", True, (255, 255, 255))
+        title = self.render_text(self.large_font, "Открыть проект", True, (255, 255, 255))
         title_rect = title.get_rect(center=(dialog_rect.centerx, dialog_rect.y + 32))
         self.screen.blit(title, title_rect)
 
@@ -1212,7 +1740,7 @@ class PixelArtEditor:
             if list_rect.y <= y <= list_rect.bottom - item_height:
                 if i == self.selected_file_index:
                     pygame.draw.rect(self.screen, (0, 122, 204, 100), item_rect, border_radius=4)
-                text = self.font.render(self.available_files[i], True, (255, 255, 255))
+                text = self.render_text(self.font, self.available_files[i], True, (255, 255, 255))
                 self.screen.blit(text, (item_rect.x + 10, item_rect.y + 6))
             
             y += item_height
@@ -1242,7 +1770,7 @@ class PixelArtEditor:
         open_color = (0, 122, 204) if open_rect.collidepoint(mouse_pos) else (30, 90, 160)
         pygame.draw.rect(self.screen, open_color, open_rect, border_radius=8)
         pygame.draw.rect(self.screen, (180, 180, 200), open_rect, 2, border_radius=8)
-        open_text = self.font.render("Открыть", True, (255,255,255))
+        open_text = self.render_text(self.font, "Открыть", True, (255,255,255))
         self.screen.blit(open_text, open_text.get_rect(center=open_rect.center))
 
         # Кнопка "Отмена"
@@ -1250,7 +1778,7 @@ class PixelArtEditor:
         cancel_color = (60, 60, 70) if cancel_rect.collidepoint(mouse_pos) else (40, 40, 50)
         pygame.draw.rect(self.screen, cancel_color, cancel_rect, border_radius=8)
         pygame.draw.rect(self.screen, (120, 120, 140), cancel_rect, 2, border_radius=8)
-        cancel_text = self.font.render("Отмена", True, (220,220,220))
+        cancel_text = self.render_text(self.font, "Отмена", True, (220,220,220))
         self.screen.blit(cancel_text, cancel_text.get_rect(center=cancel_rect.center))
 
         # Сохраняем ссылки на кнопки
@@ -1277,6 +1805,12 @@ class PixelArtEditor:
                     return self._handle_save_dialog_key(event)
                 elif event.type == pygame.MOUSEBUTTONDOWN:
                     return self._handle_save_dialog_click(event)
+
+            elif self.recovery_dialog_active:
+                if event.type == pygame.KEYDOWN:
+                    return self._handle_recovery_dialog_key(event)
+                elif event.type == pygame.MOUSEBUTTONDOWN:
+                    return self._handle_recovery_dialog_click(event)
             
             return False
 
@@ -1389,25 +1923,15 @@ class PixelArtEditor:
                 return False
                 
             try:
-                # Пробуем загрузить как изображение
-                loaded_surface = pygame.image.load(filepath)
-                # Убеждаемся что у нас RGBA формат
-                if loaded_surface.get_bitsize() != 32:
-                    loaded_surface = loaded_surface.convert_alpha()
-                logging.info(f"Изображение загружено успешно: {filepath}")
-                
+                # Формат определяется по сигнатуре (.apx) или расширению (JSON, картинки)
+                loaded_surface = load_surface(filepath)
+                logging.info(f"Файл прочитан успешно: {filepath}")
             except pygame.error as e:
-                # Если не получилось загрузить как изображение, пробуем JSON
-                if filename.endswith('.json'):
-                    try:
-                        loaded_surface = load_from_json(filepath)
-                        logging.info(f"JSON файл загружен успешно: {filepath}")
-                    except Exception as e:
-                        logging.error(f"Ошибка загрузки JSON: {str(e)}")
-                        return False
-                else:
-                    logging.error(f"Неподдерживаемый формат файла: {filename}")
-                    return False
+                logging.error(f"Неподдерживаемый формат файла: {filename} ({str(e)})")
+                return False
+            except Exception as e:
+                logging.error(f"Ошибка чтения файла: {str(e)}")
+                return False
                     
             # Обновляем размер и создаем новый холст
             new_size = max(loaded_surface.get_width(), loaded_surface.get_height())
@@ -1415,14 +1939,15 @@ class PixelArtEditor:
             self.canvas = pygame.Surface((new_size, new_size), pygame.SRCALPHA)
             self.canvas.fill((0, 0, 0, 0))
             
-            # Центрируем загруженное изображение
+            # Центрируем загруженное изображение (пиксели копируются без смешивания)
             x = (new_size - loaded_surface.get_width()) // 2
             y = (new_size - loaded_surface.get_height()) // 2
-            self.canvas.blit(loaded_surface, (x, y))
+            blit_exact(self.canvas, loaded_surface, (x, y))
             
             # Обновляем отображение
             self.update_canvas_position()
             self.save_state()
+            self.has_unsaved_changes = False  # Холст совпадает с открытым файлом
             logging.info(f"Файл успешно загружен, размер: {new_size}x{new_size}")
             return True
                 
@@ -1,66 +1,260 @@
 import pygame
+import base64
 import json
 import os
 import logging
-from typing import List, Tuple
+import struct
+import tempfile
+import zlib
+import numpy as np
+from contextlib import contextmanager
+from operator import itemgetter
+from typing import Callable, List, Optional, Tuple
+from .tracing import traced
+from .utils import blit_exact
 
-def save_to_json(surface: pygame.Surface, filename: str) -> None:
-    """Сохраняет пиксельное изображение в JSON файл"""
+# Двоичный формат проекта: заголовок и пиксели RGBA построчно (сжатые zlib или как есть)
+PROJECT_EXTENSION = ".apx"
+PROJECT_MAGIC = b"APXL"
+PROJECT_VERSION = 1
+# Сигнатура, версия, сжатие, ширина, высота, длина данных, CRC32 несжатых пикселей
+PROJECT_HEADER = struct.Struct("<4sHHIIII")
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+PROJECT_ZLIB_LEVEL = 6
+
+# JSON для обмена с веб-инструментами. Версия 2: строки пикселей в hex или base64
+# (RGBA или индексы палитры по байту на пиксель); версия 1 - словарь на каждый пиксель
+JSON_VERSION = 2
+JSON_ENCODINGS = ("hex", "base64")
+JSON_PALETTE_MAX = 256  # Палитра используется, если цветов не больше
+
+_surface_to_bytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+_surface_from_bytes = getattr(pygame.image, "frombytes", None) or pygame.image.fromstring
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'wb', **kwargs):
+    """
+    Запись во временный файл рядом с path; path заменяется только после
+    успешной записи, так что сбой посреди сохранения не портит прежний файл.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory or None,
+                                     prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode, **kwargs) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def surface_to_rgba(surface: pygame.Surface) -> bytes:
+    """Копия пикселей поверхности в байтах RGBA (построчно)"""
+    return _surface_to_bytes(surface, "RGBA")
+
+def _encode_row(data: bytes, encoding: str) -> str:
+    return data.hex() if encoding == "hex" else base64.b64encode(data).decode('ascii')
+
+def _decode_row(text: str, encoding: str) -> bytes:
+    if encoding == "hex":
+        return bytes.fromhex(text)
+    return base64.b64decode(text, validate=True)
+
+def _build_palette(colors: np.ndarray) -> Optional[np.ndarray]:
+    """Отсортированные цвета изображения (uint32) или None, если их больше JSON_PALETTE_MAX"""
+    # Сортировка и маска соседей: np.unique на случайных цветах в разы медленнее
+    ordered = np.sort(colors, axis=None)
+    first = np.empty(len(ordered), dtype=bool)
+    first[:1] = True
+    np.not_equal(ordered[1:], ordered[:-1], out=first[1:])
+    palette = ordered[first]
+    return palette if len(palette) <= JSON_PALETTE_MAX else None
+
+def _write_json_v1(f, rgba: np.ndarray) -> None:
+    """Версия 1: словарь на каждый пиксель, строки пишутся по одной"""
+    height, width = rgba.shape[:2]
+    f.write(f'{{"width": {width}, "height": {height}, "pixels": [')
+    for y in range(height):
+        row = ", ".join(f'{{"r": {r}, "g": {g}, "b": {b}, "a": {a}}}'
+                        for r, g, b, a in rgba[y].tolist())
+        f.write(f'{"," if y else ""}\n[{row}]')
+    f.write('\n]}\n')
+
+def _write_json_v2(f, rgba: np.ndarray, encoding: str, use_palette: bool) -> None:
+    """Версия 2: заголовок, необязательная палитра и строки пикселей по одной"""
+    height, width = rgba.shape[:2]
+    colors = rgba.view(np.uint32)[..., 0]  # Пиксель как одно 32-битное число
+    palette = _build_palette(colors) if use_palette else None
+    f.write(f'{{"format": "artpixel", "version": {JSON_VERSION}, '
+            f'"width": {width}, "height": {height}, "encoding": "{encoding}"')
+    if palette is not None:
+        f.write(', "palette": ' + json.dumps([color.hex() for color in
+                                              map(bytes, palette.view(np.uint8).reshape(-1, 4))]))
+    f.write(', "rows": [')
+    for y in range(height):
+        if palette is not None:
+            # Индексы считаются по строке, чтобы не держать в памяти массив на все изображение
+            row = np.searchsorted(palette, colors[y]).astype(np.uint8).tobytes()
+        else:
+            row = rgba[y].tobytes()
+        f.write(f'{"," if y else ""}\n"{_encode_row(row, encoding)}"')
+    f.write('\n]}\n')
+
+def save_to_json(surface: pygame.Surface, filename: str, version: int = JSON_VERSION,
+                 encoding: str = "base64", use_palette: bool = True) -> None:
+    """
+    Сохраняет пиксельное изображение в JSON файл. Документ пишется в файл
+    по строкам пикселей и целиком в памяти не собирается.
+    """
     if not filename.endswith('.json'):
         filename += '.json'
+    if version not in (1, JSON_VERSION):
+        raise ValueError(f"Версия JSON {version} не поддерживается")
+    if encoding not in JSON_ENCODINGS:
+        raise ValueError(f"Неизвестная кодировка строк: {encoding}")
     
-    pixels = []
-    for y in range(surface.get_height()):
-        row = []
-        for x in range(surface.get_width()):
-            color = surface.get_at((x, y))
-            row.append({
-                'r': color.r,
-                'g': color.g,
-                'b': color.b,
-                'a': color.a
-            })
-        pixels.append(row)
-    
-    data = {
-        'width': surface.get_width(),
-        'height': surface.get_height(),
-        'pixels': pixels
-    }
+    width, height = surface.get_size()
+    rgba = np.frombuffer(surface_to_rgba(surface), dtype=np.uint8).reshape(height, width, 4)
     
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
+    with atomic_write(filename, 'w', encoding='utf-8') as f:
+        if version == 1:
+            _write_json_v1(f, rgba)
+        else:
+            _write_json_v2(f, rgba, encoding, use_palette)
+
+def surface_from_rgba(pixels: bytes, width: int, height: int) -> pygame.Surface:
+    """Поверхность холста из байтов RGBA (построчно)"""
+    image = _surface_from_bytes(pixels, (width, height), "RGBA")
+    # Переносим пиксели в поверхность того же формата, что и холст
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    blit_exact(surface, image, (0, 0))
+    return surface
+
+_get_rgba = itemgetter('r', 'g', 'b', 'a')
+
+def _is_component(value) -> bool:
+    """Компонент цвета - целое число (не bool и не строка), умещающееся в int64"""
+    return type(value) is int and -2 ** 63 <= value < 2 ** 63
+
+def _find_bad_pixel(rows, width: int, height: int) -> Optional[str]:
+    """Описание первого некорректного пикселя (медленный проход, только для ошибок)"""
+    for y, row in enumerate(rows[:height]):
+        for x, pixel in enumerate(row[:width]):
+            if not isinstance(pixel, dict) or not all(key in pixel for key in ['r', 'g', 'b', 'a']):
+                return f"Некорректный формат пикселя в позиции ({x}, {y})"
+            if not all(_is_component(value) for value in _get_rgba(pixel)):
+                return f"Некорректное значение пикселя в позиции ({x}, {y})"
+    return None
+
+def _json_pixels_to_rgba(rows, width: int, height: int) -> np.ndarray:
+    """
+    Переводит сетку пикселей-словарей в массив RGBA (height, width, 4) за один
+    проход. Компоненты должны быть целыми числами (строки, bool, дробные,
+    NaN отвергаются с позицией пикселя), ограничение 0..255 - над массивом.
+    Пиксели за пределами width x height игнорируются, недостающие - прозрачные.
+    """
+    if not isinstance(rows, list) or not all(isinstance(row, list) for row in rows[:height]):
+        raise ValueError("Некорректный формат JSON файла")
+    rows = rows[:height]
+    lengths = [min(len(row), width) for row in rows]
+    try:
+        components = [_get_rgba(pixel) for row in rows for pixel in row[:width]]
+    except (KeyError, TypeError):
+        components = None
+    # Типы проверяются до numpy: иначе "5", True и 1.5 молча стали бы числами
+    if components is None or not all(_is_component(value) for pixel in components for value in pixel):
+        raise ValueError(_find_bad_pixel(rows, width, height) or "Некорректный формат пикселей")
+    values = np.array(components, dtype=np.int64).reshape(-1, 4)
+
+    rgba = np.zeros((height, width, 4), dtype=np.uint8)
+    values = np.clip(values, 0, 255).astype(np.uint8)
+    if all(length == width for length in lengths):
+        rgba[:len(rows)] = values.reshape(len(rows), width, 4)
+    else:
+        offset = 0
+        for y, length in enumerate(lengths):
+            rgba[y, :length] = values[offset:offset + length]
+            offset += length
+    return rgba
+
+def _json_v2_to_rgba(data: dict, width: int, height: int) -> np.ndarray:
+    """Строки пикселей JSON версии 2 в массив RGBA (height, width, 4)"""
+    encoding = data.get('encoding')
+    if encoding not in JSON_ENCODINGS:
+        raise ValueError(f"Неизвестная кодировка строк: {encoding}")
+    rows = data.get('rows')
+    if not isinstance(rows, list) or len(rows) != height:
+        raise ValueError("Количество строк пикселей не совпадает с высотой изображения")
+
+    palette = data.get('palette')
+    if palette is not None:
+        # Цвета палитры - строки "rrggbbaa"
+        if (not isinstance(palette, list) or not palette or
+                not all(isinstance(color, str) and len(color) == 8 for color in palette)):
+            raise ValueError("Некорректная палитра")
+        try:
+            palette = np.frombuffer(bytes.fromhex("".join(palette)), dtype=np.uint8).reshape(-1, 4)
+        except ValueError:
+            raise ValueError("Некорректная палитра")
+    pixel_size = 1 if palette is not None else 4
 
+    buffer = bytearray()
+    for y, row in enumerate(rows):
+        try:
+            decoded = _decode_row(row, encoding)
+        except (TypeError, ValueError):
+            raise ValueError(f"Некорректная строка пикселей {y}")
+        if len(decoded) != width * pixel_size:
+            raise ValueError(f"Длина строки пикселей {y} не совпадает с шириной изображения")
+        buffer += decoded
+
+    if palette is None:
+        return np.frombuffer(buffer, dtype=np.uint8).reshape(height, width, 4)
+    indices = np.frombuffer(buffer, dtype=np.uint8).reshape(height, width)
+    bad = np.argwhere(indices >= len(palette))
+    if len(bad):
+        y, x = bad[0]
+        raise ValueError(f"Индекс палитры вне диапазона в позиции ({x}, {y})")
+    return palette[indices]
+
+@traced(cat="io")
 def load_from_json(filepath: str) -> pygame.Surface:
     """Загружает пиксельное изображение из JSON файла"""
     try:
         with open(filepath, 'r', encoding='utf-8') as f:
             data = json.load(f)
             
-        # Проверяем наличие необходимых полей
-        if not all(key in data for key in ['width', 'height', 'pixels']):
+        if not isinstance(data, dict):
+            raise ValueError("Некорректный формат JSON файла")
+
+        # Версия определяется по полю version; у старых файлов версии 1 его нет
+        version = data.get('version', 1)
+        if type(version) is not int or version not in (1, JSON_VERSION):
+            raise ValueError(f"Версия JSON {version} не поддерживается")
+
+        # Проверяем наличие необходимых полей: пиксели версии 1 или строки версии 2
+        pixels_key = 'pixels' if version == 1 else 'rows'
+        if not all(key in data for key in ['width', 'height', pixels_key]):
             raise ValueError("Некорректный формат JSON файла")
             
         # Проверяем размеры
-        if data['width'] <= 0 or data['height'] <= 0:
+        width, height = data['width'], data['height']
+        if not isinstance(width, int) or not isinstance(height, int) or width <= 0 or height <= 0:
             raise ValueError("Некорректные размеры изображения")
             
-        surface = pygame.Surface((data['width'], data['height']), pygame.SRCALPHA)
-        
-        # Загружаем пиксели с проверкой
-        for y, row in enumerate(data['pixels']):
-            for x, pixel in enumerate(row):
-                if not all(key in pixel for key in ['r', 'g', 'b', 'a']):
-                    raise ValueError(f"Некорректный формат пикселя в позиции ({x}, {y})")
-                    
-                color = (
-                    max(0, min(255, pixel['r'])),
-                    max(0, min(255, pixel['g'])),
-                    max(0, min(255, pixel['b'])),
-                    max(0, min(255, pixel['a']))
-                )
-                surface.set_at((x, y), color)
+        if version == 1:
+            rgba = _json_pixels_to_rgba(data['pixels'], width, height)
+        else:
+            rgba = _json_v2_to_rgba(data, width, height)
+        surface = surface_from_rgba(rgba.tobytes(), width, height)
         
         logging.info(f"JSON файл успешно загружен: {filepath}")
         return surface
@@ -75,8 +269,98 @@ def load_from_json(filepath: str) -> pygame.Surface:
         logging.error(f"Непредвиденная ошибка при загрузке JSON: {str(e)}")
         raise
 
-def save_artwork(surface: pygame.Surface, name: str = None) -> Tuple[str, str]:
-    """Сохраняет изображение в форматах PNG и JSON"""
+def save_to_binary(surface: pygame.Surface, filename: str,
+                   compression: int = COMPRESSION_ZLIB) -> None:
+    """Сохраняет изображение в двоичном формате проекта (.apx)"""
+    if not filename.endswith(PROJECT_EXTENSION):
+        filename += PROJECT_EXTENSION
+
+    pixels = surface_to_rgba(surface)
+    if compression == COMPRESSION_ZLIB:
+        data = zlib.compress(pixels, PROJECT_ZLIB_LEVEL)
+    elif compression == COMPRESSION_NONE:
+        data = pixels
+    else:
+        raise ValueError(f"Неизвестный способ сжатия: {compression}")
+
+    header = PROJECT_HEADER.pack(PROJECT_MAGIC, PROJECT_VERSION, compression,
+                                 surface.get_width(), surface.get_height(),
+                                 len(data), zlib.crc32(pixels))
+    with atomic_write(filename) as f:
+        f.write(header)
+        f.write(data)
+
+def is_binary_project(filepath: str) -> bool:
+    """Проверяет сигнатуру двоичного формата проекта"""
+    try:
+        with open(filepath, 'rb') as f:
+            return f.read(len(PROJECT_MAGIC)) == PROJECT_MAGIC
+    except OSError:
+        return False
+
+@traced(cat="io")
+def load_from_binary(filepath: str) -> pygame.Surface:
+    """Загружает изображение из двоичного формата проекта"""
+    try:
+        with open(filepath, 'rb') as f:
+            header = f.read(PROJECT_HEADER.size)
+            if len(header) < PROJECT_HEADER.size:
+                raise ValueError("Файл проекта поврежден: неполный заголовок")
+            magic, version, compression, width, height, length, checksum = \
+                PROJECT_HEADER.unpack(header)
+            if magic != PROJECT_MAGIC:
+                raise ValueError("Некорректный формат файла проекта")
+            if version > PROJECT_VERSION:
+                raise ValueError(f"Версия файла проекта {version} не поддерживается")
+            if width <= 0 or height <= 0:
+                raise ValueError("Некорректные размеры изображения")
+            data = f.read(length)
+        if len(data) != length:
+            raise ValueError("Файл проекта поврежден: данные обрезаны")
+
+        if compression == COMPRESSION_ZLIB:
+            pixels = zlib.decompress(data)
+        elif compression == COMPRESSION_NONE:
+            pixels = data
+        else:
+            raise ValueError(f"Неизвестный способ сжатия: {compression}")
+        if len(pixels) != width * height * 4:
+            raise ValueError("Размер данных не совпадает с размерами изображения")
+        if zlib.crc32(pixels) != checksum:
+            raise ValueError("Файл проекта поврежден: не совпадает контрольная сумма")
+
+        surface = surface_from_rgba(pixels, width, height)
+        logging.info(f"Файл проекта успешно загружен: {filepath}")
+        return surface
+
+    except (ValueError, zlib.error) as e:
+        logging.error(f"Ошибка формата проекта: {str(e)}")
+        raise
+    except Exception as e:
+        logging.error(f"Непредвиденная ошибка при загрузке проекта: {str(e)}")
+        raise
+
+def load_surface(filepath: str) -> pygame.Surface:
+    """Загружает изображение из файла проекта (.apx), JSON или картинки"""
+    if is_binary_project(filepath):
+        return load_from_binary(filepath)
+    if filepath.endswith('.json'):
+        return load_from_json(filepath)
+    surface = pygame.image.load(filepath)
+    if surface.get_bitsize() != 32 or not surface.get_flags() & pygame.SRCALPHA:
+        # Приводим к RGBA без вызова convert_alpha (ему нужно окно)
+        converted = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+        converted.blit(surface, (0, 0))
+        surface = converted
+    return surface
+
+@traced(cat="io")
+def save_artwork(surface: pygame.Surface, name: str = None,
+                 progress: Optional[Callable[[float], None]] = None) -> Tuple[str, str]:
+    """
+    Сохраняет изображение в PNG и в двоичном формате проекта.
+    progress (если задан) получает долю выполненной работы от 0 до 1.
+    """
     # Создаем папку saves в директории проекта
     save_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), "saves")
     if not os.path.exists(save_dir):
@@ -87,22 +371,29 @@ def save_artwork(surface: pygame.Surface, name: str = None) -> Tuple[str, str]:
         counter = 1
         while True:
             base_name = f"artwork_{counter}"
-            if not os.path.exists(os.path.join(save_dir, f"{base_name}.png")) and \
-               not os.path.exists(os.path.join(save_dir, f"{base_name}.json")):
+            if not any(os.path.exists(os.path.join(save_dir, base_name + ext))
+                       for ext in ('.png', '.json', PROJECT_EXTENSION)):
                 name = base_name
                 break
             counter += 1
     
     # Сохраняем PNG
+    if progress:
+        progress(0.0)
     png_path = os.path.join(save_dir, f"{name}.png")
-    pygame.image.save(surface, png_path)
+    with atomic_write(png_path) as f:
+        pygame.image.save(surface, f, "png")
     
-    # Сохраняем JSON
-    json_path = os.path.join(save_dir, f"{name}.json")
-    save_to_json(surface, json_path)
+    # Сохраняем проект
+    if progress:
+        progress(0.5)
+    project_path = os.path.join(save_dir, f"{name}{PROJECT_EXTENSION}")
+    save_to_binary(surface, project_path)
+    if progress:
+        progress(1.0)
     
     print(f"Файлы сохранены в {save_dir}")
-    return png_path, json_path
+    return png_path, project_path
 
 def get_save_directory() -> str:
     """Возвращает путь к директории с сохранениями"""
@@ -115,13 +406,14 @@ def get_available_files() -> List[str]:
         os.makedirs(save_dir)
         return []
         
-    # Поддерживаем оба формата
+    # Поддерживаем все форматы
     files = []
     for file in os.listdir(save_dir):
-        if file.endswith(('.png', '.json')):
+        if file.endswith(('.png', '.json', PROJECT_EXTENSION)):
             files.append(file)
     return sorted(files)
 
+@traced(cat="io")
 def load_project(filename: str, editor) -> bool:
     """Загружает проект из файла"""
     try:
@@ -129,7 +421,7 @@ def load_project(filename: str, editor) -> bool:
         if not os.path.exists(filepath):
             return False
             
-        loaded_surface = load_from_json(filepath)
+        loaded_surface = load_surface(filepath)
         if loaded_surface:
             editor.grid_size = loaded_surface.get_width()
             editor.canvas = loaded_surface
@@ -0,0 +1,84 @@
+import pygame
+from collections import deque
+from typing import Optional
+from .constants import HISTORY_MAX_BYTES
+
+
+class HistoryEntry:
+    """
+    Запись истории: пиксели измененной области до и после действия.
+    Для полных снимков (изменение размера, загрузка) full=True,
+    а before/after содержат весь холст и могут отличаться размером.
+    """
+    __slots__ = ('rect', 'before', 'after', 'full', 'nbytes')
+
+    def __init__(self, rect: pygame.Rect, before: pygame.Surface,
+                 after: pygame.Surface, full: bool = False):
+        self.rect = rect
+        self.before = before
+        self.after = after
+        self.full = full
+        self.nbytes = self._surface_bytes(before) + self._surface_bytes(after)
+
+    @staticmethod
+    def _surface_bytes(surface: pygame.Surface) -> int:
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+
+class History:
+    """
+    История отмены на дельтах измененных областей.
+    Записи хранятся в кольцевом буфере, старые вытесняются по бюджету памяти.
+    """
+
+    def __init__(self, max_bytes: int = HISTORY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._undo = deque()
+        self._redo = []
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def push(self, entry: HistoryEntry) -> None:
+        """Добавляет запись, отбрасывая ветку повтора"""
+        for old in self._redo:
+            self.nbytes -= old.nbytes
+        self._redo.clear()
+
+        self._undo.append(entry)
+        self.nbytes += entry.nbytes
+        self._evict()
+
+    def undo(self) -> Optional[HistoryEntry]:
+        """Возвращает запись для отмены или None"""
+        if not self._undo:
+            return None
+        entry = self._undo.pop()
+        self._redo.append(entry)
+        return entry
+
+    def redo(self) -> Optional[HistoryEntry]:
+        """Возвращает запись для повтора или None"""
+        if not self._redo:
+            return None
+        entry = self._redo.pop()
+        self._undo.append(entry)
+        return entry
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self.nbytes = 0
+
+    def _evict(self) -> None:
+        """Вытесняет самые старые записи, пока не уложимся в бюджет"""
+        # Последнюю запись оставляем всегда, даже если она больше бюджета
+        while self.nbytes > self.max_bytes and len(self._undo) > 1:
+            self.nbytes -= self._undo.popleft().nbytes
@@ -0,0 +1,317 @@
+import logging
+import os
+import re
+import struct
+import zlib
+import numpy as np
+import pygame
+from typing import List, Optional, Tuple
+from .file_io import surface_to_rgba, surface_from_rgba
+
+# Запись журнала: тип операции, длина и crc32 данных, затем данные
+RECORD_HEADER = struct.Struct("<BII")
+OP_RESIZE = 1  # Новый пустой холст: ширина, высота (u16)
+OP_FILL = 2    # Прямоугольник одного цвета: x, y, ширина, высота (u16), RGBA
+OP_RUNS = 3    # Отрезки строк одного цвета: записи RUN_DTYPE подряд
+RESIZE_PAYLOAD = struct.Struct("<HH")
+FILL_PAYLOAD = struct.Struct("<HHHH4s")
+# Цвет хранится байтами RGBA и читается как uint32 в порядке машины,
+# так же как пиксели массива холста
+RUN_DTYPE = np.dtype([('x', '<u2'), ('y', '<u2'), ('n', '<u2'), ('c', '=u4')])
+
+JOURNAL_COMPACT_BYTES = 4 * 1024 * 1024  # После стольких байт журнала пора делать контрольную точку
+_SEGMENT_NAME = re.compile(r"journal_(\d+)\.bin$")
+
+
+def _segment_name(generation: int) -> str:
+    return f"journal_{generation:08d}.bin"
+
+
+def _pixels(surface: pygame.Surface) -> np.ndarray:
+    """Пиксели поверхности массивом uint32 [y, x] (байты RGBA)"""
+    width, height = surface.get_size()
+    return np.frombuffer(surface_to_rgba(surface), dtype=np.uint32).reshape(height, width)
+
+
+def encode_change(x: int, y: int, before: Optional[np.ndarray],
+                  after: np.ndarray) -> Tuple[int, bytes]:
+    """
+    Кодирует изменение области с левым верхним углом (x, y): прямоугольник
+    одного цвета - OP_FILL, иначе отрезки измененных пикселей одного цвета.
+    before=None - область была прозрачной.
+    """
+    height, width = after.shape
+    first = after.flat[0]
+    if (after == first).all():
+        return OP_FILL, FILL_PAYLOAD.pack(x, y, width, height, first.tobytes())
+
+    # Столбец-разделитель не дает отрезкам переходить на следующую строку
+    padded = np.zeros((height, width + 1), dtype=np.uint32)
+    padded[:, :width] = after
+    changed = np.zeros((height, width + 1), dtype=bool)
+    changed[:, :width] = after != 0 if before is None else after != before
+    index = np.flatnonzero(changed)
+    runs = np.empty(0, dtype=RUN_DTYPE)
+    if index.size:
+        colors = padded.flat[index]
+        starts = np.ones(index.size, dtype=bool)
+        starts[1:] = (np.diff(index) != 1) | (colors[1:] != colors[:-1])
+        first_index = np.flatnonzero(starts)
+        runs = np.empty(first_index.size, dtype=RUN_DTYPE)
+        begin = index[first_index]
+        runs['x'] = begin % (width + 1) + x
+        runs['y'] = begin // (width + 1) + y
+        runs['n'] = np.diff(first_index, append=index.size)
+        runs['c'] = colors[first_index]
+    return OP_RUNS, runs.tobytes()
+
+
+class _ReplayCanvas:
+    """
+    Холст при воспроизведении: отрезки операций копятся пачкой и
+    применяются одной записью в массив (при равных позициях побеждает поздняя).
+    """
+
+    def __init__(self, pixels: Optional[np.ndarray] = None):
+        self.pixels = pixels
+        self._chunks: List[bytes] = []
+
+    def resize(self, width: int, height: int) -> None:
+        self._chunks.clear()
+        self.pixels = np.zeros((height, width), dtype=np.uint32)
+
+    def fill(self, x: int, y: int, width: int, height: int, color: bytes) -> None:
+        if self.pixels is None:
+            raise ValueError("Операция до создания холста")
+        canvas_height, canvas_width = self.pixels.shape
+        if x + width > canvas_width or y + height > canvas_height:
+            raise ValueError("Заливка за пределами холста")
+        if (x, y, width, height) == (0, 0, canvas_width, canvas_height):
+            self._chunks.clear()  # Весь холст перекрыт - прежние отрезки не нужны
+            self.pixels[:] = np.frombuffer(color, dtype=np.uint32)[0]
+            return
+        runs = np.empty(height, dtype=RUN_DTYPE)
+        runs['x'], runs['y'], runs['n'] = x, np.arange(y, y + height), width
+        runs['c'] = np.frombuffer(color, dtype=np.uint32)[0]
+        self._chunks.append(runs.tobytes())
+
+    def runs(self, payload: bytes) -> None:
+        if self.pixels is None:
+            raise ValueError("Операция до создания холста")
+        if len(payload) % RUN_DTYPE.itemsize:
+            raise ValueError("Некорректная длина отрезков")
+        self._chunks.append(payload)
+
+    def flush(self) -> None:
+        """Применяет накопленные отрезки"""
+        if not self._chunks:
+            return
+        runs = np.frombuffer(b"".join(self._chunks), dtype=RUN_DTYPE)
+        self._chunks.clear()
+        if not runs.size:
+            return
+        height, width = self.pixels.shape
+        lengths = runs['n'].astype(np.int64)
+        if (runs['y'] >= height).any() or (runs['x'] + lengths > width).any():
+            raise ValueError("Отрезок за пределами холста")
+        # Позиции всех пикселей отрезков по порядку записи
+        starts = runs['y'].astype(np.int64) * width + runs['x']
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(lengths.sum())
+        colors = np.repeat(runs['c'], lengths)
+        # Для повторяющихся позиций оставляем последнюю запись
+        order = np.argsort(positions, kind='stable')
+        positions, colors = positions[order], colors[order]
+        last = np.ones(positions.size, dtype=bool)
+        last[:-1] = positions[1:] != positions[:-1]
+        self.pixels.reshape(-1)[positions[last]] = colors[last]
+
+
+class Journal:
+    """
+    Журнал операций с холстом: каждая зафиксированная правка дописывается
+    компактной двоичной записью в конец сегмента. Сегмент начинается либо
+    с полного состояния холста (begin), либо после контрольной точки
+    автосохранения (rotate); сегменты до контрольной точки удаляются.
+    Сегмент begin создается на диске только с первой записью, поэтому
+    запуск без правок не оставляет журнала для восстановления.
+    """
+
+    def __init__(self, directory: str, compact_bytes: int = JOURNAL_COMPACT_BYTES):
+        self.directory = directory
+        self.compact_bytes = compact_bytes
+        self.generation: Optional[int] = None
+        self._file = None
+        self._base: Optional[np.ndarray] = None  # Холст из begin, пока сегмент не создан
+        # Объем и число записей с последней контрольной точки
+        self.bytes_since_checkpoint = 0
+        self.ops_since_checkpoint = 0
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None or self._base is not None
+
+    @property
+    def needs_compaction(self) -> bool:
+        return self.active and self.bytes_since_checkpoint >= self.compact_bytes
+
+    def segments(self) -> List[Tuple[int, str]]:
+        """Сегменты журнала на диске по порядку: (поколение, путь)"""
+        if not os.path.isdir(self.directory):
+            return []
+        found = []
+        for name in os.listdir(self.directory):
+            match = _SEGMENT_NAME.match(name)
+            if match:
+                found.append((int(match.group(1)), os.path.join(self.directory, name)))
+        return sorted(found)
+
+    def _open_segment(self) -> int:
+        generation = max([segment for segment, _ in self.segments()] + [self.generation or 0]) + 1
+        os.makedirs(self.directory, exist_ok=True)
+        self._file = open(os.path.join(self.directory, _segment_name(generation)), 'ab')
+        self.generation = generation
+        self.bytes_since_checkpoint = 0
+        self.ops_since_checkpoint = 0
+        return generation
+
+    def begin(self, canvas: pygame.Surface) -> None:
+        """
+        Новый сегмент, начинающийся с полного состояния холста. Снимок
+        холста записывается перед первой операцией.
+        """
+        self.close()
+        self._base = _pixels(canvas)
+
+    def _open_base_segment(self) -> None:
+        """Создает сегмент begin: новый холст и его пиксели"""
+        base, self._base = self._base, None
+        self._open_segment()
+        height, width = base.shape
+        self.append(OP_RESIZE, RESIZE_PAYLOAD.pack(width, height))
+        self.append(*encode_change(0, 0, None, base))
+
+    def append(self, op: int, payload: bytes) -> None:
+        """Дописывает запись; flush отдает ее системе сразу (переживает падение программы)"""
+        if self._file is None:
+            if self._base is None:
+                return
+            self._open_base_segment()
+        self._file.write(RECORD_HEADER.pack(op, len(payload), zlib.crc32(payload)))
+        self._file.write(payload)
+        self._file.flush()
+        self.bytes_since_checkpoint += RECORD_HEADER.size + len(payload)
+        self.ops_since_checkpoint += 1
+
+    def record(self, topleft: Tuple[int, int], before: pygame.Surface,
+               after: pygame.Surface, full: bool = False) -> None:
+        """Записывает изменение холста (before/after - пиксели области или всего холста)"""
+        if not self.active:
+            return
+        try:
+            if full and before.get_size() != after.get_size():
+                self.append(OP_RESIZE, RESIZE_PAYLOAD.pack(*after.get_size()))
+                self.append(*encode_change(0, 0, None, _pixels(after)))
+            else:
+                self.append(*encode_change(topleft[0], topleft[1], _pixels(before), _pixels(after)))
+        except Exception as e:
+            # Без журнала остается автосохранение плитками
+            logging.error(f"Ошибка записи журнала: {str(e)}")
+            self.close()
+
+    def rotate(self) -> Optional[int]:
+        """
+        Контрольная точка: дальнейшие записи идут в новый сегмент.
+        Возвращает его поколение (None - журнал не ведется).
+        """
+        if not self.active:
+            return None
+        self.close()  # Снимок из begin больше не нужен: его заменяет контрольная точка
+        try:
+            return self._open_segment()
+        except OSError as e:
+            logging.error(f"Ошибка создания сегмента журнала: {str(e)}")
+            return None
+
+    def remove_before(self, generation: int) -> None:
+        """Удаляет сегменты, вошедшие в записанную контрольную точку"""
+        for segment, path in self.segments():
+            if segment < generation:
+                os.remove(path)
+
+    def close(self) -> None:
+        self._base = None
+        if self._file is None:
+            return
+        try:
+            os.fsync(self._file.fileno())
+            self._file.close()
+        except OSError as e:
+            logging.error(f"Ошибка закрытия журнала: {str(e)}")
+        self._file = None
+
+    def discard(self) -> None:
+        """Закрывает журнал и удаляет все сегменты"""
+        self.close()
+        try:
+            for _, path in self.segments():
+                os.remove(path)
+        except OSError as e:
+            logging.error(f"Ошибка удаления журнала: {str(e)}")
+
+    def replay(self, base: Optional[pygame.Surface] = None,
+               start_generation: int = 0) -> Tuple[Optional[pygame.Surface], int]:
+        """
+        Воспроизводит сегменты начиная с start_generation поверх base.
+        Поврежденный конец (запись, оборванная при падении) отбрасывается.
+        Возвращает (холст или None, число примененных операций).
+        """
+        canvas = _ReplayCanvas(_pixels(base).copy() if base is not None else None)
+        applied = 0
+        try:
+            for generation, path in self.segments():
+                if generation < start_generation:
+                    continue
+                with open(path, 'rb') as f:
+                    data = f.read()
+                count, complete = self._replay_data(data, canvas)
+                applied += count
+                if not complete:
+                    logging.warning(f"Журнал {path} оборван после {count} операций")
+                    break
+            canvas.flush()
+        except Exception as e:
+            logging.error(f"Ошибка воспроизведения журнала: {str(e)}")
+            return None, applied
+        if canvas.pixels is None:
+            return None, applied
+        height, width = canvas.pixels.shape
+        return surface_from_rgba(canvas.pixels.tobytes(), width, height), applied
+
+    @staticmethod
+    def _replay_data(data: bytes, canvas: _ReplayCanvas) -> Tuple[int, bool]:
+        """Применяет записи сегмента. Возвращает (число операций, дочитан ли сегмент)"""
+        view = memoryview(data)
+        offset = count = 0
+        header_size = RECORD_HEADER.size
+        while offset < len(data):
+            if offset + header_size > len(data):
+                return count, False
+            op, length, crc = RECORD_HEADER.unpack_from(data, offset)
+            start = offset + header_size
+            payload = view[start:start + length]
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                return count, False
+            if op == OP_RUNS:
+                canvas.runs(payload)
+            elif op == OP_FILL:
+                x, y, width, height, color = FILL_PAYLOAD.unpack(payload)
+                canvas.fill(x, y, width, height, color)
+            elif op == OP_RESIZE:
+                canvas.flush()
+                canvas.resize(*RESIZE_PAYLOAD.unpack(payload))
+            else:
+                raise ValueError(f"Неизвестная операция журнала: {op}")
+            offset = start + length
+            count += 1
+        return count, True
@@ -0,0 +1,161 @@
+import csv
+import json
+import time
+import numpy as np
+import pygame
+from typing import Dict, List, Sequence
+
+# Этапы кадра в порядке выполнения. "ui" включает "color_picker".
+PROFILER_STAGES = ("events", "canvas", "ui", "color_picker", "magnifier", "dialogs", "present")
+PROFILER_PERCENTILES = (50, 95, 99)
+FRAME_BUDGET_MS = 1000 / 60  # Линия бюджета кадра на графике
+
+
+class _StageTimer:
+    """Контекстный менеджер одного этапа; создается один раз на этап"""
+    __slots__ = ("profiler", "index", "start")
+
+    def __init__(self, profiler, index: int):
+        self.profiler = profiler
+        self.index = index
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.profiler.current[self.index] += time.perf_counter_ns() - self.start
+        return False
+
+
+class FrameProfiler:
+    """
+    Профайлер времени кадра по этапам (time.perf_counter_ns).
+    Последние capacity кадров хранятся в кольцевом буфере: по столбцу
+    на этап и последний столбец - полное время кадра, в наносекундах.
+
+        profiler.begin_frame()
+        with profiler.stage("canvas"):
+            ...
+        profiler.end_frame()
+    """
+
+    def __init__(self, capacity: int = 600, stages: Sequence[str] = PROFILER_STAGES):
+        self.stages = tuple(stages)
+        self.columns = self.stages + ("total",)
+        self.capacity = capacity
+        self.buffer = np.zeros((capacity, len(self.columns)), dtype=np.int64)
+        self.current = [0] * len(self.stages)
+        self.total_frames = 0  # Сколько кадров записано за все время
+        self._frame_start = None
+        self._timers = {name: _StageTimer(self, i) for i, name in enumerate(self.stages)}
+
+    def __len__(self) -> int:
+        return min(self.total_frames, self.capacity)
+
+    def stage(self, name: str) -> _StageTimer:
+        """Замер этапа: with profiler.stage("ui"): ... (повторные замеры суммируются)"""
+        return self._timers[name]
+
+    def begin_frame(self) -> None:
+        self.current[:] = [0] * len(self.stages)
+        self._frame_start = time.perf_counter_ns()
+
+    def end_frame(self) -> None:
+        """Записывает кадр в кольцевой буфер"""
+        if self._frame_start is None:
+            return
+        row = self.buffer[self.total_frames % self.capacity]
+        row[:-1] = self.current
+        row[-1] = time.perf_counter_ns() - self._frame_start
+        self.total_frames += 1
+        self._frame_start = None
+
+    def clear(self) -> None:
+        self.total_frames = 0
+        self._frame_start = None
+
+    def frames(self) -> np.ndarray:
+        """Записанные кадры от старых к новым (копия, в наносекундах)"""
+        count = len(self)
+        if self.total_frames <= self.capacity:
+            return self.buffer[:count].copy()
+        split = self.total_frames % self.capacity
+        return np.concatenate((self.buffer[split:], self.buffer[:split]))
+
+    def percentiles(self, percents: Sequence[int] = PROFILER_PERCENTILES) -> Dict[str, Dict[str, float]]:
+        """Процентили времени по каждому столбцу в миллисекундах"""
+        frames = self.frames()
+        if not len(frames):
+            return {}
+        values = np.percentile(frames, percents, axis=0) / 1e6
+        return {column: {f"p{p}": float(values[i, j]) for i, p in enumerate(percents)}
+                for j, column in enumerate(self.columns)}
+
+    def _rows_ms(self) -> List[List[float]]:
+        """Строки для выгрузки: номер кадра и время столбцов в мс"""
+        frames = self.frames()
+        first = self.total_frames - len(frames)
+        return [[first + i] + [round(value / 1e6, 4) for value in row]
+                for i, row in enumerate(frames.tolist())]
+
+    def dump_csv(self, path: str) -> None:
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{column}_ms" for column in self.columns])
+            writer.writerows(self._rows_ms())
+
+    def dump_json(self, path: str) -> None:
+        data = {
+            "unit": "ms",
+            "columns": ["frame", *self.columns],
+            "summary": self.percentiles(),
+            "frames": self._rows_ms(),
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+
+    def draw(self, editor, pos, width: int = 240) -> pygame.Rect:
+        """
+        Рисует оверлей: p50/p95/p99 по этапам и график полного времени кадра.
+        Возвращает занятую область экрана.
+        """
+        line_height = 16
+        graph_height = 40
+        padding = 6
+        height = padding * 3 + line_height * (len(self.columns) + 1) + graph_height
+        rect = pygame.Rect(pos, (width, height))
+
+        background = editor.surface_pool.get("profiler", rect.size, pygame.SRCALPHA,
+                                             lambda surface: surface.fill((10, 10, 12, 200)))
+        editor.screen.blit(background, rect)
+
+        stats = self.percentiles()
+        color = (230, 230, 230)
+        x, y = rect.x + padding, rect.y + padding
+        value_width = 46  # Ширина столбца значения (выравнивание по правому краю)
+        values_x = rect.right - padding - value_width * len(PROFILER_PERCENTILES)
+        rows = [("этап, мс", [f"p{p}" for p in PROFILER_PERCENTILES])]
+        for column in self.columns:
+            values = stats.get(column, {})
+            rows.append((column, [f"{values.get(f'p{p}', 0):.2f}" for p in PROFILER_PERCENTILES]))
+        for label, cells in rows:
+            editor.screen.blit(editor.render_text(editor.font, label, True, color), (x, y))
+            for i, cell in enumerate(cells):
+                text = editor.render_text(editor.font, cell, True, color)
+                editor.screen.blit(text, text.get_rect(topright=(values_x + value_width * (i + 1), y)))
+            y += line_height
+
+        # График последних кадров (полное время), шкала - удвоенный бюджет кадра
+        graph = pygame.Rect(x, y + padding, width - padding * 2, graph_height)
+        pygame.draw.rect(editor.screen, (60, 60, 66), graph, 1)
+        scale_ms = FRAME_BUDGET_MS * 2
+        budget_y = graph.bottom - int(graph.height * FRAME_BUDGET_MS / scale_ms)
+        pygame.draw.line(editor.screen, (90, 90, 40), (graph.x, budget_y), (graph.right - 1, budget_y))
+        totals = self.frames()[-graph.width:, -1] / 1e6
+        if len(totals) > 1:
+            heights = np.minimum(totals / scale_ms, 1.0) * (graph.height - 1)
+            points = [(graph.x + i, graph.bottom - 1 - int(h)) for i, h in enumerate(heights)]
+            pygame.draw.lines(editor.screen, (0, 200, 120), False, points)
+        return rect
@@ -0,0 +1,356 @@
+import math
+import pygame
+from collections import OrderedDict
+from typing import Dict, Tuple
+from .constants import GRID_MIN_SPACING, GRID_FADE_SPACING
+
+# Цвета шахматного фона холста
+CANVAS_CHECKER_COLORS = ((60, 60, 60), (70, 70, 70))
+
+# Прозрачный цвет-ключ плитки сетки
+GRID_COLORKEY = (255, 0, 255)
+
+
+class LRUCache:
+    """Небольшой кэш с вытеснением давно не использованных элементов"""
+
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._items = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key):
+        """Возвращает элемент или None, отмечая его как недавно использованный"""
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key, item) -> None:
+        self._items[key] = item
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class SurfacePool:
+    """
+    Пул поверхностей с неизменным содержимым (затемнение диалогов, тени).
+    Поверхность создается один раз для (имя, размер, флаги) и затем
+    переиспользуется; после изменения размера окна старые размеры
+    вытесняются как давно не использованные.
+    """
+
+    def __init__(self, max_items: int = 16):
+        self._cache = LRUCache(max_items)
+        self.allocations = 0  # Сколько поверхностей создано пулом
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def get(self, name: str, size, flags: int = 0, init=None) -> pygame.Surface:
+        """
+        Возвращает поверхность из пула. init(surface) вызывается один раз
+        при создании и заполняет ее содержимым.
+        """
+        key = (name, tuple(size), flags)
+        surface = self._cache.get(key)
+        if surface is None:
+            surface = pygame.Surface(size, flags)
+            self.allocations += 1
+            if init is not None:
+                init(surface)
+            self._cache.put(key, surface)
+        return surface
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class TextCache:
+    """
+    Кэш отрисованных надписей по (шрифт, строка, цвет, сглаживание).
+    Статичный текст рендерится один раз, новые поверхности создают только
+    изменяющиеся строки (масштаб, размер, HEX-код цвета).
+    """
+
+    def __init__(self, max_items: int = 512):
+        self._cache = LRUCache(max_items)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def render(self, font: pygame.font.Font, text: str, antialias: bool,
+               color) -> pygame.Surface:
+        """Аналог font.render с кэшированием результата"""
+        key = (font, text, tuple(color), antialias)
+        surface = self._cache.get(key)
+        if surface is None:
+            self.misses += 1
+            surface = font.render(text, antialias, color)
+            self._cache.put(key, surface)
+        else:
+            self.hits += 1
+        return surface
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class CheckerboardCache:
+    """
+    Кэш плиток шахматного фона прозрачности.
+    Плитка рисуется один раз на размер клетки и цвета, а затем
+    размножается блитами с отсечением по нужной области.
+    """
+
+    min_tile_size = 128  # Минимальный размер плитки в пикселях
+
+    def __init__(self):
+        self._tiles: Dict[Tuple, pygame.Surface] = {}
+
+    def invalidate(self) -> None:
+        """Сброс всех плиток (при изменении масштаба или размера холста)"""
+        self._tiles.clear()
+
+    def get_tile(self, cell_size: int, colors) -> pygame.Surface:
+        """Возвращает плитку из целого числа пар клеток"""
+        key = (cell_size, colors)
+        tile = self._tiles.get(key)
+        if tile is None:
+            pairs = max(1, -(-self.min_tile_size // (cell_size * 2)))
+            cells = pairs * 2
+            tile = pygame.Surface((cells * cell_size, cells * cell_size))
+            tile.fill(colors[0])
+            for y in range(cells):
+                for x in range(1 - y % 2, cells, 2):
+                    tile.fill(colors[1], (x * cell_size, y * cell_size, cell_size, cell_size))
+            self._tiles[key] = tile
+        return tile
+
+    def draw(self, target: pygame.Surface, rect, cell_size: int, colors, origin=None) -> None:
+        """
+        Заливает rect шахматным фоном. Клетки отсчитываются от origin
+        (по умолчанию - левый верхний угол rect), рисуется только видимая часть.
+        """
+        rect = pygame.Rect(rect)
+        area = rect.clip(target.get_clip())
+        if not area.width or not area.height:
+            return
+
+        tile = self.get_tile(int(cell_size), colors)
+        tile_w, tile_h = tile.get_size()
+        origin_x, origin_y = origin if origin is not None else rect.topleft
+        start_x = origin_x + (area.x - origin_x) // tile_w * tile_w
+        start_y = origin_y + (area.y - origin_y) // tile_h * tile_h
+
+        old_clip = target.get_clip()
+        target.set_clip(area)
+        for y in range(start_y, area.bottom, tile_h):
+            for x in range(start_x, area.right, tile_w):
+                target.blit(tile, (x, y))
+        target.set_clip(old_clip)
+
+
+def merge_rects(rects):
+    """Объединяет пересекающиеся прямоугольники, чтобы не выводить пиксели дважды"""
+    merged = []
+    for rect in rects:
+        rect = pygame.Rect(rect)
+        if not rect.width or not rect.height:
+            continue
+        # Поглощаем все пересекающиеся, пока они находятся
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
+
+
+def grid_alpha(spacing: float) -> int:
+    """Прозрачность линий сетки в зависимости от расстояния между ними"""
+    if spacing < GRID_MIN_SPACING:
+        return 0
+    if spacing >= GRID_FADE_SPACING:
+        return 255
+    return int(255 * (spacing - GRID_MIN_SPACING) / (GRID_FADE_SPACING - GRID_MIN_SPACING))
+
+
+class GridOverlayCache:
+    """
+    Кэш плитки сетки. Плитка с линиями через каждые zoom пикселей
+    (и основными линиями через major_every клеток) рисуется один раз
+    на масштаб и размножается блитами по видимой части холста.
+    """
+
+    min_tile_size = 128  # Минимальный размер плитки в пикселях
+
+    def __init__(self):
+        self._key = None
+        self._tile = None
+
+    def invalidate(self) -> None:
+        self._key = None
+        self._tile = None
+
+    def get_tile(self, zoom: float, color, major_color, major_every: int = 0):
+        """Возвращает плитку сетки или None, если сетка слишком плотная"""
+        minor_alpha = grid_alpha(zoom)
+        major_alpha = grid_alpha(zoom * major_every) if major_every > 0 else 0
+        if not minor_alpha and not major_alpha:
+            return None
+
+        key = (zoom, color, major_color, major_every, minor_alpha, major_alpha)
+        if key != self._key:
+            # Плитка содержит целое число клеток (и периодов основных линий)
+            period = major_every if major_every > 0 else 1
+            cells = period * max(1, math.ceil(self.min_tile_size / (zoom * period)))
+            size = max(1, round(cells * zoom))
+            if {minor_alpha, major_alpha} <= {0, 255}:
+                # Без затухания хватает прозрачного цвета-ключа: RLE-блит
+                # редких линий заметно быстрее попиксельного смешивания
+                tile = pygame.Surface((size, size))
+                tile.fill(GRID_COLORKEY)
+                tile.set_colorkey(GRID_COLORKEY, pygame.RLEACCEL)
+            else:
+                tile = pygame.Surface((size, size), pygame.SRCALPHA)
+                tile.fill((0, 0, 0, 0))
+            for i in range(cells):
+                if major_alpha and i % major_every == 0:
+                    line_color = (*major_color[:3], major_alpha)
+                elif minor_alpha:
+                    line_color = (*color[:3], minor_alpha)
+                else:
+                    continue
+                offset = round(i * zoom)
+                tile.fill(line_color, (offset, 0, 1, size))
+                tile.fill(line_color, (0, offset, size, 1))
+            self._key = key
+            self._tile = tile
+        return self._tile
+
+    def draw(self, target: pygame.Surface, canvas_rect, zoom: float, color,
+             major_color, major_every: int = 0) -> None:
+        """Рисует сетку поверх холста, включая замыкающие линии справа и снизу"""
+        tile = self.get_tile(zoom, color, major_color, major_every)
+        if tile is None:
+            return
+
+        canvas_rect = pygame.Rect(canvas_rect)
+        # Замыкающие линии лежат на пиксель за пределами холста
+        rect = pygame.Rect(canvas_rect.x, canvas_rect.y,
+                           canvas_rect.width + 1, canvas_rect.height + 1)
+        area = rect.clip(target.get_clip())
+        if not area.width or not area.height:
+            return
+
+        tile_w, tile_h = tile.get_size()
+        start_x = rect.x + (area.x - rect.x) // tile_w * tile_w
+        start_y = rect.y + (area.y - rect.y) // tile_h * tile_h
+
+        old_clip = target.get_clip()
+        target.set_clip(area)
+        for y in range(start_y, area.bottom, tile_h):
+            for x in range(start_x, area.right, tile_w):
+                target.blit(tile, (x, y))
+        target.set_clip(old_clip)
+
+
+class ScaledCanvasCache:
+    """
+    Постоянная увеличенная копия видимой части холста. При изменении
+    пикселей пересчитываются только затронутые блоки, полное масштабирование
+    видимой области - только при смене масштаба, размера холста, замене
+    поверхности или сдвиге видимой области. Размер кэша ограничен экраном
+    и не зависит от размера холста.
+    Масштаб может быть дробным: пиксель x занимает [int(x*zoom), int((x+1)*zoom)).
+    """
+
+    max_dirty_rects = 64  # Больше областей - объединяем в одну
+
+    def __init__(self):
+        self.surface = None
+        self._buffer = None  # Переиспользуемый буфер, растет только при нехватке
+        self._key = None
+        self._view = None
+        self._offset = (0, 0)
+        self._dirty = []
+
+    def invalidate(self) -> None:
+        """Полный пересчет при следующем обращении"""
+        self._key = None
+
+    def invalidate_rect(self, rect) -> None:
+        """Отмечает измененную область холста (в пикселях холста)"""
+        if self._key is None:
+            return
+        self._dirty.append(pygame.Rect(rect))
+        if len(self._dirty) > self.max_dirty_rects:
+            self._dirty = [self._dirty[0].unionall(self._dirty[1:])]
+
+    @staticmethod
+    def scaled_size(size, zoom: float) -> Tuple[int, int]:
+        return int(size[0] * zoom), int(size[1] * zoom)
+
+    @staticmethod
+    def visible_rect(canvas_size, zoom: float, canvas_pos, screen_size) -> pygame.Rect:
+        """Диапазон пикселей холста, попадающих на экран"""
+        x, y = canvas_pos
+        left = max(0, math.floor(-x / zoom))
+        top = max(0, math.floor(-y / zoom))
+        right = min(canvas_size[0], math.ceil((screen_size[0] - x) / zoom))
+        bottom = min(canvas_size[1], math.ceil((screen_size[1] - y) / zoom))
+        return pygame.Rect(left, top, max(0, right - left), max(0, bottom - top))
+
+    def get(self, canvas: pygame.Surface, zoom: float, view=None):
+        """
+        Возвращает увеличенную копию области view холста (по умолчанию - всего)
+        и ее смещение относительно левого верхнего угла увеличенного холста.
+        """
+        view = canvas.get_rect() if view is None else pygame.Rect(view)
+        key = (id(canvas), canvas.get_size(), zoom)
+        if key != self._key or view != self._view:
+            left, top = int(view.x * zoom), int(view.y * zoom)
+            right, bottom = int(view.right * zoom), int(view.bottom * zoom)
+            self.surface = self._get_buffer((right - left, bottom - top))
+            self._offset = (left, top)
+            self._dirty = [view]
+            self._key = key
+            self._view = view
+
+        for rect in self._dirty:
+            rect = rect.clip(view)
+            if rect.width and rect.height:
+                self._update_block(canvas, rect, zoom)
+        self._dirty = []
+        return self.surface, self._offset
+
+    def _get_buffer(self, size) -> pygame.Surface:
+        """Подповерхность общего буфера нужного размера"""
+        width, height = max(1, size[0]), max(1, size[1])
+        if (self._buffer is None or self._buffer.get_width() < width
+                or self._buffer.get_height() < height):
+            buffer_size = (width, height)
+            if self._buffer is not None:
+                buffer_size = (max(width, self._buffer.get_width()),
+                               max(height, self._buffer.get_height()))
+            self._buffer = pygame.Surface(buffer_size, pygame.SRCALPHA)
+        return self._buffer.subsurface((0, 0, size[0], size[1]))
+
+    def _update_block(self, canvas: pygame.Surface, rect: pygame.Rect, zoom: float) -> None:
+        """Масштабирует область холста прямо в кэш без промежуточных поверхностей"""
+        base_x, base_y = self._offset
+        left, top = int(rect.x * zoom) - base_x, int(rect.y * zoom) - base_y
+        right, bottom = int(rect.right * zoom) - base_x, int(rect.bottom * zoom) - base_y
+        if right <= left or bottom <= top:
+            return
+        target = self.surface.subsurface((left, top, right - left, bottom - top))
+        pygame.transform.scale(canvas.subsurface(rect), target.get_size(), target)
@@ -0,0 +1,144 @@
+import logging
+import queue
+import threading
+import time
+import pygame
+from typing import Optional, Tuple
+from .file_io import save_artwork, surface_to_rgba, surface_from_rgba
+
+# Событие, которым фоновый поток будит главный цикл после сохранения
+SAVE_FINISHED_EVENT = pygame.event.custom_type()
+SAVE_STATUS_SECONDS = 3.0  # Сколько показывать результат сохранения
+
+
+class SaveJob:
+    """Снимок пикселей холста и состояние одного сохранения"""
+    __slots__ = ("name", "size", "pixels", "progress", "paths", "error", "finished_at")
+
+    def __init__(self, name: str, size: Tuple[int, int], pixels: bytes):
+        self.name = name
+        self.size = size
+        self.pixels = pixels
+        self.progress = 0.0
+        self.paths = None
+        self.error = None
+        self.finished_at = None
+
+
+class SaveWorker:
+    """
+    Фоновое сохранение: submit() в потоке интерфейса только копирует байты
+    холста, кодирование PNG и проекта и запись файлов идут в отдельном потоке.
+    Задания выполняются по очереди в порядке отправки.
+    """
+
+    def __init__(self, save_func=save_artwork, notify: bool = True):
+        self.save_func = save_func
+        self.notify = notify
+        self.current: Optional[SaveJob] = None
+        self.last: Optional[SaveJob] = None
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._idle = threading.Event()
+        self._idle.set()
+        self._thread = None
+
+    @property
+    def busy(self) -> bool:
+        return self._pending > 0
+
+    def submit(self, surface: pygame.Surface, name: str) -> SaveJob:
+        """Ставит в очередь сохранение текущего состояния поверхности"""
+        job = SaveJob(name, surface.get_size(), surface_to_rgba(surface))
+        with self._lock:
+            self._pending += 1
+            self._idle.clear()
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="save-worker", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+        return job
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Ждет завершения всех заданий; False, если не дождались"""
+        return self._idle.wait(timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> bool:
+        """Дожидается очереди и останавливает поток"""
+        finished = self.wait(timeout)
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join(timeout)
+        return finished
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self.current = job
+            try:
+                surface = surface_from_rgba(job.pixels, *job.size)
+                job.paths = self.save_func(surface, job.name, progress=self._progress_setter(job))
+                print(f"Файл сохранен: {job.name}")
+            except Exception as e:
+                job.error = str(e)
+                logging.error(f"Ошибка фонового сохранения {job.name}: {str(e)}")
+            finally:
+                job.pixels = None  # Снимок больше не нужен
+                job.finished_at = time.monotonic()
+                self.last = job
+                self.current = None
+                with self._lock:
+                    self._pending -= 1
+                    if not self._pending:
+                        self._idle.set()
+                self._post_finished(job)
+
+    @staticmethod
+    def _progress_setter(job: SaveJob):
+        def set_progress(value: float) -> None:
+            job.progress = value
+        return set_progress
+
+    def _post_finished(self, job: SaveJob) -> None:
+        """Будит главный цикл, чтобы он перерисовал статус"""
+        if not self.notify:
+            return
+        try:
+            pygame.event.post(pygame.event.Event(SAVE_FINISHED_EVENT, name=job.name,
+                                                 error=job.error))
+        except pygame.error:
+            pass  # Видео не инициализировано (например, при завершении)
+
+    def status(self) -> Optional[Tuple[str, Optional[float], bool]]:
+        """
+        Строка статуса для интерфейса: (текст, прогресс 0..1 или None, ошибка ли).
+        None - показывать нечего.
+        """
+        job = self.current
+        if job is not None:
+            queued = self._pending - 1
+            text = f"Сохранение {job.name}... {int(job.progress * 100)}%"
+            if queued > 0:
+                text += f" (в очереди: {queued})"
+            return text, job.progress, False
+        job = self.last
+        if job is None or time.monotonic() - job.finished_at > SAVE_STATUS_SECONDS:
+            return None
+        if job.error:
+            return f"Ошибка сохранения {job.name}: {job.error}", None, True
+        return f"Сохранено: {job.name}", None, False
+
+    def status_wakeup_ms(self) -> Optional[int]:
+        """Через сколько мс нужно обновить статус (None - не нужно)"""
+        if self.busy:
+            return 100
+        job = self.last
+        if job is None:
+            return None
+        remaining = SAVE_STATUS_SECONDS - (time.monotonic() - job.finished_at)
+        return int(remaining * 1000) + 1 if remaining > 0 else None
@@ -1,6 +1,10 @@
 import pygame
+import numpy as np
+import bisect
 from typing import Tuple
 import logging
+from .utils import blit_exact
+from .tracing import traced
 
 class Tools:
     def __init__(self, editor):
@@ -11,27 +15,43 @@ class Tools:
         self.drawing = False
         self.start_pos = None
         self.preview_surface = None
+        self.preview_rect = None  # Область холста, занятая предпросмотром
+        self.stroke_active = False  # Открыта ли транзакция штриха карандаша/ластика
         self.temp_surface = pygame.Surface((editor.grid_size, editor.grid_size), pygame.SRCALPHA)
 
     def reset_drawing_state(self):
         """Сброс состояния рисования"""
+        self.end_stroke()
         self.drawing = False
         self.start_pos = None
         self.preview_surface = None
+        self.preview_rect = None
         self.temp_surface.fill((0, 0, 0, 0))
 
+    def begin_stroke(self):
+        """Начало штриха: все пиксели до end_stroke - одна запись истории"""
+        if not self.stroke_active:
+            self.editor.begin_transaction()
+            self.stroke_active = True
+
+    def end_stroke(self):
+        """Завершение штриха"""
+        if self.stroke_active:
+            self.stroke_active = False
+            self.editor.commit_transaction()
+
+    @traced(cat="tools")
     def handle_tool_action(self, pixel_pos, is_dragging=False, is_mouse_up=False):
         """Обработка действий инструментов"""
         try:
             # Если кнопка мыши отпущена, завершаем рисование
             if is_mouse_up:
+                # Убираем предпросмотр с холста
+                if self.drawing:
+                    self.restore_preview_area()
                 if self.drawing and self.start_pos and pixel_pos:
-                    # Рисуем финальную фигуру
-                    if self.preview_surface:
-                        self.editor.canvas = self.preview_surface.copy()
-                    # Финальная отрисовка
+                    # Финальная отрисовка (одна запись истории)
                     self.draw_shape(self.start_pos, pixel_pos)
-                    self.editor.save_state()
                 self.reset_drawing_state()
                 return
 
@@ -45,11 +65,7 @@ class Tools:
                     self.drawing = True
                     self.preview_surface = self.editor.canvas.copy()
                 elif self.drawing and self.start_pos:
-                    # Очищаем временную поверхность
-                    self.temp_surface.fill((0, 0, 0, 0))
-                    # Восстанавливаем состояние из preview
-                    self.editor.canvas = self.preview_surface.copy()
-                    # Рисуем предпросмотр
+                    # Рисуем предпросмотр (прошлый восстанавливается внутри)
                     self.draw_preview_shape(self.start_pos, pixel_pos)
             else:
                 self._handle_basic_tools(pixel_pos, is_dragging)
@@ -59,27 +75,24 @@ class Tools:
 
     def draw_shape(self, start_pos, end_pos):
         """Общий метод для рисования фигур"""
+        self.editor.begin_transaction()
         try:
-            if self.current_tool == "Линия":
-                self._draw_line(start_pos, end_pos)
-            elif self.current_tool == "Прямоугольник":
-                self._draw_rectangle(start_pos, end_pos)
-            elif self.current_tool == "Круг":
-                self._draw_circle(start_pos, end_pos)
+            for point in self._get_shape_points(start_pos, end_pos):
+                self.editor.draw_pixel(point)
         except Exception as e:
             logging.error(f"Ошибка отрисовки фигуры: {str(e)}")
+        finally:
+            self.editor.commit_transaction()
 
-    def _draw_circle(self, start_pos, end_pos, surface=None):
-        """Отрисовка круга"""
-        x0, y0 = start_pos
-        x1, y1 = end_pos
-        for point in self._get_circle_points(x0, y0, x1, y1):
-            x, y = point
-            if 0 <= x < self.editor.grid_size and 0 <= y < self.editor.grid_size:
-                if surface:
-                    surface.set_at((x, y), self.editor.color_manager.current_color)
-                else:
-                    self.editor.draw_pixel((x, y))
+    def _get_shape_points(self, start_pos, end_pos):
+        """Получение точек фигуры текущего инструмента"""
+        if self.current_tool == "Линия":
+            return self._get_line_points(*start_pos, *end_pos)
+        elif self.current_tool == "Прямоугольник":
+            return self._get_rectangle_points(*start_pos, *end_pos)
+        elif self.current_tool == "Круг":
+            return self._get_circle_points(*start_pos, *end_pos)
+        return []
 
     def _get_circle_points(self, x0, y0, x1, y1):
         """Получение точек для круга по алгоритму Брезенхэма"""
@@ -117,6 +130,7 @@ class Tools:
             
         return list(points)
 
+    @traced(cat="tools")
     def draw_preview_shape(self, start_pos, end_pos):
         """Отрисовка предпросмотра фигуры"""
         # Проверяем и обновляем размер временной поверхности
@@ -125,154 +139,128 @@ class Tools:
             
         preview_color = (*self.editor.color_manager.current_color[:3], 128)
         
-        # Очищаем временную поверхность
+        # Убираем прошлый предпросмотр и очищаем временную поверхность
+        old_rect = self.restore_preview_area()
         self.temp_surface.fill((0, 0, 0, 0))
         
         # Получаем точки для фигуры
-        points = []
-        if self.current_tool == "Линия":
-            points = self._get_line_points(*start_pos, *end_pos)
-        elif self.current_tool == "Прямоугольник":
-            points = self._get_rectangle_points(*start_pos, *end_pos)
-        elif self.current_tool == "Круг":
-            points = self._get_circle_points(*start_pos, *end_pos)
+        points = [(x, y) for x, y in self._get_shape_points(start_pos, end_pos)
+                  if 0 <= x < self.editor.grid_size and 0 <= y < self.editor.grid_size]
+        if not points:
+            return
             
         # Отрисовка точек
-        for x, y in points:
-            if 0 <= x < self.editor.grid_size and 0 <= y < self.editor.grid_size:
-                self.temp_surface.set_at((x, y), preview_color)
+        for point in points:
+            self.temp_surface.set_at(point, preview_color)
         
-        # Обновляем холст с предпросмотром
-        if self.preview_surface:
-            self.editor.canvas.blit(self.preview_surface, (0, 0))
-        self.editor.canvas.blit(self.temp_surface, (0, 0))
-
-    def _draw_preview_line(self, start_pos, end_pos, color):
-        x1, y1 = start_pos
-        x2, y2 = end_pos
-        points = self._get_line_points(x1, y1, x2, y2)
-        for x, y in points:
-            if 0 <= x < self.editor.grid_size and 0 <= y < self.editor.grid_size:
-                self.temp_surface.set_at((x, y), color)
-        self.editor.canvas.blit(self.temp_surface, (0, 0))
-
-    def _draw_preview_rectangle(self, start_pos, end_pos, color):
-        x1, y1 = start_pos
-        x2, y2 = end_pos
-        points = self._get_rectangle_points(x1, y1, x2, y2)
-        for x, y in points:
-            if 0 <= x < self.editor.grid_size and 0 <= y < self.editor.grid_size:
-                self.temp_surface.set_at((x, y), color)
-        self.editor.canvas.blit(self.temp_surface, (0, 0))
+        # Обновляем только область холста под фигурой
+        xs = [x for x, _ in points]
+        ys = [y for _, y in points]
+        rect = pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+        self.editor.canvas.blit(self.temp_surface, rect.topleft, rect)
+        self.preview_rect = rect
+        self.editor.invalidate_canvas(rect.union(old_rect) if old_rect else rect)
 
-    def _draw_preview_circle(self, start_pos, end_pos, color):
-        x0, y0 = start_pos
-        x1, y1 = end_pos
-        points = self._get_circle_points(x0, y0, x1, y1)
-        for x, y in points:
-            if 0 <= x < self.editor.grid_size and 0 <= y < self.editor.grid_size:
-                self.temp_surface.set_at((x, y), color)
-        self.editor.canvas.blit(self.temp_surface, (0, 0))
+    def restore_preview_area(self):
+        """Возвращает холсту пиксели под предпросмотром, возвращает их область"""
+        rect = self.preview_rect
+        if rect and self.preview_surface:
+            blit_exact(self.editor.canvas, self.preview_surface.subsurface(rect), rect.topleft)
+            self.editor.invalidate_canvas(rect)
+        self.preview_rect = None
+        return rect
 
-    def _draw_rectangle(self, start_pos, end_pos, surface=None):
-        """Рисование полого прямоугольника с помощью линий Брезенхэма"""
-        surface = surface or self.editor.canvas
-        x1, y1 = start_pos
-        x2, y2 = end_pos
-        min_x, max_x = min(x1, x2), max(x1, x2)
-        min_y, max_y = min(y1, y2), max(y1, y2)
+    @traced(cat="tools")
+    def flood_fill(self, pos: Tuple[int, int]) -> None:
+        """Заливка области построчным (scanline) алгоритмом на массиве пикселей"""
+        x, y = pos
+        canvas = self.editor.canvas
+        # Массив пикселей принял бы отрицательные индексы с другого края
+        if not (0 <= x < canvas.get_width() and 0 <= y < canvas.get_height()):
+            return
+        # map_rgb возвращает знаковое число, массив пикселей - беззнаковый
+        replacement = canvas.map_rgb(self.editor.color_manager.current_color) & 0xFFFFFFFF
         
-        # Рисуем 4 отдельные линии
-        points = []
-        # Верхняя горизонтальная линия
-        for x in range(min_x, max_x + 1):
-            points.append((x, min_y))
-        # Нижняя горизонтальная линия
-        for x in range(min_x, max_x + 1):
-            points.append((x, max_y))
-        # Левая вертикальная линия
-        for y in range(min_y + 1, max_y):
-            points.append((min_x, y))
-        # Правая вертикальная линия
-        for y in range(min_y + 1, max_y):
-            points.append((max_x, y))
+        # Массив пикселей индексируется как [x, y]
+        pixels = pygame.surfarray.pixels2d(canvas)
+        try:
+            target = pixels[x, y]
+            if target == replacement:
+                return
             
-        # Рисуем все точки
-        for x, y in points:
-            if 0 <= x < self.editor.grid_size and 0 <= y < self.editor.grid_size:
-                surface.set_at((x, y), self.editor.color_manager.current_color)
+            mask, bounds = self._fill_mask(pixels == target, x, y)
+            # Записываем всю область одной операцией
+            pixels[mask] = replacement
+        finally:
+            del pixels  # Разблокируем поверхность
+        
+        self.editor.mark_dirty(bounds)
 
-    def _draw_line(self, start_pos, end_pos, surface=None):
-        """Рисование линии на указанной поверхности"""
-        surface = surface or self.editor.canvas
-        x1, y1 = start_pos
-        x2, y2 = end_pos
+    @staticmethod
+    def _fill_mask(match, x: int, y: int):
+        """
+        Находит связную (4-соседство) область совпадающих пикселей.
+        Работает по отрезкам строк: каждый отрезок посещается один раз,
+        строки разбираются только те, до которых дошла заливка.
+        Возвращает маску области [x, y] и ее ограничивающий прямоугольник.
+        """
+        rows = match.T  # [y, x] - строки подряд
+        height, width = rows.shape
         
-        dx = abs(x2 - x1)
-        dy = abs(y2 - y1)
-        x, y = x1, y1
+        # Отрезки совпадающих пикселей строки вычисляются по требованию:
+        # (начала, концы, флаги посещения)
+        runs = [None] * height
         
-        step_x = 1 if x1 < x2 else -1
-        step_y = 1 if y1 < y2 else -1
+        def row_runs(row):
+            if runs[row] is None:
+                edges = np.flatnonzero(np.diff(rows[row], prepend=False, append=False)).tolist()
+                runs[row] = (edges[0::2], edges[1::2], bytearray(len(edges) // 2))
+            return runs[row]
         
-        if dx > dy:
-            err = dx / 2
-            while x != x2:
-                if 0 <= x < self.editor.grid_size and 0 <= y < self.editor.grid_size:
-                    surface.set_at((x, y), self.editor.color_manager.current_color)
-                err -= dy
-                if err < 0:
-                    y += step_y
-                    err += dx
-                x += step_x
-        else:
-            err = dy / 2
-            while y != y2:
-                if 0 <= x < self.editor.grid_size and 0 <= y < self.editor.grid_size:
-                    surface.set_at((x, y), self.editor.color_manager.current_color)
-                err -= dx
-                if err < 0:
-                    x += step_x
-                    err += dy
-                y += step_y
-                
-        if 0 <= x2 < self.editor.grid_size and 0 <= y2 < self.editor.grid_size:
-            surface.set_at((x2, y2), self.editor.color_manager.current_color)
-
-    def flood_fill(self, pos: Tuple[int, int]) -> None:
-        x, y = pos
-        target_color = self.editor.canvas.get_at((x, y))
-        replacement_color = self.editor.color_manager.current_color
+        # Отрезок, содержащий начальную точку
+        starts, ends, visited = row_runs(y)
+        seed = bisect.bisect_right(starts, x) - 1
+        visited[seed] = 1
+        stack = [(y, starts[seed], ends[seed])]
+        filled = []
+        while stack:
+            span = stack.pop()
+            filled.append(span)
+            row, start, end = span
+            for next_row in (row - 1, row + 1):
+                if not 0 <= next_row < height:
+                    continue
+                # Отрезки соседней строки, перекрывающие [start, end)
+                starts, ends, visited = row_runs(next_row)
+                j = bisect.bisect_right(ends, start)
+                while j < len(starts) and starts[j] < end:
+                    if not visited[j]:
+                        visited[j] = 1
+                        stack.append((next_row, starts[j], ends[j]))
+                    j += 1
         
-        if target_color == replacement_color:
-            return
+        # Маска из отрезков: +1 на начале, -1 на конце, накопленная сумма
+        filled_rows, filled_starts, filled_ends = np.array(filled).T
+        delta = np.zeros((height, width + 1), dtype=np.int8)
+        delta[filled_rows, filled_starts] = 1
+        delta[filled_rows, filled_ends] -= 1
+        mask = np.cumsum(delta[:, :width], axis=1, dtype=np.int8).astype(bool)
         
-        stack = [(x, y)]
-        while stack:
-            x, y = stack.pop()
-            if not (0 <= x < self.editor.grid_size and 0 <= y < self.editor.grid_size):
-                continue
-            
-            current_color = self.editor.canvas.get_at((x, y))
-            if current_color != target_color:
-                continue
-            
-            self.editor.draw_pixel((x, y), replacement_color)
-            stack.append((x + 1, y))
-            stack.append((x - 1, y))
-            stack.append((x, y + 1))
-            stack.append((x, y - 1))
+        top, bottom = int(filled_rows.min()), int(filled_rows.max())
+        left, right = int(filled_starts.min()), int(filled_ends.max())
+        bounds = pygame.Rect(left, top, right - left, bottom - top + 1)
+        return mask.T, bounds
 
     def _handle_basic_tools(self, pixel_pos, is_dragging):
         """Обработка базовых инструментов"""
         if self.current_tool == "Карандаш":
+            self.begin_stroke()
             self.editor.draw_pixel(pixel_pos)
         elif self.current_tool == "Ластик":
+            self.begin_stroke()
             self.editor.draw_pixel(pixel_pos, (0, 0, 0, 0))
         elif self.current_tool == "Заливка" and not is_dragging:
-            target_color = self.editor.canvas.get_at(pixel_pos)
             self.flood_fill(pixel_pos)
-            self.editor.save_state()
         elif self.current_tool == "Пипетка" and not is_dragging:
             color = self.editor.canvas.get_at(pixel_pos)
             if color[3] > 0:
@@ -0,0 +1,158 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+# Переменная окружения с путем к файлу трассировки (трассировка выключена, если не задана)
+TRACE_ENV_VAR = "ARTPIXEL_TRACE"
+TRACE_MAX_EVENTS = 1_000_000  # Предел буфера, чтобы длинная сессия не съела память
+
+
+class _Span:
+    """Замер одного интервала; в буфер попадает при выходе из with"""
+    __slots__ = ("tracer", "name", "cat", "args", "start")
+
+    def __init__(self, tracer, name: str, cat: str, args: Optional[dict]):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+        self.start = 0
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer._record(self.name, self.cat, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NullSpan:
+    """Пустой замер для выключенного трассировщика"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    Трассировщик в формате Chrome Trace Event (Perfetto, chrome://tracing).
+    События копятся в памяти кортежами и пишутся в JSON только в flush().
+    Пока трассировщик не запущен, span() и @traced почти ничего не стоят.
+    """
+
+    def __init__(self, max_events: int = TRACE_MAX_EVENTS):
+        self.enabled = False
+        self.path = None
+        self.max_events = max_events
+        self.events = []
+        self.dropped = 0
+        self._origin = 0
+
+    def start(self, path: str) -> None:
+        """Включает запись; события будут сохранены в path при flush()"""
+        self.path = path
+        self.events = []
+        self.dropped = 0
+        self._origin = time.perf_counter_ns()
+        self.enabled = True
+
+    def span(self, name: str, cat: str = "editor", args: Optional[dict] = None):
+        """Интервал: with tracer.span("frame"): ..."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    def _record(self, name, cat, start, end, args) -> None:
+        if not self.enabled:
+            return
+        if len(self.events) >= self.max_events:
+            self.dropped += 1
+            return
+        # list.append атомарен, так что фоновые потоки пишут без блокировки
+        self.events.append((name, cat, start, end - start, threading.get_ident(), args))
+
+    def to_chrome(self) -> dict:
+        """События в формате Chrome Trace Event (время в микросекундах)"""
+        events = list(self.events)
+        pid = os.getpid()
+        trace_events = [{"name": "process_name", "ph": "M", "pid": pid,
+                         "args": {"name": "ArtPixel"}}]
+        thread_names = {threading.main_thread().ident: "main"}
+        for thread in threading.enumerate():
+            thread_names.setdefault(thread.ident, thread.name)
+        for tid in sorted({event[4] for event in events}):
+            trace_events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                                 "args": {"name": thread_names.get(tid, str(tid))}})
+        for name, cat, start, duration, tid, args in events:
+            event = {"name": name, "cat": cat, "ph": "X", "pid": pid, "tid": tid,
+                     "ts": (start - self._origin) / 1000, "dur": duration / 1000}
+            if args:
+                event["args"] = args
+            trace_events.append(event)
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms",
+                "otherData": {"dropped_events": self.dropped}}
+
+    def flush(self) -> Optional[str]:
+        """Сохраняет все накопленные с начала записи события в файл"""
+        if not self.enabled or not self.path:
+            return None
+        try:
+            data = self.to_chrome()
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            logging.info(f"Трассировка сохранена: {self.path} "
+                         f"({len(data['traceEvents'])} событий)")
+            return self.path
+        except Exception as e:
+            logging.error(f"Ошибка сохранения трассировки: {str(e)}")
+            return None
+
+    def stop(self) -> Optional[str]:
+        """Сохраняет события и выключает запись"""
+        path = self.flush()
+        self.enabled = False
+        return path
+
+
+# Общий трассировщик приложения
+tracer = Tracer()
+
+
+def start_from_env() -> bool:
+    """Включает трассировку, если задана переменная окружения ARTPIXEL_TRACE"""
+    path = os.environ.get(TRACE_ENV_VAR)
+    if not path:
+        return False
+    tracer.start(path)
+    logging.info(f"Трассировка включена, файл: {path}")
+    return True
+
+
+def traced(name: Optional[str] = None, cat: str = "editor"):
+    """Декоратор: вызов функции записывается как интервал трассировки"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not tracer.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tracer._record(span_name, cat, start, time.perf_counter_ns(), None)
+        return wrapper
+    return decorator
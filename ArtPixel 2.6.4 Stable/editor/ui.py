@@ -1,6 +1,8 @@
 import pygame
-from typing import Tuple, Dict
-from .constants import SHORTCUTS  # Добавляем импорт
+import numpy as np
+from typing import Tuple, Dict, List
+from .constants import SHORTCUTS, INFO_STATS_REFRESH_MS  # Добавляем импорт
+from .render import LRUCache
 
 class UI:
     def __init__(self, editor):
@@ -32,7 +34,7 @@ class UI:
         self.tools_panel_height = 440  # Уменьшаем высоту панели с 460 до 440
 
         # Вычисляем высоту информационной панели на основе количества строк
-        base_info_lines = 2  # Базовая информация
+        base_info_lines = 3  # Базовая информация
         shortcut_lines = (
             1 +  # Заголовок "Управление"
             1 +  # СКМ
@@ -70,6 +72,24 @@ class UI:
         self.hex_input_rect = None
         self.hex_input_active = False
 
+        # Градиенты квадрата насыщенности/яркости по оттенкам
+        self.sv_cache = LRUCache(8)
+        # Полоса оттенков и полосы прозрачности по цвету
+        self.hue_surface = None
+        self.alpha_cache = LRUCache(8)
+
+        # Готовые слои боковых колонок и состояние уже нарисованного в них
+        self.left_layer = None
+        self.right_layer = None
+        self.right_x = 0
+        self.button_states: Dict[str, Tuple[bool, bool]] = {}
+        self.info_lines_drawn = None
+        # Статистика кадра и время ее последнего вывода
+        self.stats_drawn = None
+        self.stats_drawn_at = 0
+        self.picker_state_drawn = None  # Состояние пикера в последнем выведенном кадре
+        self.shadow_cache: Dict[Tuple[int, int], pygame.Surface] = {}
+
     def _setup_rects(self):
         """Централизованная настройка прямоугольников"""
         self.tools_panel_rect = pygame.Rect(
@@ -155,51 +175,150 @@ class UI:
             self.button_height
         )
 
-    def draw(self) -> None:
+    def draw(self, full: bool = False) -> List[pygame.Rect]:
+        """
+        Рисует боковые колонки поверх прошлого кадра: на экран копируются
+        и сообщаются редактору только изменившиеся области (перерисованные
+        кнопки, строки информации и пикер). full=True - колонки целиком.
+        """
         try:
+            screen = self.editor.screen
             # Обновляем позицию цветовой панели при каждой отрисовке
-            self.color_picker_rect.x = self.editor.screen.get_width() - self.side_panel_width + self.panel_margin
-            
-            # Рисуем основные панели и их фоны
-            pygame.draw.rect(self.editor.screen, self.colors['bg'], 
-                            (0, 0, self.side_panel_width, self.editor.screen.get_height()))
-            pygame.draw.rect(self.editor.screen, self.colors['bg'], 
-                            (self.editor.screen.get_width() - self.side_panel_width, 0, 
-                             self.side_panel_width, self.editor.screen.get_height()))
-        
-            # Рисуем разделительные линии
-            pygame.draw.line(self.editor.screen, self.colors['border'],
-                            (self.side_panel_width, 0), 
-                            (self.side_panel_width, self.editor.screen.get_height()), 2)
-            pygame.draw.line(self.editor.screen, self.colors['border'],
-                            (self.editor.screen.get_width() - self.side_panel_width, 0), 
-                            (self.editor.screen.get_width() - self.side_panel_width, self.editor.screen.get_height()), 2)
-        
-            # Рисуем панели в правильном порядке с проверками
-            if hasattr(self, 'tools_panel_rect'):
-                self.draw_tools_panel()
-            if hasattr(self, 'color_picker_rect'):
+            self.color_picker_rect.x = screen.get_width() - self.side_panel_width + self.panel_margin
+
+            # Боковые колонки - готовые слои, обновляемые только при изменениях
+            left_changed = self.update_left_layer()
+            right_changed = self.update_right_layer()
+            if full:
+                screen.blit(self.left_layer, (0, 0))
+                screen.blit(self.right_layer, (self.right_x, 0))
+            else:
+                for rect in left_changed:
+                    screen.blit(self.left_layer, rect, rect)
+                for rect in right_changed:
+                    screen.blit(self.right_layer, rect, rect.move(-self.right_x, 0))
+                # Индикаторы пикера рисуются заново по чистому фону панели
+                screen.blit(self.right_layer, self.color_picker_rect,
+                            self.color_picker_rect.move(-self.right_x, 0))
+
+            # Градиенты и индикаторы цветового пикера поверх фона панели
+            with self.editor.profiler.stage("color_picker"):
                 self.draw_color_picker()
-            if hasattr(self, 'info_rect'):
-                self.draw_info_panel()
-                
+            changed = left_changed + right_changed
+            picker_state = self._picker_state()
+            if picker_state != self.picker_state_drawn:
+                changed.append(self.color_picker_rect.copy())
+                self.picker_state_drawn = picker_state
+
+            for rect in changed:
+                self.editor.add_dirty_rect(rect)
+            return changed
+
         except Exception as e:
             print(f"Ошибка отрисовки UI: {str(e)}")
+            return []
+
+    def repaint(self) -> None:
+        """
+        Выводит колонки и пикер из готовых слоев без проверки изменений.
+        Вызывается редактором при перерисовке области экрана под клипом.
+        """
+        if self.left_layer is None or self.right_layer is None:
+            return
+        self.editor.screen.blit(self.left_layer, (0, 0))
+        self.editor.screen.blit(self.right_layer, (self.right_x, 0))
+        with self.editor.profiler.stage("color_picker"):
+            self.draw_color_picker()
+
+    def _picker_state(self):
+        """Все, от чего зависит вид цветового пикера"""
+        manager = self.editor.color_manager
+        return (manager.hue, manager.sv_s, manager.sv_v, manager.alpha,
+                tuple(manager.current_color), self.editor.ui_accent_color,
+                self.color_picker_rect.topleft)
+
+    def invalidate_layers(self) -> None:
+        """Сбрасывает слои панелей; они будут перерисованы целиком"""
+        self.left_layer = None
+        self.right_layer = None
+
+    def update_left_layer(self) -> List[pygame.Rect]:
+        """
+        Слой левой колонки: панели инструментов и информации.
+        Координаты слоя совпадают с экранными. Полностью перерисовывается
+        только при изменении высоты окна; наведение и выбор инструмента
+        обновляют отдельные кнопки, а изменение масштаба - строки информации.
+        Возвращает перерисованные области слоя.
+        """
+        screen_h = self.editor.screen.get_height()
+        size = (self.side_panel_width + 2, screen_h)
+        if self.left_layer is None or self.left_layer.get_size() != size:
+            self.left_layer = pygame.Surface(size)
+            self.left_layer.fill(self.colors['bg'])
+            pygame.draw.line(self.left_layer, self.colors['border'],
+                             (self.side_panel_width, 0), (self.side_panel_width, screen_h), 2)
+            self.button_states.clear()
+            self.info_lines_drawn = None
+            self.stats_drawn = None
+            self.draw_tools_panel(self.left_layer)
+            self.draw_info_panel(self.left_layer)
+            return [self.left_layer.get_rect()]
+        return (self.update_tool_buttons(self.left_layer) + self.update_info_lines(self.left_layer) +
+                self.update_stats_line(self.left_layer))
+
+    def update_right_layer(self) -> List[pygame.Rect]:
+        """
+        Слой правой колонки: фон, разделитель и панель пикера с тенью.
+        Возвращает экранную область слоя, если он был перерисован.
+        """
+        screen_w, screen_h = self.editor.screen.get_size()
+        self.right_x = screen_w - self.side_panel_width
+        size = (self.side_panel_width, screen_h)
+        if self.right_layer is None or self.right_layer.get_size() != size:
+            self.right_layer = pygame.Surface(size)
+            self.right_layer.fill(self.colors['bg'])
+            pygame.draw.line(self.right_layer, self.colors['border'], (0, 0), (0, screen_h), 2)
+            self.draw_panel_with_shadow(self.color_picker_rect.move(-self.right_x, 0), "Выбор цвета",
+                                        self.right_layer)
+            return [self.right_layer.get_rect(x=self.right_x)]
+        return []
+
+    def _info_dynamic_lines(self):
+        """Изменяющиеся строки информационной панели"""
+        return [
+            f"Размер холста: {self.editor.grid_size}x{self.editor.grid_size}",
+            f"Масштаб: {self.editor.zoom}x",
+        ]
+
+    def _info_lines_rect(self) -> pygame.Rect:
+        """Область изменяющихся строк информационной панели"""
+        return pygame.Rect(self.info_rect.x + 1, self.info_rect.y + 40,
+                           self.info_rect.width - 2, len(self._info_dynamic_lines()) * 20)
 
-    def draw_info_panel(self):
+    def _stats_line_rect(self) -> pygame.Rect:
+        """Строка статистики кадра под изменяющимися строками"""
+        rect = self._info_lines_rect()
+        return pygame.Rect(rect.x, rect.bottom, rect.width, 20)
+
+    def draw_info_panel(self, target: pygame.Surface = None):
         """Отрисовка информационной панели"""
+        target = target or self.editor.screen
         # Рисуем информационную панель
-        pygame.draw.rect(self.editor.screen, self.colors['panel'], self.info_rect, border_radius=8)
-        pygame.draw.rect(self.editor.screen, self.colors['border'], self.info_rect, 1, border_radius=8)
+        pygame.draw.rect(target, self.colors['panel'], self.info_rect, border_radius=8)
+        pygame.draw.rect(target, self.colors['border'], self.info_rect, 1, border_radius=8)
 
         # Заголовок информационной панели
-        title = self.large_font.render("Информация", True, self.colors['text'])
-        self.editor.screen.blit(title, (self.info_rect.x + 10, self.info_rect.y + 10))
+        title = self.editor.render_text(self.large_font, "Информация", True, self.colors['text'])
+        target.blit(title, (self.info_rect.x + 10, self.info_rect.y + 10))
+
+        # Базовая информация (перерисовывается отдельно в update_info_lines)
+        self.info_lines_drawn = None
+        self.update_info_lines(target)
+        self.stats_drawn = None
+        self.update_stats_line(target)
 
-        # Базовая информация
+        # Статичная справка
         info_text = [
-            f"Размер холста: {self.editor.grid_size}x{self.editor.grid_size}",
-            f"Масштаб: {self.editor.zoom}x",
             "",
             "Управление:",
             "СКМ - Перемещение холста",
@@ -216,54 +335,98 @@ class UI:
             *[v for v in SHORTCUTS["CANVAS"].values()]
         ]
 
-        y = self.info_rect.y + 40
+        y = self._stats_line_rect().bottom
         for line in info_text:
             if (line.startswith("Файл:") or 
                 line.startswith("Редактирование:") or 
                 line.startswith("Холст:") or
                 line.startswith("Управление:")):
-                text = self.large_font.render(line, True, self.colors['text'])
+                text = self.editor.render_text(self.large_font, line, True, self.colors['text'])
             else:
-                text = self.font.render(line, True, self.colors['text'])
-            self.editor.screen.blit(text, (self.info_rect.x + 10, y))
+                text = self.editor.render_text(self.font, line, True, self.colors['text'])
+            target.blit(text, (self.info_rect.x + 10, y))
             y += 20  # Отступ между строками
 
-    def draw_tools_panel(self) -> None:
+    def update_info_lines(self, target: pygame.Surface) -> List[pygame.Rect]:
+        """Перерисовывает изменяющиеся строки информации, если они изменились"""
+        lines = self._info_dynamic_lines()
+        if lines == self.info_lines_drawn:
+            return []
+        rect = self._info_lines_rect()
+        target.fill(self.colors['panel'], rect)
+        y = rect.y
+        for line in lines:
+            text = self.editor.render_text(self.font, line, True, self.colors['text'])
+            target.blit(text, (self.info_rect.x + 10, y))
+            y += 20
+        self.info_lines_drawn = lines
+        return [rect]
+
+    def update_stats_line(self, target: pygame.Surface) -> List[pygame.Rect]:
+        """
+        Перерисовывает статистику кадра не чаще INFO_STATS_REFRESH_MS.
+        Значения меняются каждый кадр, поэтому строка рендерится
+        напрямую, мимо кэша текста.
+        """
+        stats = (self.editor.frame_count, self.editor.pixels_pushed)
+        now = pygame.time.get_ticks()
+        if stats == self.stats_drawn or (
+                self.stats_drawn is not None and now - self.stats_drawn_at < INFO_STATS_REFRESH_MS):
+            return []
+        rect = self._stats_line_rect()
+        target.fill(self.colors['panel'], rect)
+        text = self.font.render(f"Кадр {stats[0]}: {stats[1]} пикс.", True, self.colors['text'])
+        target.blit(text, (self.info_rect.x + 10, rect.y))
+        self.stats_drawn = stats
+        self.stats_drawn_at = now
+        return [rect]
+
+    def _panel_buttons(self):
+        """Кнопки панели инструментов: (ключ, rect, подпись, выбрана ли)"""
+        buttons = [(tool, self.tool_buttons[tool], tool, tool == self.editor.tools.current_tool)
+                   for tool in self.editor.tools.tools]
+        buttons += [
+            ("clear", self.clear_button_rect, "Очистить", False),
+            ("resize", self.resize_button_rect, "Изменить размер", False),
+            ("open", self.open_button_rect, "Открыть", False),
+            ("save", self.save_button_rect, "Сохранить", False),
+        ]
+        return buttons
+
+    def draw_tools_panel(self, target: pygame.Surface = None) -> None:
+        target = target or self.editor.screen
         # Рисуем фон панели инструментов
-        pygame.draw.rect(self.editor.screen, self.colors['panel'], self.tools_panel_rect, border_radius=8)
-        pygame.draw.rect(self.editor.screen, self.colors['border'], self.tools_panel_rect, 1, border_radius=8)
+        pygame.draw.rect(target, self.colors['panel'], self.tools_panel_rect, border_radius=8)
+        pygame.draw.rect(target, self.colors['border'], self.tools_panel_rect, 1, border_radius=8)
         
         # Заголовок по центру
-        title = self.large_font.render("Инструменты", True, self.colors['text'])
+        title = self.editor.render_text(self.large_font, "Инструменты", True, self.colors['text'])
         title_rect = title.get_rect(
             centerx=self.tools_panel_rect.centerx,
             top=self.tools_panel_rect.y + 12
         )
-        self.editor.screen.blit(title, title_rect)
+        target.blit(title, title_rect)
         
-        # Отрисовка кнопок инструментов с улучшенной проверкой наведения
-        mouse_pos = pygame.mouse.get_pos()
-        
-        for tool in self.editor.tools.tools:
-            button_rect = self.tool_buttons[tool]
-            is_selected = tool == self.editor.tools.current_tool
-            is_hovered = self.check_button_hover(button_rect, mouse_pos)
-            self.draw_tool_button(button_rect, tool, is_selected, is_hovered)
+        # Отрисовка кнопок инструментов и утилитных кнопок
+        self.button_states.clear()
+        self.update_tool_buttons(target)
 
-        # Отрисовка утилитных кнопок
-        is_hovered = self.check_button_hover(self.clear_button_rect, mouse_pos)
-        self.draw_tool_button(self.clear_button_rect, "Очистить", False, is_hovered)
-
-        is_hovered = self.check_button_hover(self.resize_button_rect, mouse_pos)
-        self.draw_tool_button(self.resize_button_rect, "Изменить размер", False, is_hovered)
-
-        # Добавляем отрисовку кнопки открытия
-        is_hovered = self.check_button_hover(self.open_button_rect, mouse_pos)
-        self.draw_tool_button(self.open_button_rect, "Открыть", False, is_hovered)
-        
-        # Отрисовка кнопки сохранения
-        is_hovered = self.check_button_hover(self.save_button_rect, mouse_pos)
-        self.draw_tool_button(self.save_button_rect, "Сохранить", False, is_hovered)
+    def update_tool_buttons(self, target: pygame.Surface) -> List[pygame.Rect]:
+        """
+        Перерисовывает только кнопки, у которых изменилось выделение или
+        наведение. Возвращает их области.
+        """
+        mouse_pos = pygame.mouse.get_pos()
+        changed = []
+        for key, rect, label, active in self._panel_buttons():
+            state = (active, self.check_button_hover(rect, mouse_pos))
+            if self.button_states.get(key) != state:
+                # Закрашиваем фоном панели скругленные углы прежней кнопки
+                target.fill(self.colors['panel'], rect)
+                self.draw_tool_button(rect, label, *state, target)
+                self.button_states[key] = state
+                changed.append(rect.copy())
+        return changed
 
     def draw_color_picker(self) -> None:
         """Оптимизированная отрисовка цветового пикера"""
@@ -282,16 +445,15 @@ class UI:
             self.editor.color_manager.sv_square_rect = pygame.Rect(*rects['sv'])
             self.editor.color_manager.alpha_bar_rect = pygame.Rect(*rects['alpha'])
             
-            # Отрисовка компонентов
+            # Отрисовка компонентов (вывод на экран - в PixelArtEditor.present)
             self._draw_color_picker_components()
-            pygame.display.update(self.color_picker_rect)
             
         except Exception as e:
             print(f"Ошибка Color Picker: {str(e)}")
 
     def _draw_color_picker_components(self):
         """Вспомогательный метод для отрисовки компонентов цветового пикера"""
-        self.draw_panel_with_shadow(self.color_picker_rect, "Выбор цвета")
+        # Фон панели с тенью и заголовком уже в слое правой колонки
         self.draw_hue_bar()
         self.draw_sv_square()
         self.draw_alpha_bar()
@@ -305,23 +467,34 @@ class UI:
         )
         self.draw_color_preview_enhanced(preview_rect)
 
-    def draw_panel_with_shadow(self, rect, title):
+    def get_shadow(self, size) -> pygame.Surface:
+        """Полупрозрачная тень панели заданного размера (кэшируется)"""
+        size = tuple(size)
+        shadow = self.shadow_cache.get(size)
+        if shadow is None:
+            shadow = pygame.Surface(size, pygame.SRCALPHA)
+            shadow.fill((0, 0, 0, 40))
+            self.shadow_cache[size] = shadow
+        return shadow
+
+    def draw_panel_with_shadow(self, rect, title, target: pygame.Surface = None):
+        target = target or self.editor.screen
         # Тень
-        shadow = pygame.Surface((rect.width + 4, rect.height + 4), pygame.SRCALPHA)
-        shadow.fill((0, 0, 0, 40))
-        self.editor.screen.blit(shadow, (rect.x - 2, rect.y - 2))
+        target.blit(self.get_shadow((rect.width + 4, rect.height + 4)), (rect.x - 2, rect.y - 2))
         
         # Основная панель
-        pygame.draw.rect(self.editor.screen, self.colors['panel'], rect, border_radius=10)
-        pygame.draw.rect(self.editor.screen, self.colors['border'], rect, 1, border_radius=10)
+        pygame.draw.rect(target, self.colors['panel'], rect, border_radius=10)
+        pygame.draw.rect(target, self.colors['border'], rect, 1, border_radius=10)
         
         # Заголовок
-        title_surf = self.large_font.render(title, True, self.colors['text'])
-        self.editor.screen.blit(title_surf, (rect.x + 12, rect.y + 12))
+        title_surf = self.editor.render_text(self.large_font, title, True, self.colors['text'])
+        target.blit(title_surf, (rect.x + 12, rect.y + 12))
 
-    def draw_tool_button(self, rect: pygame.Rect, tool: str, active: bool, hovered: bool) -> None:
+    def draw_tool_button(self, rect: pygame.Rect, tool: str, active: bool, hovered: bool,
+                         target: pygame.Surface = None) -> None:
         if rect is None:  # Добавляем проверку
             return
+        target = target or self.editor.screen
         
         # Фон кнопки
         color = (
@@ -331,16 +504,16 @@ class UI:
         )
         
         # Рисуем кнопку с эффектами
-        pygame.draw.rect(self.editor.screen, color, rect, border_radius=8)
+        pygame.draw.rect(target, color, rect, border_radius=8)
         if active or hovered:
-            pygame.draw.rect(self.editor.screen, self.colors['accent'], rect, 2, border_radius=8)
+            pygame.draw.rect(target, self.colors['accent'], rect, 2, border_radius=8)
         else:
-            pygame.draw.rect(self.editor.screen, self.colors['border'], rect, 1, border_radius=8)
+            pygame.draw.rect(target, self.colors['border'], rect, 1, border_radius=8)
         
         # Текст инструмента
-        text = self.font.render(tool, True, self.colors['text'])
+        text = self.editor.render_text(self.font, tool, True, self.colors['text'])
         text_rect = text.get_rect(center=rect.center)
-        self.editor.screen.blit(text, text_rect)
+        target.blit(text, text_rect)
 
     def draw_color_preview_enhanced(self, rect):
         """Исправляем отображение текущего цвета."""
@@ -351,21 +524,13 @@ class UI:
 
         # HEX-код
         hex_color = self.editor.color_manager.rgb_to_hex(self.editor.color_manager.current_color[:3])
-        hex_text = self.font.render(hex_color, True, self.colors['text'])
+        hex_text = self.editor.render_text(self.font, hex_color, True, self.colors['text'])
         hex_rect = hex_text.get_rect(center=color_rect.center)
         self.editor.screen.blit(hex_text, hex_rect)
 
     def draw_transparency_bg(self, rect):
-        # Рисует шахматный фон для отображения прозрачности
-        square_size = 5
-        for y in range(rect.height // square_size):
-            for x in range(rect.width // square_size):
-                color = (200, 200, 200) if (x + y) % 2 == 0 else (150, 150, 150)
-                pygame.draw.rect(self.editor.screen, color, (
-                    rect.x + x * square_size,
-                    rect.y + y * square_size,
-                    square_size, square_size
-                ))
+        # Рисует шахматный фон для отображения прозрачности (из общего кэша)
+        self.editor.checker_cache.draw(self.editor.screen, rect, 5, ((200, 200, 200), (150, 150, 150)))
 
     def draw_hue_bar(self):
         rect = self.editor.color_manager.hue_bar_rect
@@ -374,12 +539,8 @@ class UI:
         # Рисуем фон и рамку
         pygame.draw.rect(self.editor.screen, (40, 40, 45), rect.inflate(border*2, border*2), border_radius=4)
         
-        # Рисуем градиент оттенков
-        for y in range(rect.height):
-            color = self.editor.color_manager.hsv_to_rgb(y / rect.height, 1, 1)
-            pygame.draw.line(self.editor.screen, color, 
-                           (rect.x, rect.y + y), 
-                           (rect.right, rect.y + y))
+        # Градиент оттенков (строится один раз)
+        self.editor.screen.blit(self.get_hue_surface(rect.size), rect.topleft)
         
         # Рисуем рамку
         pygame.draw.rect(self.editor.screen, self.editor.ui_accent_color, rect.inflate(border*2, border*2), 1, border_radius=4)
@@ -397,13 +558,8 @@ class UI:
         # Рисуем фон и рамку
         pygame.draw.rect(self.editor.screen, (40, 40, 45), rect.inflate(border*2, border*2), border_radius=4)
         
-        # Рисуем градиент насыщенности и яркости
-        for y in range(rect.height):
-            for x in range(rect.width):
-                s = x / rect.width
-                v = 1 - (y / rect.height)
-                color = self.editor.color_manager.hsv_to_rgb(self.editor.color_manager.hue, s, v)
-                pygame.draw.rect(self.editor.screen, color, (rect.x + x, rect.y + y, 1, 1))
+        # Градиент насыщенности и яркости из кэша
+        self.editor.screen.blit(self.get_sv_surface(rect.size, self.editor.color_manager.hue), rect.topleft)
         
         # Рисуем рамку
         pygame.draw.rect(self.editor.screen, self.editor.ui_accent_color, rect.inflate(border*2, border*2), 1, border_radius=4)
@@ -419,20 +575,56 @@ class UI:
         pygame.draw.circle(self.editor.screen, (40, 40, 45), 
                          (rect.x + curr_x, rect.y + curr_y), 5)
 
+    def get_sv_surface(self, size, hue: float) -> pygame.Surface:
+        """Градиент квадрата S/V для оттенка: строится векторно и кэшируется"""
+        key = (tuple(size), hue)
+        surface = self.sv_cache.get(key)
+        if surface is None:
+            width, height = size
+            # Оси массива surfarray: [x, y]
+            s = (np.arange(width) / width)[:, None]
+            v = (1 - np.arange(height) / height)[None, :]
+            rgb = self.editor.color_manager.hsv_to_rgb_array(hue, s, v)
+            surface = pygame.surfarray.make_surface(rgb)
+            self.sv_cache.put(key, surface)
+        return surface
+
+    def get_hue_surface(self, size) -> pygame.Surface:
+        """Вертикальный градиент оттенков; не зависит от цвета и строится один раз"""
+        if self.hue_surface is None or self.hue_surface.get_size() != tuple(size):
+            width, height = size
+            hues = (np.arange(height) / height)[None, :]
+            rgb = self.editor.color_manager.hsv_to_rgb_array(hues, 1.0, 1.0)
+            self.hue_surface = pygame.surfarray.make_surface(np.repeat(rgb, width, axis=0))
+        return self.hue_surface
+
+    def get_alpha_surface(self, size, rgb) -> pygame.Surface:
+        """Полоса прозрачности для цвета rgb: шахматный фон с наложенным градиентом"""
+        key = (tuple(size), rgb)
+        surface = self.alpha_cache.get(key)
+        if surface is None:
+            width, height = size
+            surface = pygame.Surface(size)
+            self.editor.checker_cache.draw(surface, surface.get_rect(), 5,
+                                           ((200, 200, 200), (150, 150, 150)))
+
+            gradient = pygame.Surface(size, pygame.SRCALPHA)
+            gradient.fill(rgb)
+            alpha = pygame.surfarray.pixels_alpha(gradient)
+            alpha[:] = (np.arange(width) * 255 // width)[:, None]
+            del alpha  # Освобождаем блокировку поверхности
+
+            surface.blit(gradient, (0, 0))
+            self.alpha_cache.put(key, surface)
+        return surface
+
     def draw_alpha_bar(self):
         rect = self.editor.color_manager.alpha_bar_rect
         border = 2
         
-        # Фон для прозрачности
-        self.draw_transparency_bg(rect)
-        
-        # Рисуем градиент прозрачности
-        for x in range(rect.width):
-            alpha = x / rect.width
-            color = (*self.editor.color_manager.current_color[:3], int(255 * alpha))
-            pygame.draw.line(self.editor.screen, color,
-                           (rect.x + x, rect.y),
-                           (rect.x + x, rect.bottom))
+        # Шахматный фон с градиентом прозрачности из кэша
+        rgb = tuple(self.editor.color_manager.current_color[:3])
+        self.editor.screen.blit(self.get_alpha_surface(rect.size, rgb), rect.topleft)
         
         # Рамка
         pygame.draw.rect(self.editor.screen, self.editor.ui_accent_color, rect, 1)
@@ -1,6 +1,8 @@
 import logging
 import sys
 import os
+import pygame
+from contextlib import contextmanager
 
 def setup_logger():
     """Настройка логгера с проверками и безопасной инициализацией"""
@@ -71,3 +73,49 @@ def log_message(message: str, level: str = "INFO") -> bool:
     except Exception as e:
         print(f"Ошибка логирования: {str(e)}")
         return False
+
+def blit_exact(dst: pygame.Surface, src: pygame.Surface, pos) -> None:
+    """Копирует пиксели src в dst без альфа-смешивания (RGBA один в один)"""
+    dst.fill((0, 0, 0, 0), pygame.Rect(pos, src.get_size()))
+    dst.blit(src, pos, special_flags=pygame.BLEND_RGBA_ADD)
+
+def truncate_text_start(font: pygame.font.Font, text: str, max_width: int) -> str:
+    """
+    Обрезает начало строки ("..." + конец), чтобы она помещалась в max_width.
+    Ширина измеряется font.size без рендеринга, подбор - двоичным поиском.
+    """
+    if font.size(text)[0] <= max_width:
+        return text
+    # Ищем наименьший отступ start >= 4, при котором "..." + text[start:] помещается
+    low, high = 4, len(text)
+    while low < high:
+        middle = (low + high) // 2
+        if font.size("..." + text[middle:])[0] <= max_width:
+            high = middle
+        else:
+            low = middle + 1
+    return "..." + text[low:]
+
+@contextmanager
+def count_surface_allocations():
+    """
+    Считает создание pygame.Surface(...) внутри блока (для тестов и бенчмарков).
+    Поверхности, созданные в C (font.render, copy, transform), не учитываются.
+
+        with count_surface_allocations() as counter:
+            editor.draw()
+        counter["surfaces"]
+    """
+    counter = {"surfaces": 0}
+    original = pygame.Surface
+
+    class CountingSurface(original):
+        def __init__(self, *args, **kwargs):
+            counter["surfaces"] += 1
+            super().__init__(*args, **kwargs)
+
+    pygame.Surface = CountingSurface
+    try:
+        yield counter
+    finally:
+        pygame.Surface = original
@@ -5,6 +5,7 @@ import traceback
 import logging
 import time
 from editor.core import PixelArtEditor
+from editor.tracing import start_from_env
 
 # Настройка логирования
 logging.basicConfig(
@@ -36,6 +37,9 @@ def main():
     try:
         pygame.init()
         logging.info("Инициализация Pygame завершена")
+
+        # Трассировка сессии: ARTPIXEL_TRACE=trace.json python main.py
+        start_from_env()
         
         editor = PixelArtEditor(grid_size=32, zoom=16)
         logging.info("Редактор успешно создан и готов к работе")
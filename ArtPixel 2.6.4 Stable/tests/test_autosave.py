@@ -0,0 +1,160 @@
+import unittest
+import os
+import tempfile
+import pygame
+from editor.core import PixelArtEditor
+from editor.autosave import Autosave, AUTOSAVE_MANIFEST
+
+class TestAutosave(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temp_dir.name, ".autosave")
+        self.canvas = pygame.Surface((100, 100), pygame.SRCALPHA)
+        self.canvas.fill((0, 0, 0, 0))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_autosave(self):
+        autosave = Autosave(self.directory, tile_size=32, delay_ms=100, max_delay_ms=1000)
+        self.assertFalse(autosave.start())
+        return autosave
+
+    def tile_files(self):
+        return sorted(name for name in os.listdir(self.directory) if name.startswith("tile_"))
+
+    def test_debounce_and_skip_when_clean(self):
+        """Запись только после паузы в изменениях и только если что-то изменилось"""
+        autosave = self.make_autosave()
+        self.assertIsNone(autosave.due_in_ms(0))
+        self.assertFalse(autosave.tick(self.canvas, now=0))
+
+        autosave.mark(pygame.Rect(0, 0, 1, 1), (100, 100), now=0)
+        self.assertEqual(autosave.due_in_ms(50), 50)
+        self.assertFalse(autosave.tick(self.canvas, now=50))
+        # Непрерывные изменения не откладывают запись дольше max_delay_ms
+        autosave.mark(pygame.Rect(0, 0, 1, 1), (100, 100), now=990)
+        self.assertEqual(autosave.due_in_ms(990), 10)
+
+        self.assertTrue(autosave.tick(self.canvas, now=1000))
+        autosave.wait()
+        self.assertEqual(autosave.checkpoints, 1)
+        self.assertFalse(autosave.pending)
+        self.assertIsNone(autosave.due_in_ms(5000))
+        self.assertFalse(autosave.checkpoint(self.canvas, wait=True))
+        self.assertEqual(autosave.checkpoints, 1)
+
+    def test_incremental_tiles(self):
+        """После первой полной записи переписываются только измененные плитки"""
+        autosave = self.make_autosave()
+        autosave.mark(pygame.Rect(0, 0, 1, 1), (100, 100), now=0)
+        self.assertTrue(autosave.checkpoint(self.canvas, wait=True))
+        self.assertEqual(autosave.tiles_written, 16)  # Сетка 4x4 плитки по 32
+        self.assertEqual(len(self.tile_files()), 16)
+
+        self.canvas.fill((255, 0, 0, 255), pygame.Rect(40, 40, 30, 2))
+        autosave.mark(pygame.Rect(40, 40, 30, 2), (100, 100), now=0)
+        self.assertTrue(autosave.checkpoint(self.canvas, wait=True))
+        self.assertEqual(autosave.tiles_written, 18)
+
+        loaded = Autosave(self.directory, tile_size=32).load()
+        self.assertEqual(loaded.get_size(), (100, 100))
+        self.assertEqual(loaded.get_at((69, 41)), (255, 0, 0, 255))
+        self.assertEqual(loaded.get_at((39, 40)), (0, 0, 0, 0))
+
+    def test_resize_rewrites_all_tiles(self):
+        """Новый размер холста записывается целиком, лишние плитки удаляются"""
+        autosave = self.make_autosave()
+        autosave.mark_all((100, 100), now=0)
+        autosave.checkpoint(self.canvas, wait=True)
+
+        small = pygame.Surface((40, 40), pygame.SRCALPHA)
+        small.fill((1, 2, 3, 4))
+        autosave.mark(pygame.Rect(0, 0, 1, 1), (40, 40), now=0)
+        autosave.checkpoint(small, wait=True)
+        self.assertEqual(self.tile_files(), ["tile_40x40_0_0.bin", "tile_40x40_0_1.bin",
+                                             "tile_40x40_1_0.bin", "tile_40x40_1_1.bin"])
+        loaded = Autosave(self.directory, tile_size=32).load()
+        self.assertEqual(loaded.get_size(), (40, 40))
+        self.assertEqual(loaded.get_at((39, 39)), (1, 2, 3, 4))
+
+    def test_corrupt_checkpoint_and_discard(self):
+        """Поврежденное автосохранение не загружается, discard удаляет его"""
+        autosave = self.make_autosave()
+        autosave.mark_all((100, 100), now=0)
+        autosave.checkpoint(self.canvas, wait=True)
+        os.remove(os.path.join(self.directory, "tile_100x100_1_1.bin"))
+
+        restored = Autosave(self.directory, tile_size=32)
+        self.assertTrue(restored.start())
+        self.assertIsNone(restored.load())
+        restored.discard()
+        self.assertFalse(restored.has_checkpoint())
+        self.assertEqual(self.tile_files(), [])
+
+    def test_editor_marks_and_recovers(self):
+        """Действия редактора отмечают плитки, при запуске работу можно восстановить"""
+        editor = PixelArtEditor(grid_size=64, zoom=8)
+        editor.autosave = Autosave(self.directory, tile_size=32)
+        editor.autosave.start()
+        self.assertFalse(editor.has_unsaved_changes)
+
+        editor.canvas.fill((0, 255, 0, 255), pygame.Rect(40, 40, 4, 4))
+        editor._dirty_rect = pygame.Rect(40, 40, 4, 4)
+        editor._commit_history()
+        self.assertTrue(editor.has_unsaved_changes)
+        self.assertTrue(editor.autosave.pending)
+        editor.autosave.checkpoint(editor.canvas, wait=True)
+
+        editor.undo()
+        self.assertTrue(editor.autosave.pending)
+        editor.redo()
+        editor.shutdown()  # Несохраненная работа остается в автосохранении
+        self.assertTrue(os.path.exists(os.path.join(self.directory, AUTOSAVE_MANIFEST)))
+
+        editor = PixelArtEditor(grid_size=16, zoom=8)
+        editor.autosave = Autosave(self.directory, tile_size=32)
+        self.assertTrue(editor.autosave.start())
+        self.assertTrue(editor.restore_autosave())
+        self.assertEqual(editor.canvas.get_size(), (64, 64))
+        self.assertEqual(editor.canvas.get_at((41, 41)), (0, 255, 0, 255))
+        self.assertFalse(editor.autosave.pending)
+        self.assertFalse(editor.autosave.paused)
+
+        editor.has_unsaved_changes = False
+        editor.shutdown()  # Работа сохранена - автосохранение удаляется
+        self.assertFalse(os.path.exists(os.path.join(self.directory, AUTOSAVE_MANIFEST)))
+
+    def test_shape_preview_not_autosaved(self):
+        """Предпросмотр фигуры на холсте не попадает в автосохранение"""
+        editor = PixelArtEditor(grid_size=128, zoom=4)
+        editor.autosave = Autosave(self.directory, tile_size=32)
+        editor.autosave.start()
+        editor.draw_pixel((100, 101), (0, 255, 0, 255))  # Плитка (3, 3) изменена
+
+        editor.color_manager.current_color = (255, 0, 0, 255)
+        editor.tools.current_tool = "Линия"
+        editor.tools.handle_tool_action((90, 100))
+        editor.tools.handle_tool_action((110, 100), is_dragging=True)
+        self.assertEqual(editor.canvas.get_at((100, 100)), (255, 0, 0, 128))
+        # Время автосохранения подошло посреди перетаскивания
+        self.assertTrue(editor.tick_autosave(now=10 ** 9))
+        editor.autosave.wait()
+        # Кнопка отпущена за пределами холста - фигура не нарисована
+        editor.tools.handle_tool_action(None, is_mouse_up=True)
+        self.assertEqual(editor.canvas.get_at((100, 100)), (0, 0, 0, 0))
+
+        recovered = Autosave(self.directory, tile_size=32).load()
+        self.assertEqual(pygame.image.tobytes(recovered, "RGBA"),
+                         pygame.image.tobytes(editor.canvas, "RGBA"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -67,6 +67,49 @@ class TestColorManager(unittest.TestCase):
                 for actual, expected in zip(result, expected_rgb):
                     self.assertAlmostEqual(actual, expected, delta=1)
 
+    def test_hsv_to_rgb_array(self):
+        """Проверка совпадения векторной конвертации с поэлементной"""
+        hues = [0.0, 0.1, 1 / 6, 0.5, 0.9999, 1.0]
+        values = [0.0, 0.25, 0.5, 0.77, 1.0]
+        for h in hues:
+            for s in values:
+                for v in values:
+                    with self.subTest(h=h, s=s, v=v):
+                        result = self.color_manager.hsv_to_rgb_array(h, s, v)
+                        self.assertEqual(tuple(int(c) for c in result),
+                                         self.color_manager.hsv_to_rgb(h, s, v))
+
+    def test_sv_square_cached(self):
+        """Проверка градиента квадрата S/V и его кэширования по оттенку"""
+        ui = self.editor.ui
+        surface = ui.get_sv_surface((120, 120), 0.3)
+        self.assertIs(ui.get_sv_surface((120, 120), 0.3), surface)
+        for x, y in [(0, 0), (60, 30), (119, 119), (7, 100)]:
+            expected = self.color_manager.hsv_to_rgb(0.3, x / 120, 1 - y / 120)
+            self.assertEqual(tuple(surface.get_at((x, y)))[:3], expected)
+
+        for i in range(ui.sv_cache.max_items + 1):
+            ui.get_sv_surface((120, 120), i / 100)
+        self.assertEqual(len(ui.sv_cache), ui.sv_cache.max_items)
+
+    def test_hue_and_alpha_bars_cached(self):
+        """Проверка кэшированных полос оттенка и прозрачности"""
+        ui = self.editor.ui
+        hue = ui.get_hue_surface((20, 120))
+        self.assertIs(ui.get_hue_surface((20, 120)), hue)
+        for y in (0, 40, 119):
+            expected = self.color_manager.hsv_to_rgb(y / 120, 1, 1)
+            self.assertEqual(tuple(hue.get_at((0, y)))[:3], expected)
+            self.assertEqual(tuple(hue.get_at((19, y)))[:3], expected)
+
+        alpha = ui.get_alpha_surface((150, 15), (255, 0, 0))
+        self.assertIs(ui.get_alpha_surface((150, 15), (255, 0, 0)), alpha)
+        self.assertIsNot(ui.get_alpha_surface((150, 15), (0, 255, 0)), alpha)
+        # Слева виден шахматный фон, справа - почти непрозрачный цвет
+        self.assertIn(tuple(alpha.get_at((0, 0)))[:3], [(200, 200, 200), (150, 150, 150)])
+        self.assertGreater(alpha.get_at((149, 7)).r, 240)
+        self.assertLess(alpha.get_at((149, 7)).g, 10)
+
     def test_rgb_to_hex(self):
         """Проверка конвертации RGB в HEX"""
         test_cases = [
@@ -3,7 +3,9 @@ import pygame
 import os
 import shutil
 import json
-from editor.file_io import save_to_json, load_from_json, save_artwork
+from editor.file_io import (save_to_json, load_from_json, save_artwork, save_to_binary,
+                            load_from_binary, load_surface, COMPRESSION_NONE,
+                            PROJECT_EXTENSION, JSON_PALETTE_MAX)
 
 class TestFileIO(unittest.TestCase):
     @classmethod
@@ -21,7 +23,7 @@ class TestFileIO(unittest.TestCase):
         
     def tearDown(self):
         # Удаляем тестовые файлы
-        for ext in ['.png', '.json']:
+        for ext in ['.png', '.json', PROJECT_EXTENSION]:
             test_file = f"{self.test_filename}{ext}"
             if os.path.exists(test_file):
                 os.remove(test_file)
@@ -53,16 +55,52 @@ class TestFileIO(unittest.TestCase):
 
     def test_save_artwork(self):
         """Проверка сохранения изображения"""
-        png_path, json_path = save_artwork(self.test_surface, self.test_filename)
+        png_path, project_path = save_artwork(self.test_surface, self.test_filename)
         
         self.assertTrue(os.path.exists(png_path))
-        self.assertTrue(os.path.exists(json_path))
+        self.assertTrue(os.path.exists(project_path))
+        self.assertTrue(project_path.endswith(PROJECT_EXTENSION))
         
-        # Проверяем содержимое JSON
-        with open(json_path, 'r') as f:
-            data = json.load(f)
-            self.assertEqual(data['width'], 16)
-            self.assertEqual(data['height'], 16)
+        # Проверяем содержимое проекта
+        loaded_surface = load_from_binary(project_path)
+        self.assertEqual(loaded_surface.get_size(), (16, 16))
+        self.assertEqual(loaded_surface.get_at((0, 0)), (255, 0, 0, 255))
+
+    def test_binary_roundtrip(self):
+        """Двоичный формат сохраняет все пиксели, включая полупрозрачные"""
+        surface = pygame.Surface((7, 5), pygame.SRCALPHA)
+        for y in range(5):
+            for x in range(7):
+                surface.set_at((x, y), (x * 30, y * 50, 200, (x + y) * 20))
+        for compression in (None, COMPRESSION_NONE):
+            with self.subTest(compression=compression):
+                if compression is None:
+                    save_to_binary(surface, self.test_filename)
+                else:
+                    save_to_binary(surface, self.test_filename, compression)
+                loaded = load_surface(self.test_filename + PROJECT_EXTENSION)
+                self.assertEqual(loaded.get_size(), (7, 5))
+                self.assertTrue(loaded.get_flags() & pygame.SRCALPHA)
+                for y in range(5):
+                    for x in range(7):
+                        self.assertEqual(loaded.get_at((x, y)), surface.get_at((x, y)))
+
+    def test_binary_corrupted(self):
+        """Поврежденный двоичный файл вызывает ошибку, а не загружается"""
+        save_to_binary(self.test_surface, self.test_filename)
+        path = self.test_filename + PROJECT_EXTENSION
+        with open(path, 'rb') as f:
+            data = f.read()
+        with open(path, 'wb') as f:
+            f.write(data[:-3])
+        with self.assertRaises(ValueError):
+            load_from_binary(path)
+
+    def test_load_surface_legacy_json(self):
+        """Старые JSON проекты продолжают загружаться"""
+        save_to_json(self.test_surface, f"{self.test_filename}.json")
+        loaded_surface = load_surface(f"{self.test_filename}.json")
+        self.assertEqual(loaded_surface.get_at((5, 5)), (255, 0, 0, 255))
 
     def test_invalid_file(self):
         """Проверка обработки неправильного файла"""
@@ -73,19 +111,133 @@ class TestFileIO(unittest.TestCase):
         with self.assertRaises(Exception):
             load_from_json(invalid_file)
             
+    def _write_json(self, data):
+        path = f"{self.test_filename}.json"
+        with open(path, 'w') as f:
+            json.dump(data, f)
+        return path
+
+    def test_load_json_clamps_values(self):
+        """Значения вне 0..255 ограничиваются, недостающие пиксели прозрачные"""
+        pixels = [
+            [{'r': 300, 'g': -5, 'b': 7, 'a': 255}, {'r': 1, 'g': 2, 'b': 3, 'a': 999}],
+            [{'r': 10, 'g': 20, 'b': 30, 'a': 40}],
+        ]
+        loaded_surface = load_from_json(self._write_json({'width': 2, 'height': 2, 'pixels': pixels}))
+        self.assertEqual(loaded_surface.get_at((0, 0)), (255, 0, 7, 255))
+        self.assertEqual(loaded_surface.get_at((1, 0)), (1, 2, 3, 255))
+        self.assertEqual(loaded_surface.get_at((0, 1)), (10, 20, 30, 40))
+        self.assertEqual(loaded_surface.get_at((1, 1)).a, 0)
+
+    def test_load_json_names_bad_pixel(self):
+        """Ошибка указывает позицию первого некорректного пикселя"""
+        good = {'r': 0, 'g': 0, 'b': 0, 'a': 255}
+        pixels = [[dict(good) for _ in range(3)] for _ in range(3)]
+        pixels[1][2] = {'r': 0, 'g': 0, 'b': 0}
+        pixels[2][0] = {'r': 'x', 'g': 0, 'b': 0, 'a': 0}
+        path = self._write_json({'width': 3, 'height': 3, 'pixels': pixels})
+        with self.assertRaisesRegex(ValueError, r"\(2, 1\)"):
+            load_from_json(path)
+
+        pixels[1][2] = dict(good)
+        path = self._write_json({'width': 3, 'height': 3, 'pixels': pixels})
+        with self.assertRaisesRegex(ValueError, r"значение пикселя в позиции \(0, 2\)"):
+            load_from_json(path)
+
+    def test_load_json_rejects_non_integer_components(self):
+        """Строки, bool, дробные числа и NaN не превращаются в цвет, ошибка называет пиксель"""
+        good = {'r': 0, 'g': 0, 'b': 0, 'a': 255}
+        for value in ("5", True, 1.5, float('nan'), float('inf'), None):
+            with self.subTest(value=value):
+                pixels = [[dict(good) for _ in range(3)] for _ in range(2)]
+                pixels[1][2] = dict(good, g=value)
+                path = self._write_json({'width': 3, 'height': 2, 'pixels': pixels})
+                with self.assertRaisesRegex(ValueError, r"значение пикселя в позиции \(2, 1\)"):
+                    load_from_json(path)
+
+    def test_json_v2_roundtrip(self):
+        """JSON версии 2: hex и base64, с палитрой и без"""
+        surface = pygame.Surface((6, 4), pygame.SRCALPHA)
+        for y in range(4):
+            for x in range(6):
+                surface.set_at((x, y), (x * 40, y * 60, 90, (x * y * 10) % 256))
+        for encoding in ('hex', 'base64'):
+            for use_palette in (True, False):
+                with self.subTest(encoding=encoding, use_palette=use_palette):
+                    save_to_json(surface, self.test_filename, encoding=encoding,
+                                 use_palette=use_palette)
+                    with open(f"{self.test_filename}.json") as f:
+                        data = json.load(f)
+                    self.assertEqual(data['version'], 2)
+                    self.assertEqual(data['encoding'], encoding)
+                    self.assertEqual('palette' in data, use_palette)
+                    loaded_surface = load_from_json(f"{self.test_filename}.json")
+                    for y in range(4):
+                        for x in range(6):
+                            self.assertEqual(loaded_surface.get_at((x, y)), surface.get_at((x, y)))
+
+    def test_json_v2_palette_limit(self):
+        """Палитра не пишется, если цветов больше JSON_PALETTE_MAX"""
+        surface = pygame.Surface((JSON_PALETTE_MAX + 1, 1), pygame.SRCALPHA)
+        for x in range(JSON_PALETTE_MAX + 1):
+            surface.set_at((x, 0), (x % 256, x // 256, 0, 255))
+        save_to_json(surface, self.test_filename)
+        with open(f"{self.test_filename}.json") as f:
+            self.assertNotIn('palette', json.load(f))
+        loaded_surface = load_from_json(f"{self.test_filename}.json")
+        self.assertEqual(loaded_surface.get_at((JSON_PALETTE_MAX, 0)), (0, 1, 0, 255))
+
+    def test_json_v1_still_written_and_loaded(self):
+        """Старый формат можно записать явно и он загружается автоматически"""
+        save_to_json(self.test_surface, self.test_filename, version=1)
+        with open(f"{self.test_filename}.json") as f:
+            data = json.load(f)
+        self.assertNotIn('version', data)
+        self.assertEqual(data['pixels'][0][0], {'r': 255, 'g': 0, 'b': 0, 'a': 255})
+        self.assertEqual(load_from_json(f"{self.test_filename}.json").get_at((3, 3)), (255, 0, 0, 255))
+
+    def test_json_explicit_v1_roundtrip(self):
+        """Файл версии 1 с явным полем version загружается по ключу pixels"""
+        save_to_json(self.test_surface, self.test_filename, version=1)
+        with open(f"{self.test_filename}.json") as f:
+            data = json.load(f)
+        data['version'] = 1
+        loaded_surface = load_from_json(self._write_json(data))
+        self.assertEqual(pygame.image.tobytes(loaded_surface, "RGBA"),
+                         pygame.image.tobytes(self.test_surface, "RGBA"))
+
+        # Версии 1 нужны pixels, версии 2 - rows
+        data['rows'] = data.pop('pixels')
+        with self.assertRaisesRegex(ValueError, "Некорректный формат JSON"):
+            load_from_json(self._write_json(data))
+
+    def test_json_v2_errors(self):
+        """Ошибки версии 2: индекс вне палитры и строка неверной длины"""
+        data = {'format': 'artpixel', 'version': 2, 'width': 2, 'height': 2,
+                'encoding': 'hex', 'palette': ['ff0000ff'], 'rows': ['0000', '0001']}
+        with self.assertRaisesRegex(ValueError, r"\(1, 1\)"):
+            load_from_json(self._write_json(data))
+        del data['palette']
+        data['rows'] = ['ff0000ff', 'ff0000ff']
+        with self.assertRaisesRegex(ValueError, "строки пикселей 0"):
+            load_from_json(self._write_json(data))
+        data['version'] = 3
+        with self.assertRaises(ValueError):
+            load_from_json(self._write_json(data))
+
     def test_empty_surface(self):
         """Проверка сохранения пустого холста"""
         empty_surface = pygame.Surface((16, 16), pygame.SRCALPHA)
         
         # Сохраняем пустой холст
-        png_path, json_path = save_artwork(empty_surface, self.test_filename)
+        png_path, project_path = save_artwork(empty_surface, self.test_filename)
         
         # Проверяем что файлы созданы
         self.assertTrue(os.path.exists(png_path))
-        self.assertTrue(os.path.exists(json_path))
+        self.assertTrue(os.path.exists(project_path))
         
         # Загружаем и проверяем содержимое
-        loaded_surface = load_from_json(json_path)
+        loaded_surface = load_from_binary(project_path)
         self.assertEqual(loaded_surface.get_size(), (16, 16))
         
     def test_file_overwrite(self):
@@ -96,10 +248,10 @@ class TestFileIO(unittest.TestCase):
         # Меняем цвет и сохраняем второй раз
         new_surface = pygame.Surface((16, 16), pygame.SRCALPHA)
         new_surface.fill((0, 255, 0, 255))
-        png_path, json_path = save_artwork(new_surface, self.test_filename)
+        png_path, project_path = save_artwork(new_surface, self.test_filename)
         
         # Проверяем что цвет изменился
-        loaded_surface = load_from_json(json_path)
+        loaded_surface = load_from_binary(project_path)
         self.assertEqual(
             loaded_surface.get_at((0, 0)),
             (0, 255, 0, 255)
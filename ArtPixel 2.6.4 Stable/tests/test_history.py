@@ -0,0 +1,82 @@
+import unittest
+import pygame
+from editor.history import History, HistoryEntry
+from editor.core import PixelArtEditor
+
+class TestHistory(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    def setUp(self):
+        self.editor = PixelArtEditor(grid_size=16, zoom=1)
+
+    def tearDown(self):
+        del self.editor
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def _make_entry(self, size):
+        """Создает запись истории с областью size x size"""
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        return HistoryEntry(surface.get_rect(), surface, surface.copy())
+
+    def test_delta_covers_dirty_rect(self):
+        """Проверка, что запись хранит только измененную область"""
+        self.editor.draw_pixel((3, 4), (255, 0, 0, 255))
+        entry = self.editor.history.undo()
+
+        self.assertEqual(entry.rect, pygame.Rect(3, 4, 1, 1))
+        self.assertEqual(entry.before.get_size(), (1, 1))
+        self.assertEqual(entry.after.get_at((0, 0)), (255, 0, 0, 255))
+
+    def test_undo_redo_in_place(self):
+        """Проверка отмены и повтора без замены холста"""
+        canvas = self.editor.canvas
+        self.editor.draw_pixel((1, 1), (0, 255, 0, 128))
+
+        self.editor.undo()
+        self.assertIs(self.editor.canvas, canvas)
+        self.assertEqual(self.editor.canvas.get_at((1, 1)), (0, 0, 0, 0))
+
+        self.editor.redo()
+        self.assertEqual(self.editor.canvas.get_at((1, 1)), (0, 255, 0, 128))
+
+    def test_undo_resize(self):
+        """Проверка отмены изменения размера холста"""
+        self.editor.draw_pixel((0, 0), (255, 0, 0, 255))
+        self.editor.resize_canvas(32)
+
+        self.editor.undo()
+        self.assertEqual(self.editor.grid_size, 16)
+        self.assertEqual(self.editor.canvas.get_size(), (16, 16))
+        self.assertEqual(self.editor.canvas.get_at((0, 0)), (255, 0, 0, 255))
+
+        self.editor.redo()
+        self.assertEqual(self.editor.canvas.get_size(), (32, 32))
+
+    def test_byte_budget_eviction(self):
+        """Проверка вытеснения старых записей по бюджету памяти"""
+        entry_bytes = self._make_entry(4).nbytes
+        history = History(max_bytes=entry_bytes * 3)
+        for _ in range(10):
+            history.push(self._make_entry(4))
+
+        self.assertEqual(len(history), 3)
+        self.assertLessEqual(history.nbytes, history.max_bytes)
+
+    def test_push_drops_redo(self):
+        """Проверка сброса ветки повтора при новой записи"""
+        history = History()
+        history.push(self._make_entry(2))
+        history.undo()
+        self.assertTrue(history.can_redo())
+
+        history.push(self._make_entry(2))
+        self.assertFalse(history.can_redo())
+        self.assertEqual(history.nbytes, self._make_entry(2).nbytes)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+import pygame
+from editor.core import PixelArtEditor
+from editor.autosave import Autosave
+from editor.journal import Journal, encode_change, OP_FILL, OP_RUNS, RUN_DTYPE
+
+def rgba(surface):
+    return pygame.image.tobytes(surface, "RGBA")
+
+class TestJournal(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.temp_dir.name, ".autosave")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_editor(self, grid_size=32):
+        editor = PixelArtEditor(grid_size=grid_size, zoom=4)
+        editor.autosave = Autosave(self.directory, tile_size=16, journal=Journal(self.directory))
+        self.assertFalse(editor.autosave.start(editor.canvas))
+        return editor
+
+    def recover(self):
+        """Восстановление как после падения: новый экземпляр читает тот же каталог"""
+        autosave = Autosave(self.directory, tile_size=16, journal=Journal(self.directory))
+        self.assertTrue(autosave.start())
+        return autosave.load()
+
+    def test_encode_change(self):
+        """Одноцветная область - заливка, иначе отрезки только измененных пикселей"""
+        after = np.full((3, 4), 7, dtype=np.uint32)
+        op, payload = encode_change(2, 5, None, after)
+        self.assertEqual(op, OP_FILL)
+
+        before = after.copy()
+        after[1, 1:3] = 9
+        after[2, 3] = 9
+        op, payload = encode_change(2, 5, before, after)
+        self.assertEqual(op, OP_RUNS)
+        runs = np.frombuffer(payload, dtype=RUN_DTYPE)
+        self.assertEqual([tuple(run) for run in runs], [(3, 6, 2, 9), (5, 7, 1, 9)])
+
+    def test_editor_edits_replay_after_crash(self):
+        """Штрихи, заливка, фигуры, очистка, размер и отмена воспроизводятся из журнала"""
+        editor = self.make_editor()
+        editor.color_manager.current_color = (255, 0, 0, 255)
+        editor.tools.begin_stroke()
+        for x in range(3, 9):
+            editor.draw_pixel((x, 4))
+        editor.tools.end_stroke()
+        editor.tools.current_tool = "Круг"
+        editor.color_manager.current_color = (0, 0, 255, 128)
+        editor.tools.draw_shape((16, 16), (22, 16))
+        editor.clear_canvas()
+        editor.undo()
+        editor.tools.current_tool = "Прямоугольник"
+        editor.tools.draw_shape((1, 1), (30, 30))
+        editor.color_manager.current_color = (10, 200, 10, 255)
+        editor.tools.flood_fill((10, 10))
+        editor.resize_canvas(40)
+        editor.tools.current_tool = "Линия"
+        editor.tools.draw_shape((0, 39), (39, 0))
+        editor.undo()
+        editor.redo()
+
+        self.assertEqual(editor.canvas.get_at((10, 10)), (10, 200, 10, 255))
+        # Выход без shutdown - как при падении
+        recovered = self.recover()
+        self.assertEqual(recovered.get_size(), (40, 40))
+        self.assertEqual(rgba(recovered), rgba(editor.canvas))
+
+    def test_checkpoint_compacts_journal(self):
+        """Контрольная точка удаляет старые сегменты, журнал после нее воспроизводится поверх плиток"""
+        editor = self.make_editor()
+        journal = editor.autosave.journal
+        editor.tools.flood_fill((0, 0))
+        first_generation = journal.generation
+        self.assertTrue(editor.autosave.checkpoint(editor.canvas, wait=True))
+        self.assertEqual([segment for segment, _ in journal.segments()], [first_generation + 1])
+        self.assertEqual(journal.ops_since_checkpoint, 0)
+
+        editor.color_manager.current_color = (1, 2, 3, 255)
+        editor.draw_pixel((5, 5))
+        recovered = self.recover()
+        self.assertEqual(rgba(recovered), rgba(editor.canvas))
+
+    def test_torn_tail_is_dropped(self):
+        """Оборванная последняя запись отбрасывается, предыдущие применяются"""
+        editor = self.make_editor(grid_size=8)
+        editor.draw_pixel((1, 1))
+        expected = rgba(editor.canvas)
+        editor.draw_pixel((2, 2))
+        editor.autosave.close()
+        _, path = editor.autosave.journal.segments()[-1]
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 3)
+
+        self.assertEqual(rgba(self.recover()), expected)
+
+    def test_declined_recovery_discards_journal(self):
+        """Отказ от восстановления удаляет журнал и начинает новый"""
+        editor = self.make_editor(grid_size=8)
+        editor.draw_pixel((1, 1))
+        editor.autosave.close()
+
+        editor = PixelArtEditor(grid_size=8, zoom=4)
+        editor.autosave = Autosave(self.directory, tile_size=16, journal=Journal(self.directory))
+        self.assertTrue(editor.autosave.start(editor.canvas))
+        editor.discard_autosave()
+        self.assertEqual(editor.autosave.journal.segments(), [])
+        editor.draw_pixel((2, 2))
+        self.assertEqual(len(editor.autosave.journal.segments()), 1)
+        self.assertEqual(rgba(self.recover()), rgba(editor.canvas))
+
+    def test_crash_without_edits_is_not_recoverable(self):
+        """Запуск и падение без правок не вызывают предложения восстановить работу"""
+        editor = self.make_editor()
+        self.assertTrue(editor.autosave.journal.active)
+        self.assertEqual(editor.autosave.journal.segments(), [])
+        editor.autosave.close()  # Падение без shutdown
+
+        autosave = Autosave(self.directory, tile_size=16, journal=Journal(self.directory))
+        self.assertFalse(autosave.start(editor.canvas))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import csv
+import json
+import os
+import tempfile
+import pygame
+from editor.profiler import FrameProfiler, PROFILER_STAGES
+from editor.core import PixelArtEditor
+
+class TestFrameProfiler(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def _record(self, profiler, values):
+        """Записывает кадры с заданным временем этапа "canvas" (нс)"""
+        for value in values:
+            profiler.begin_frame()
+            profiler.current[profiler.stages.index("canvas")] = value
+            profiler.end_frame()
+
+    def test_ring_buffer_order(self):
+        """Проверка, что буфер хранит последние кадры по порядку"""
+        profiler = FrameProfiler(capacity=4)
+        self._record(profiler, [1, 2, 3, 4, 5, 6])
+
+        column = profiler.stages.index("canvas")
+        self.assertEqual(len(profiler), 4)
+        self.assertEqual(profiler.frames()[:, column].tolist(), [3, 4, 5, 6])
+        self.assertEqual(profiler.total_frames, 6)
+
+    def test_percentiles(self):
+        """Проверка процентилей в миллисекундах"""
+        profiler = FrameProfiler(capacity=200)
+        self._record(profiler, [i * 1_000_000 for i in range(1, 101)])
+
+        stats = profiler.percentiles()["canvas"]
+        self.assertAlmostEqual(stats["p50"], 50.5, places=3)
+        self.assertAlmostEqual(stats["p99"], 99.01, places=3)
+        self.assertEqual(FrameProfiler().percentiles(), {})
+
+    def test_stage_accumulates(self):
+        """Проверка суммирования повторных замеров этапа"""
+        profiler = FrameProfiler()
+        profiler.begin_frame()
+        for _ in range(3):
+            with profiler.stage("ui"):
+                pass
+        profiler.end_frame()
+
+        frame = profiler.frames()[0]
+        self.assertGreater(frame[profiler.stages.index("ui")], 0)
+        self.assertGreaterEqual(frame[-1], frame[profiler.stages.index("ui")])
+
+    def test_dump_csv_json(self):
+        """Проверка выгрузки замеров в CSV и JSON"""
+        profiler = FrameProfiler(capacity=3)
+        self._record(profiler, [1_000_000, 2_000_000, 3_000_000, 4_000_000])
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, "frames.csv")
+            json_path = os.path.join(directory, "frames.json")
+            profiler.dump_csv(csv_path)
+            profiler.dump_json(json_path)
+
+            with open(csv_path, encoding="utf-8") as f:
+                rows = list(csv.reader(f))
+            with open(json_path, encoding="utf-8") as f:
+                data = json.load(f)
+
+        self.assertEqual(rows[0], ["frame"] + [f"{name}_ms" for name in profiler.columns])
+        self.assertEqual([row[0] for row in rows[1:]], ["1", "2", "3"])
+        self.assertEqual(float(rows[1][1 + profiler.stages.index("canvas")]), 2.0)
+        self.assertEqual(len(data["frames"]), 3)
+        self.assertIn("p95", data["summary"]["total"])
+
+    def test_editor_frame_stages(self):
+        """Проверка замеров этапов кадра редактора и оверлея"""
+        editor = PixelArtEditor(grid_size=16, zoom=8)
+        editor.show_profiler = True
+        for _ in range(3):
+            editor.profiler.begin_frame()
+            editor.draw()
+            with editor.profiler.stage("present"):
+                editor.present()
+            editor.profiler.end_frame()
+
+        frame = editor.profiler.frames()[-1]
+        for stage in ("canvas", "ui", "color_picker", "present"):
+            self.assertGreater(frame[PROFILER_STAGES.index(stage)], 0, stage)
+        self.assertEqual(len(editor.profiler), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,314 @@
+import unittest
+import pygame
+import random
+from unittest import mock
+from editor.render import (CheckerboardCache, GridOverlayCache, ScaledCanvasCache,
+                           TextCache, grid_alpha, merge_rects)
+from editor.render import SurfacePool
+from editor.core import PixelArtEditor
+from editor.constants import MAGNIFIER_MAX_FACTOR, INFO_STATS_REFRESH_MS
+from editor.utils import count_surface_allocations, truncate_text_start
+
+class TestRender(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def test_checkerboard_pattern(self):
+        """Проверка шахматного фона, собранного из плиток"""
+        colors = ((60, 60, 60), (70, 70, 70))
+        target = pygame.Surface((300, 300))
+        target.fill((0, 0, 0))
+        CheckerboardCache().draw(target, (10, 20, 250, 250), 8, colors)
+
+        for x, y in ((10, 20), (17, 27), (18, 20), (10, 28), (259, 269)):
+            cell = ((x - 10) // 8 + (y - 20) // 8) % 2
+            self.assertEqual(target.get_at((x, y))[:3], colors[cell])
+        # За пределами области ничего не рисуется
+        self.assertEqual(target.get_at((260, 20))[:3], (0, 0, 0))
+        self.assertEqual(target.get_at((9, 20))[:3], (0, 0, 0))
+
+    def test_checkerboard_tile_cached(self):
+        """Проверка, что плитка строится один раз"""
+        cache = CheckerboardCache()
+        colors = ((200, 200, 200), (150, 150, 150))
+        self.assertIs(cache.get_tile(5, colors), cache.get_tile(5, colors))
+
+        tile = cache.get_tile(5, colors)
+        cache.invalidate()
+        self.assertIsNot(cache.get_tile(5, colors), tile)
+
+    def test_grid_matches_lines(self):
+        """Проверка, что плитка сетки совпадает с линиями через каждые zoom пикселей"""
+        expected = pygame.Surface((400, 400))
+        actual = pygame.Surface((400, 400))
+        color = (60, 60, 60)
+        size, zoom, x0, y0 = 20, 12, 15, -7
+        for i in range(size + 1):
+            pygame.draw.line(expected, color, (x0 + i * zoom, y0), (x0 + i * zoom, y0 + size * zoom))
+            pygame.draw.line(expected, color, (x0, y0 + i * zoom), (x0 + size * zoom, y0 + i * zoom))
+
+        GridOverlayCache().draw(actual, (x0, y0, size * zoom, size * zoom), zoom,
+                                color, (0, 0, 0))
+        self.assertEqual(pygame.image.tobytes(expected, "RGB"),
+                         pygame.image.tobytes(actual, "RGB"))
+
+    def test_grid_level_of_detail(self):
+        """Проверка скрытия и затухания слишком плотной сетки"""
+        cache = GridOverlayCache()
+        self.assertIsNone(cache.get_tile(2, (60, 60, 60), (90, 90, 90)))
+        self.assertEqual(grid_alpha(16), 255)
+        self.assertTrue(0 < grid_alpha(6) < 255)
+
+        # Основные линии остаются видимыми, когда обычные уже скрыты
+        tile = cache.get_tile(2, (60, 60, 60), (90, 90, 90), major_every=8)
+        self.assertIsNotNone(tile)
+        self.assertEqual(tile.get_at((0, 5))[:3], (90, 90, 90))
+
+    def _random_canvas(self, size):
+        canvas = pygame.Surface((size, size), pygame.SRCALPHA)
+        rng = random.Random(size)
+        for y in range(size):
+            for x in range(size):
+                canvas.set_at((x, y), [rng.randrange(256) for _ in range(4)])
+        return canvas
+
+    def test_scaled_canvas_incremental_update(self):
+        """Проверка, что частичное обновление совпадает с полным масштабированием"""
+        canvas = self._random_canvas(16)
+        cache = ScaledCanvasCache()
+        cache.get(canvas, 5)
+
+        canvas.fill((10, 20, 30, 40), (3, 4, 2, 5))
+        cache.invalidate_rect((3, 4, 2, 5))
+        scaled, _ = cache.get(canvas, 5)
+
+        expected = pygame.transform.scale(canvas, (80, 80))
+        self.assertEqual(pygame.image.tobytes(scaled, "RGBA"),
+                         pygame.image.tobytes(expected, "RGBA"))
+
+    def test_scaled_canvas_float_zoom(self):
+        """Проверка дробного масштаба: блоки пикселей без зазоров"""
+        canvas = self._random_canvas(10)
+        cache = ScaledCanvasCache()
+        scaled, _ = cache.get(canvas, 2.5)
+        self.assertEqual(scaled.get_size(), (25, 25))
+
+        canvas.set_at((3, 3), (1, 2, 3, 4))
+        cache.invalidate_rect((3, 3, 1, 1))
+        scaled, _ = cache.get(canvas, 2.5)
+        # Пиксель 3 занимает [7, 10) по обеим осям
+        for x in range(7, 10):
+            self.assertEqual(scaled.get_at((x, 8)), (1, 2, 3, 4))
+        self.assertEqual(scaled.get_at((6, 8)), canvas.get_at((2, 3)))
+        self.assertEqual(scaled.get_at((10, 8)), canvas.get_at((4, 3)))
+
+    def test_scaled_canvas_viewport(self):
+        """Проверка, что масштабируется только видимая область холста"""
+        canvas = self._random_canvas(64)
+        view = ScaledCanvasCache.visible_rect((64, 64), 10, (-205, -95), (200, 100))
+        self.assertEqual(view, pygame.Rect(20, 9, 21, 11))
+
+        scaled, offset = ScaledCanvasCache().get(canvas, 10, view)
+        self.assertEqual(offset, (200, 90))
+        self.assertEqual(scaled.get_size(), (210, 110))
+        self.assertEqual(scaled.get_at((0, 0)), canvas.get_at((20, 9)))
+        self.assertEqual(scaled.get_at((209, 109)), canvas.get_at((40, 19)))
+
+    def test_merge_rects(self):
+        """Проверка объединения пересекающихся областей вывода"""
+        merged = merge_rects([(0, 0, 10, 10), (50, 50, 5, 5), (5, 5, 10, 10),
+                              (14, 14, 40, 2), (0, 0, 0, 0)])
+        self.assertEqual(sorted(map(tuple, merged)),
+                         [(0, 0, 54, 16), (50, 50, 5, 5)])
+
+    def test_text_cache(self):
+        """Проверка кэша надписей и вытеснения старых строк"""
+        font = pygame.font.SysFont(None, 12)
+        cache = TextCache(max_items=2)
+        first = cache.render(font, "a", True, (255, 255, 255))
+        self.assertIs(cache.render(font, "a", True, (255, 255, 255)), first)
+        self.assertIsNot(cache.render(font, "a", True, (0, 0, 0)), first)
+
+        cache.render(font, "b", True, (255, 255, 255))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNot(cache.render(font, "a", True, (255, 255, 255)), first)
+
+    def test_ui_text_rendered_once(self):
+        """Проверка, что повторный кадр UI не рендерит статичный текст"""
+        editor = PixelArtEditor(grid_size=16, zoom=4)
+        editor.draw()
+        misses = editor.text_cache.misses
+        editor.draw()
+        self.assertEqual(editor.text_cache.misses, misses)
+
+        # Изменение масштаба требует только одной новой строки
+        editor.zoom = 5
+        editor.draw()
+        self.assertEqual(editor.text_cache.misses, misses + 1)
+
+    def test_frame_stats_line_rate_limited(self):
+        """Проверка, что статистика кадра не идет через кэш текста и обновляется редко"""
+        editor = PixelArtEditor(grid_size=16, zoom=4)
+        ui = editor.ui
+        with mock.patch('pygame.mouse.get_pos', return_value=(0, 0)), \
+                mock.patch('pygame.time.get_ticks', return_value=1000):
+            editor.draw()
+            editor.present()
+            cached = len(editor.text_cache)
+            for _ in range(5):
+                self.assertEqual(ui.draw(), [])
+                editor.present()
+        self.assertEqual(len(editor.text_cache), cached)
+
+        with mock.patch('pygame.mouse.get_pos', return_value=(0, 0)), \
+                mock.patch('pygame.time.get_ticks', return_value=1000 + INFO_STATS_REFRESH_MS):
+            self.assertEqual(ui.draw(), [ui._stats_line_rect()])
+            self.assertEqual(ui.draw(), [])
+        self.assertEqual(ui.stats_drawn, (editor.frame_count, editor.pixels_pushed))
+        self.assertEqual(len(editor.text_cache), cached)
+
+    def test_ui_layers_redraw_changed_buttons(self):
+        """Проверка, что наведение перерисовывает только затронутые кнопки"""
+        editor = PixelArtEditor(grid_size=16, zoom=4)
+        ui = editor.ui
+        pencil = ui.tool_buttons["Карандаш"]
+        eraser = ui.tool_buttons["Ластик"]
+        with mock.patch('pygame.mouse.get_pos', return_value=(0, 0)):
+            ui.draw()
+        layer = ui.left_layer
+
+        with mock.patch.object(ui, 'draw_tool_button', wraps=ui.draw_tool_button) as draw_button:
+            with mock.patch('pygame.mouse.get_pos', return_value=(0, 0)):
+                self.assertEqual(ui.draw(), [])
+            self.assertEqual(draw_button.call_count, 0)
+
+            # На экран отдается только область перерисованной кнопки
+            with mock.patch('pygame.mouse.get_pos', return_value=eraser.center):
+                self.assertEqual(ui.draw(), [eraser])
+            self.assertEqual([c.args[1] for c in draw_button.call_args_list], ["Ластик"])
+
+            # Смена инструмента: прежний и новый выбранный
+            draw_button.reset_mock()
+            editor.tools.current_tool = "Ластик"
+            with mock.patch('pygame.mouse.get_pos', return_value=eraser.center):
+                ui.draw()
+            self.assertEqual(sorted(c.args[1] for c in draw_button.call_args_list),
+                             sorted(["Карандаш", "Ластик"]))
+
+        self.assertIs(ui.left_layer, layer)
+        # Точки внутри кнопок в стороне от подписи
+        self.assertEqual(editor.screen.get_at((eraser.x + 4, eraser.centery))[:3],
+                         ui.colors['button_active'])
+        self.assertEqual(editor.screen.get_at((pencil.x + 4, pencil.centery))[:3],
+                         ui.colors['button'])
+
+    def test_stroke_presents_only_changed_area(self):
+        """Проверка, что мазок в один пиксель выводит малую часть экрана"""
+        editor = PixelArtEditor(grid_size=64, zoom=8)
+        width, height = editor.screen.get_size()
+        with mock.patch('pygame.mouse.get_pos', return_value=(0, 0)):
+            editor.draw()
+            editor.present()
+            self.assertEqual(editor.pixels_pushed, width * height)
+
+            editor.draw_pixel((10, 10), (255, 0, 0, 255))
+            editor.draw()
+            editor.present()
+        self.assertLess(editor.pixels_pushed, width * height // 50)
+        center = (int(editor.canvas_x) + 10 * 8 + 4, int(editor.canvas_y) + 10 * 8 + 4)
+        self.assertEqual(editor.screen.get_at(center)[:3], (255, 0, 0))
+
+    def test_partial_frames_match_full_redraw(self):
+        """Проверка, что кадр из перерисованных областей совпадает с полным"""
+        editor = PixelArtEditor(grid_size=32, zoom=8)
+        with mock.patch('pygame.mouse.get_pos', return_value=(0, 0)):
+            editor.draw()
+            editor.present()
+        steps = [
+            lambda: editor.draw_pixel((3, 3), (0, 255, 0, 255)),
+            lambda: setattr(editor, 'magnifier_active', True),
+            lambda: editor.tools.flood_fill((20, 20)),
+            lambda: setattr(editor, 'show_profiler', True),
+            lambda: setattr(editor, 'magnifier_active', False),
+            lambda: setattr(editor, 'zoom', 6),
+            lambda: setattr(editor.color_manager, 'hue', 0.5),
+            lambda: setattr(editor, 'show_profiler', False),
+        ]
+        for step in steps:
+            step()
+            with mock.patch('pygame.mouse.get_pos', return_value=(600, 500)):
+                editor.draw()
+                editor.present()
+        with mock.patch('pygame.mouse.get_pos', return_value=(600, 500)):
+            editor.draw()  # Статистика кадра та же, что и в полном кадре ниже
+        partial = editor.screen.copy()
+
+        editor.request_full_redraw()
+        with mock.patch('pygame.mouse.get_pos', return_value=(600, 500)):
+            editor.draw()
+        self.assertEqual(pygame.image.tobytes(editor.screen, "RGB"),
+                         pygame.image.tobytes(partial, "RGB"))
+
+    def test_surface_pool_reuse(self):
+        """Проверка, что пул создает поверхность один раз на имя и размер"""
+        pool = SurfacePool(max_items=2)
+        fills = []
+        first = pool.get("overlay", (10, 10), pygame.SRCALPHA, fills.append)
+        self.assertIs(pool.get("overlay", (10, 10), pygame.SRCALPHA, fills.append), first)
+        self.assertEqual(len(fills), 1)
+        self.assertIsNot(pool.get("overlay", (20, 10), pygame.SRCALPHA), first)
+        self.assertEqual(pool.allocations, 2)
+
+    def test_dialog_frames_allocation_free(self):
+        """Проверка, что повторные кадры диалогов не создают поверхностей"""
+        editor = PixelArtEditor(grid_size=16, zoom=4)
+        for flag in ('save_dialog_active', 'resize_dialog_active', 'open_dialog_active'):
+            with self.subTest(dialog=flag):
+                setattr(editor, flag, True)
+                editor.draw()  # Первый кадр заполняет пул
+                with count_surface_allocations() as counter:
+                    editor.draw()
+                    editor.draw()
+                self.assertEqual(counter["surfaces"], 0)
+                setattr(editor, flag, False)
+
+    def test_truncate_text_start(self):
+        """Проверка обрезки начала строки под ширину поля"""
+        font = pygame.font.SysFont(None, 12)
+        self.assertEqual(truncate_text_start(font, "short", 200), "short")
+        text = "a" * 200 + "end"
+        result = truncate_text_start(font, text, 100)
+        self.assertTrue(result.startswith("...") and result.endswith("end"))
+        self.assertLessEqual(font.size(result)[0], 100)
+        # Один символ больше уже не помещается
+        longer = "..." + text[len(text) - len(result) + 2:]
+        self.assertGreater(font.size(longer)[0], 100)
+
+    def test_magnifier_view(self):
+        """Проверка лупы с произвольным коэффициентом и без новых поверхностей"""
+        editor = PixelArtEditor(grid_size=128, zoom=4)
+        editor.canvas = self._random_canvas(128)
+        for factor in (0.5, 3.0, 4.0, 6.5):
+            with self.subTest(factor=factor):
+                view, offset = editor.get_magnifier_view((64, 64), factor)
+                # Пиксель под курсором занимает центр лупы
+                center = editor.magnifier_size // 2
+                sample = (center - offset[0], center - offset[1])
+                self.assertEqual(view.get_at(sample), editor.canvas.get_at((64, 64)))
+
+        editor.get_magnifier_view((16, 16), 4.0)
+        with count_surface_allocations() as counter:
+            for x in range(32):
+                editor.get_magnifier_view((x, 5), 4.0)
+        self.assertEqual(counter["surfaces"], 0)
+
+        editor.set_magnifier_factor(1000)
+        self.assertEqual(editor.magnifier_zoom_factor, MAGNIFIER_MAX_FACTOR)
+
+if __name__ == '__main__':
+    unittest.main()
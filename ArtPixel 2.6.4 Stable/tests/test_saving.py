@@ -0,0 +1,140 @@
+import unittest
+import os
+import tempfile
+import threading
+import pygame
+from editor.core import PixelArtEditor
+from editor.file_io import atomic_write, load_from_binary, PROJECT_EXTENSION
+from editor.saving import SaveWorker
+
+class TestSaveWorker(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.name = os.path.join(self.temp_dir.name, "artwork")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_saves_snapshot(self):
+        """Сохраняется состояние на момент submit, а не последующие изменения"""
+        surface = pygame.Surface((8, 8), pygame.SRCALPHA)
+        surface.fill((10, 20, 30, 255))
+        worker = SaveWorker(notify=False)
+        worker.submit(surface, self.name)
+        surface.fill((200, 0, 0, 255))
+        self.assertTrue(worker.stop(timeout=10))
+
+        loaded = load_from_binary(self.name + PROJECT_EXTENSION)
+        self.assertEqual(loaded.get_at((4, 4)), (10, 20, 30, 255))
+        self.assertTrue(os.path.exists(self.name + ".png"))
+        self.assertEqual(worker.status()[0], f"Сохранено: {self.name}")
+        self.assertFalse(worker.busy)
+
+    def test_status_while_saving_and_error(self):
+        """Статус показывает прогресс во время записи и ошибку после нее"""
+        started, release = threading.Event(), threading.Event()
+
+        def slow_failing_save(surface, name, progress=None):
+            progress(0.5)
+            started.set()
+            release.wait(10)
+            raise OSError("диск заполнен")
+
+        worker = SaveWorker(save_func=slow_failing_save, notify=False)
+        worker.submit(pygame.Surface((4, 4), pygame.SRCALPHA), "busy")
+        self.assertTrue(started.wait(10))
+        text, progress, is_error = worker.status()
+        self.assertIn("50%", text)
+        self.assertEqual(progress, 0.5)
+        self.assertFalse(is_error)
+        self.assertEqual(worker.status_wakeup_ms(), 100)
+
+        release.set()
+        self.assertTrue(worker.stop(timeout=10))
+        text, progress, is_error = worker.status()
+        self.assertTrue(is_error)
+        self.assertIn("диск заполнен", text)
+
+    def test_atomic_write_keeps_old_file(self):
+        """Сбой во время записи не портит прежний файл и не оставляет временных"""
+        path = os.path.join(self.temp_dir.name, "project.bin")
+        with atomic_write(path) as f:
+            f.write(b"old")
+        with self.assertRaises(RuntimeError):
+            with atomic_write(path) as f:
+                f.write(b"new, partial")
+                raise RuntimeError("сбой")
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), b"old")
+        self.assertEqual(os.listdir(self.temp_dir.name), ["project.bin"])
+
+    def test_editor_dialog_does_not_block(self):
+        """Enter в диалоге сохранения не ждет записи, статус рисуется в кадре"""
+        release = threading.Event()
+        saved = []
+
+        def blocking_save(surface, name, progress=None):
+            release.wait(10)
+            saved.append((name, surface.get_size()))
+
+        editor = PixelArtEditor(grid_size=16, zoom=8)
+        editor.save_worker = SaveWorker(save_func=blocking_save, notify=False)
+        editor.save_dialog_active = True
+        editor.save_input = "picture"
+        event = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN, unicode="\r", mod=0)
+        editor._handle_save_dialog_key(event)
+
+        self.assertFalse(editor.save_dialog_active)
+        self.assertTrue(editor.save_worker.busy)
+        editor.draw()
+        self.assertIsNotNone(editor.draw_save_status())
+
+        release.set()
+        editor.shutdown()  # Дожидается фонового сохранения
+        self.assertEqual(saved, [("picture", (16, 16))])
+
+    def test_unsaved_flag_cleared_only_after_success(self):
+        """Флаг несохраненных изменений снимает только удачная запись без правок после нее"""
+        release = threading.Event()
+
+        def blocking_save(surface, name, progress=None):
+            release.wait(10)
+            if name == "broken":
+                raise OSError("диск заполнен")
+
+        editor = PixelArtEditor(grid_size=16, zoom=8)
+        editor.save_worker = SaveWorker(save_func=blocking_save, notify=False)
+        editor.draw_pixel((1, 1), (255, 0, 0, 255))
+        editor.save_artwork_async("picture")
+        editor._finish_saves()
+        self.assertTrue(editor.has_unsaved_changes)  # Запись еще идет
+        release.set()
+        self.assertTrue(editor.save_worker.wait(10))
+        editor._finish_saves()
+        self.assertFalse(editor.has_unsaved_changes)
+
+        # Правка после отправки не попала в файл
+        release.clear()
+        editor.draw_pixel((2, 2), (255, 0, 0, 255))
+        editor.save_artwork_async("picture")
+        editor.draw_pixel((3, 3), (255, 0, 0, 255))
+        release.set()
+        self.assertTrue(editor.save_worker.wait(10))
+        editor._finish_saves()
+        self.assertTrue(editor.has_unsaved_changes)
+
+        # Ошибка записи оставляет флаг
+        editor.save_artwork_async("broken")
+        editor.shutdown()
+        self.assertTrue(editor.has_unsaved_changes)
+
+if __name__ == '__main__':
+    unittest.main()
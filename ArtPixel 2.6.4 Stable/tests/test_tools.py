@@ -124,5 +124,62 @@ class TestTools(unittest.TestCase):
                     0
                 )
 
+    def test_stroke_single_history_entry(self):
+        """Проверка, что штрих карандаша - одна запись истории"""
+        history_len = len(self.editor.history)
+        self.tools.current_tool = "Карандаш"
+        self.tools.handle_tool_action((1, 1))
+        for x in range(2, 10):
+            self.tools.handle_tool_action((x, 1), True)
+        self.tools.handle_tool_action((9, 1), False, True)
+        
+        self.assertEqual(len(self.editor.history), history_len + 1)
+
+    def test_flood_fill_single_history_entry(self):
+        """Проверка, что заливка - одна запись истории"""
+        history_len = len(self.editor.history)
+        self.tools.current_tool = "Заливка"
+        self.editor.color_manager.current_color = (0, 0, 255, 255)
+        self.tools.handle_tool_action((0, 0))
+        
+        self.assertEqual(len(self.editor.history), history_len + 1)
+
+    def test_flood_fill_bounded_region(self):
+        """Проверка, что заливка не выходит за границы области"""
+        wall = (255, 255, 255, 255)
+        fill = (0, 255, 0, 255)
+        for i in range(2, 9):
+            for x, y in ((i, 2), (i, 8), (2, i), (8, i)):
+                self.editor.draw_pixel((x, y), wall)
+        
+        self.editor.color_manager.current_color = fill
+        self.tools.flood_fill((5, 5))
+        
+        self.assertEqual(self.editor.canvas.get_at((3, 3)), fill)
+        self.assertEqual(self.editor.canvas.get_at((7, 7)), fill)
+        self.assertEqual(self.editor.canvas.get_at((2, 5)), wall)
+        self.assertEqual(self.editor.canvas.get_at((1, 1)), (0, 0, 0, 0))
+        self.assertEqual(self.editor.canvas.get_at((12, 12)), (0, 0, 0, 0))
+
+    def test_flood_fill_out_of_bounds(self):
+        """Проверка, что заливка за пределами холста ничего не меняет"""
+        self.editor.color_manager.current_color = (0, 255, 0, 255)
+        history_len = len(self.editor.history)
+        for pos in ((-1, 5), (5, -1), (16, 5), (5, 16)):
+            self.tools.flood_fill(pos)
+        
+        self.assertEqual(self.editor.canvas.get_bounding_rect().width, 0)
+        self.assertEqual(len(self.editor.history), history_len)
+
+    def test_redundant_write_not_dirty(self):
+        """Проверка, что повторная запись того же цвета не создает запись истории"""
+        self.editor.draw_pixel((3, 3), (255, 0, 0, 255))
+        history_len = len(self.editor.history)
+        
+        self.editor.begin_transaction()
+        self.editor.draw_pixel((3, 3), (255, 0, 0, 255))
+        self.assertFalse(self.editor.commit_transaction())
+        self.assertEqual(len(self.editor.history), history_len)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,107 @@
+import unittest
+import json
+import os
+import tempfile
+import threading
+import pygame
+from editor.tracing import Tracer, tracer, traced
+from editor.core import PixelArtEditor
+
+class TestTracing(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        pygame.init()
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "trace.json")
+
+    def tearDown(self):
+        tracer.enabled = False
+        self.directory.cleanup()
+
+    def _load(self):
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_disabled_tracer_records_nothing(self):
+        """Проверка, что без запуска события не накапливаются"""
+        local = Tracer()
+        with local.span("frame"):
+            pass
+        self.assertEqual(local.events, [])
+        self.assertIsNone(local.flush())
+
+    def test_chrome_trace_format(self):
+        """Проверка формата Chrome Trace Event"""
+        local = Tracer()
+        local.start(self.path)
+        with local.span("frame", "frame", {"n": 1}):
+            with local.span("inner"):
+                pass
+        def background():
+            with local.span("background"):
+                pass
+        worker = threading.Thread(target=background, name="worker")
+        worker.start()
+        worker.join()
+        local.flush()
+
+        data = self._load()
+        spans = [e for e in data["traceEvents"] if e["ph"] == "X"]
+        names = {e["name"]: e for e in spans}
+        self.assertEqual(set(names), {"frame", "inner", "background"})
+        self.assertEqual(names["frame"]["args"], {"n": 1})
+        # Вложенный интервал лежит внутри внешнего
+        self.assertGreaterEqual(names["inner"]["ts"], names["frame"]["ts"])
+        self.assertLessEqual(names["inner"]["ts"] + names["inner"]["dur"],
+                             names["frame"]["ts"] + names["frame"]["dur"])
+        self.assertNotEqual(names["background"]["tid"], names["frame"]["tid"])
+        thread_names = {e["args"]["name"] for e in data["traceEvents"] if e["name"] == "thread_name"}
+        self.assertIn("main", thread_names)
+
+    def test_buffer_limit(self):
+        """Проверка ограничения буфера событий"""
+        local = Tracer(max_events=2)
+        local.start(self.path)
+        for _ in range(5):
+            with local.span("x"):
+                pass
+        self.assertEqual(len(local.events), 2)
+        self.assertEqual(local.dropped, 3)
+
+    def test_editor_spans_flushed_on_shutdown(self):
+        """Проверка интервалов действий редактора и выгрузки при завершении"""
+        @traced("test.action", cat="test")
+        def action():
+            return 42
+
+        tracer.start(self.path)
+        self.assertEqual(action(), 42)
+        editor = PixelArtEditor(grid_size=16, zoom=1)
+        editor.tools.current_tool = "Заливка"
+        editor.tools.handle_tool_action((1, 1))
+        editor.undo()
+        editor.redo()
+        # Штрих карандаша записывается в историю одной дельтой
+        editor.tools.begin_stroke()
+        for x in range(2, 6):
+            editor.draw_pixel((x, 3), (255, 0, 0, 255))
+        editor.tools.end_stroke()
+        editor.shutdown()
+
+        events = self._load()["traceEvents"]
+        names = {e["name"] for e in events}
+        for name in ("test.action", "Tools.handle_tool_action", "Tools.flood_fill",
+                     "PixelArtEditor.undo", "PixelArtEditor.redo"):
+            self.assertIn(name, names)
+        history = [e for e in events if e["name"] == "PixelArtEditor._commit_history"]
+        self.assertEqual({e["cat"] for e in history}, {"history"})
+        self.assertEqual(len(history), 2)  # Заливка и штрих
+
+if __name__ == '__main__':
+    unittest.main()